@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Association-to-IP latency with the fast-join profile on and off
+
+Needs NetworkManager, a Wi-Fi card within range of Wireless@SGx and saved
+credentials. Each iteration takes the connection down, brings it up again
+and measures the time until the profile reports an IPv4 address. Connection
+history and metrics go to a temporary directory, not the user's.
+
+    python benchmarks/bench_fast_join.py --iterations 10 > fast_join.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wirelesssgx.network import NetworkManager
+from wirelesssgx.storage import SecureStorage
+
+
+def wait_for_ip(network: NetworkManager, timeout: float) -> bool:
+    """Poll the profile until it has an IPv4 address"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = network.get_profile_info() or {}
+        if info.get("IP4.ADDRESS"):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def measure(fast_join: bool, creds: dict, iterations: int, timeout: float) -> dict:
+    """Reconfigure the profile and time ``iterations`` reconnects"""
+    network = NetworkManager(fast_join=fast_join)
+    if not network.configure_network(creds["username"], creds["password"]):
+        raise SystemExit("Failed to configure network")
+
+    samples = []
+    failures = 0
+    for _ in range(iterations):
+        subprocess.run(["nmcli", "connection", "down", network.connection_name], capture_output=True)
+        start = time.monotonic()
+        if network.activate()["connected"] and wait_for_ip(network, timeout):
+            samples.append(time.monotonic() - start)
+        else:
+            failures += 1
+
+    return {
+        "fast_join": fast_join,
+        "iterations": iterations,
+        "failures": failures,
+        "samples": samples,
+        "median": statistics.median(samples) if samples else None,
+        "min": min(samples) if samples else None,
+        "max": max(samples) if samples else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    creds = SecureStorage().get_credentials()
+    if not creds:
+        raise SystemExit("No saved credentials found")
+
+    with tempfile.TemporaryDirectory(prefix="wsgx-fast-join-") as workdir:
+        os.environ["WIRELESSSGX_HISTORY_FILE"] = os.path.join(workdir, "history.db")
+        os.environ.pop("WIRELESSSGX_TEXTFILE_DIR", None)
+        results = [measure(mode, creds, args.iterations, args.timeout) for mode in (False, True)]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
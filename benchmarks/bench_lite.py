@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""CPU time and terminal bytes of a scripted TUI session, normal vs lite
+
+Each mode runs in a fresh interpreter (Textual reads its frame rate cap
+at import) under the test pilot, with a driver that renders and counts
+bytes instead of discarding them. The session opens Register, waits on
+the OTP countdown, then sits on the auto-connect spinner; the ESSA client
+and the connection are replaced with fakes, so nothing leaves the machine.
+
+    python benchmarks/bench_lite.py --seconds 10 > lite.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+async def session(seconds: float) -> int:
+    """Run the scripted session; returns terminal bytes written"""
+    from textual.drivers.headless_driver import HeadlessDriver
+
+    from wirelesssgx import connection
+    from wirelesssgx.app import WirelessSGXApp
+    from wirelesssgx.core import WirelessSGXClient
+
+    written = [0]
+
+    def write(driver, data: str) -> None:
+        written[0] += len(data.encode("utf-8"))
+
+    HeadlessDriver.is_headless = property(lambda driver: False)
+    HeadlessDriver.write = write
+
+    WirelessSGXClient.request_registration = lambda self, *args, **kwargs: "fake-success-code"
+
+    def slow_connect(network, username, password, machine, deadline=None, **kwargs):
+        machine.advance(connection.CONFIGURING)
+        deadline.sleep(seconds)
+        machine.advance(connection.OUT_OF_RANGE)
+        return machine.state
+
+    connection.connect = slow_connect
+
+    app = WirelessSGXApp()
+    async with app.run_test(size=(100, 40)) as pilot:
+        await pilot.pause(0.5)
+        await app.push_screen("register", retrieve_mode=False)
+        await pilot.pause(0.5)
+        await app.push_screen("otp", registration_data={
+            "mobile": "6591234567", "dob": "01012000", "isp": "singtel", "retrieve_mode": False
+        })
+        await pilot.pause(seconds)
+        await app.push_screen("autoconnect", credentials={"username": "user", "password": "pass"})
+        await pilot.pause(seconds)
+    return written[0]
+
+
+def child(seconds: float) -> None:
+    # What ``wirelesssgx --lite`` does before Textual is imported
+    from wirelesssgx.lite import apply_lite_defaults, lite_mode
+    if lite_mode():
+        apply_lite_defaults()
+
+    cpu = time.process_time()
+    wall = time.monotonic()
+    written = asyncio.run(session(seconds))
+    print(json.dumps({
+        "cpu_seconds": round(time.process_time() - cpu, 3),
+        "wall_seconds": round(time.monotonic() - wall, 3),
+        "bytes_written": written,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0,
+                        help="time spent on each animated screen (default: 10)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.seconds)
+        return
+
+    results = {}
+    for mode in ("normal", "lite"):
+        env = dict(os.environ)
+        env.pop("WIRELESSSGX_LITE", None)
+        if mode == "lite":
+            env["WIRELESSSGX_LITE"] = "1"
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--seconds", str(args.seconds)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(json.dumps({"seconds": args.seconds, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
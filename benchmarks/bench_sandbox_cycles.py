@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Connect/reconnect cycles per minute against the simulated system
+
+Runs the real NetworkManager backend, connection state machine and
+reconnect supervisor inside ``wirelesssgx.sandbox`` (no root, radio or
+NetworkManager needed). ``connect`` cycles configure the profile, scan,
+activate and verify like ``wirelesssgx connect``; ``reconnect`` cycles
+drop the link and let the daemon's supervisor bring it back.
+``--fail-every N`` makes every Nth activation fail.
+
+    python benchmarks/bench_sandbox_cycles.py --cycles 5000 > cycles.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wirelesssgx import connection, runner
+from wirelesssgx.daemon import NetworkManagerBackend, ReconnectSupervisor
+from wirelesssgx.network import NetworkManager, _scan_cache
+from wirelesssgx.sandbox import Sandbox
+
+USERNAME, PASSWORD = "user@singtel", "secret"
+
+
+def connect_cycle(sandbox: Sandbox, network: NetworkManager, supervisor) -> bool:
+    sandbox.system.drop_link()
+    machine = connection.ConnectionStateMachine()
+    return connection.connect(network, USERNAME, PASSWORD, machine) == connection.VERIFIED
+
+
+def reconnect_cycle(sandbox: Sandbox, network: NetworkManager, supervisor) -> bool:
+    sandbox.system.drop_link()
+    supervisor.step()
+    return sandbox.system.link is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=2000)
+    parser.add_argument("--mode", choices=("connect", "reconnect"), default="reconnect")
+    parser.add_argument("--activation-delay", type=float, default=0.0,
+                        help="simulated seconds per activation (default: 0)")
+    parser.add_argument("--fail-every", type=int, default=0, metavar="N",
+                        help="fail every Nth 'nmcli connection up'")
+    args = parser.parse_args()
+
+    cycle = connect_cycle if args.mode == "connect" else reconnect_cycle
+    with Sandbox() as sandbox:
+        sandbox.system.accounts = {USERNAME: PASSWORD}
+        sandbox.system.activation_delay = args.activation_delay
+        network = NetworkManager()
+        network.configure_network(USERNAME, PASSWORD)
+        # Retry immediately; backoff timing is not what is measured here
+        supervisor = ReconnectSupervisor(NetworkManagerBackend(network), base_delay=0)
+        runner.metrics.reset()
+
+        connected = 0
+        start = time.perf_counter()
+        for i in range(1, args.cycles + 1):
+            if args.fail_every and i % args.fail_every == 0:
+                sandbox.system.inject_failure("nmcli connection up", returncode=4)
+            connected += cycle(sandbox, network, supervisor)
+            # Each cycle starts from a fresh scan, as after a real link loss
+            _scan_cache.clear()
+        elapsed = time.perf_counter() - start
+
+        commands = runner.metrics.snapshot()
+
+    print(json.dumps({
+        "mode": args.mode,
+        "cycles": args.cycles,
+        "connected": connected,
+        "seconds": round(elapsed, 3),
+        "cycles_per_minute": round(args.cycles / elapsed * 60),
+        "supervisor": supervisor.stats() if args.mode == "reconnect" else None,
+        "commands": {name: {"calls": stats["calls"], "failures": stats["failures"]}
+                     for name, stats in sorted(commands.items())},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
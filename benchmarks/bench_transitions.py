@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Screen transition latency of the TUI on an emulated slow terminal
+
+Runs the app under Textual's test pilot with a driver that "writes" at a
+fixed line rate (``--baud``) instead of discarding output, then times
+opening Register and Manage Credentials from the welcome screen and going
+Back again. ``--no-pool`` rebuilds every screen on each push, for
+comparison with the screen pool.
+
+    python benchmarks/bench_transitions.py --iterations 20 > transitions.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from textual.drivers.headless_driver import HeadlessDriver
+
+from wirelesssgx.app import WirelessSGXApp
+
+
+class SlowTerminal:
+    """Patches the headless driver to render and pay for every byte"""
+
+    def __init__(self, baud: int):
+        self.seconds_per_byte = 10.0 / baud  # 8N1: ten bits per byte
+        self.bytes_written = 0
+
+    def __enter__(self):
+        self._saved = (HeadlessDriver.is_headless, HeadlessDriver.write)
+        terminal = self
+
+        def write(driver, data: str) -> None:
+            size = len(data.encode("utf-8"))
+            terminal.bytes_written += size
+            time.sleep(size * terminal.seconds_per_byte)
+
+        HeadlessDriver.is_headless = property(lambda driver: False)
+        HeadlessDriver.write = write
+        return self
+
+    def __exit__(self, *exc_info):
+        HeadlessDriver.is_headless, HeadlessDriver.write = self._saved
+
+
+async def measure(iterations: int, terminal: SlowTerminal) -> dict:
+    app = WirelessSGXApp()
+    samples = {"register": [], "credentials": [], "back": []}
+    transitions = (
+        ("register", {"retrieve_mode": False}),
+        ("credentials", {}),
+    )
+
+    async with app.run_test(size=(100, 40)) as pilot:
+        await pilot.pause(0.5)
+        for _ in range(iterations):
+            for name, kwargs in transitions:
+                start = time.perf_counter()
+                await app.push_screen(name, **kwargs)
+                await pilot.pause()
+                samples[name].append(time.perf_counter() - start)
+
+                lifetime = getattr(app.screen, "lifetime", None)
+                if lifetime is not None:
+                    lifetime.cancel("Benchmark")
+                start = time.perf_counter()
+                await app.pop_screen()
+                await pilot.pause()
+                samples["back"].append(time.perf_counter() - start)
+
+    return {
+        name: {
+            "median_ms": round(statistics.median(values) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+        }
+        for name, values in samples.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--baud", type=int, default=115200,
+                        help="emulated terminal line rate (default: 115200)")
+    parser.add_argument("--no-pool", action="store_true",
+                        help="rebuild screens on every push")
+    args = parser.parse_args()
+
+    if args.no_pool:
+        WirelessSGXApp.POOLED_SCREENS = ()
+
+    with SlowTerminal(args.baud) as terminal:
+        results = asyncio.run(measure(args.iterations, terminal))
+
+    print(json.dumps({
+        "pooled": not args.no_pool,
+        "baud": args.baud,
+        "iterations": args.iterations,
+        "bytes_written": terminal.bytes_written,
+        "transitions": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""End-to-end Wi-Fi benchmark rig using mac80211_hwsim
+
+Creates two virtual radios with ``mac80211_hwsim``, moves one into a
+network namespace and runs hostapd there as a local "Wireless@SGx" with
+its internal EAP server doing PEAP/MSCHAPv2, plus dnsmasq for DHCP. The
+other radio stays in the root namespace as the station. Profiles are
+applied with ``NetworkManager.configure_network`` and each iteration is
+timed through scan, authentication and DHCP.
+
+Must run as root on a disposable machine or VM; it loads and unloads
+kernel modules and creates/deletes the Wireless@SGx NetworkManager
+profile.
+
+    sudo python benchmarks/hwsim_rig.py --backend networkmanager \\
+        --backend wpa_supplicant --iterations 20 > hwsim.json
+
+Only the ``networkmanager`` and ``wpa_supplicant`` backends are driven
+here: ``systemd-networkd`` writes the same wpa_supplicant network block
+and only differs in which systemd unit starts the supplicant.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wirelesssgx import network as network_module
+from wirelesssgx.network import NetworkManager
+
+NETNS = "wsgx-ap"
+AP_ADDRESS = "10.77.0.1/24"
+DHCP_RANGE = "10.77.0.10,10.77.0.200,1h"
+TEST_USERNAME = "rig-user@wsg"
+TEST_PASSWORD = "rig-password"
+
+HOSTAPD_CONF = """interface={interface}
+driver=nl80211
+ctrl_interface={ctrl_dir}
+ssid={ssid}
+hw_mode=g
+channel=6
+ieee8021x=1
+eapol_version=2
+eap_server=1
+eap_user_file={eap_user_file}
+ca_cert={cert}
+server_cert={cert}
+private_key={key}
+wpa=2
+wpa_key_mgmt=WPA-EAP
+rsn_pairwise=CCMP
+"""
+
+
+def run(*cmd: str, check: bool = True, **kwargs) -> subprocess.CompletedProcess:
+    """Run a command, capturing text output"""
+    return subprocess.run(cmd, capture_output=True, text=True, check=check, **kwargs)
+
+
+def write_eap_server_files(directory: Path, username: str = TEST_USERNAME,
+                           password: str = TEST_PASSWORD) -> Dict[str, Path]:
+    """Write a throwaway server certificate and PEAP/MSCHAPv2 user file.
+
+    Shared with the RADIUS stand-in used to test credential verification.
+    """
+    cert = directory / "server.crt"
+    key = directory / "server.key"
+    run("openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+        "-keyout", str(key), "-out", str(cert), "-days", "1",
+        "-subj", "/CN=wireless-sgx-rig")
+
+    eap_user_file = directory / "eap_user"
+    eap_user_file.write_text(
+        '* PEAP\n'
+        f'"{username}" MSCHAPV2 "{password}" [2]\n'
+    )
+    return {"cert": cert, "key": key, "eap_user_file": eap_user_file}
+
+
+def hwsim_phys() -> List[str]:
+    """Names of the phys created by mac80211_hwsim"""
+    phys = []
+    for phy in sorted(Path("/sys/class/ieee80211").iterdir()):
+        driver = phy / "device" / "driver"
+        if driver.exists() and driver.resolve().name == "mac80211_hwsim":
+            phys.append(phy.name)
+    return phys
+
+
+def phy_interface(phy: str) -> str:
+    """Network interface of a phy"""
+    return next((Path("/sys/class/ieee80211") / phy / "device" / "net").iterdir()).name
+
+
+class LineTimer:
+    """Timestamp the first line of a process' output matching each marker"""
+
+    def __init__(self, process: subprocess.Popen, markers: Dict[str, str]):
+        self.process = process
+        self.markers = markers
+        self.times: Dict[str, float] = {}
+        self.events = {name: threading.Event() for name in markers}
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def _read(self) -> None:
+        for line in self.process.stdout:
+            now = time.monotonic()
+            for name, marker in self.markers.items():
+                if name not in self.times and marker in line:
+                    self.times[name] = now
+                    self.events[name].set()
+
+    def wait(self, name: str, timeout: float) -> Optional[float]:
+        """Wait for a marker and return its timestamp"""
+        self.events[name].wait(timeout)
+        return self.times.get(name)
+
+
+class HwsimRig:
+    """Virtual radios, hostapd/EAP server and DHCP server"""
+
+    def __init__(self, workdir: Path):
+        self.workdir = workdir
+        self.processes: List[subprocess.Popen] = []
+        self.ap_interface = ""
+        self.station = ""
+
+    def __enter__(self) -> "HwsimRig":
+        run("modprobe", "-r", "mac80211_hwsim", check=False)
+        run("modprobe", "mac80211_hwsim", "radios=2")
+        time.sleep(0.5)
+        ap_phy, station_phy = hwsim_phys()[:2]
+        self.ap_interface = phy_interface(ap_phy)
+        self.station = phy_interface(station_phy)
+
+        run("ip", "netns", "add", NETNS)
+        run("iw", "phy", ap_phy, "set", "netns", "name", NETNS)
+        self._netns("ip", "link", "set", self.ap_interface, "up")
+        self._netns("ip", "addr", "add", AP_ADDRESS, "dev", self.ap_interface)
+
+        files = write_eap_server_files(self.workdir)
+        hostapd_conf = self.workdir / "hostapd.conf"
+        hostapd_conf.write_text(HOSTAPD_CONF.format(
+            interface=self.ap_interface,
+            ctrl_dir=self.workdir / "hostapd",
+            ssid=NetworkManager().ssid,
+            **files
+        ))
+
+        hostapd = self._spawn("ip", "netns", "exec", NETNS, "hostapd", str(hostapd_conf))
+        if LineTimer(hostapd, {"enabled": "AP-ENABLED"}).wait("enabled", 10) is None:
+            raise SystemExit("hostapd failed to start")
+
+        self._spawn("ip", "netns", "exec", NETNS, "dnsmasq", "--keep-in-foreground",
+                    f"--interface={self.ap_interface}", "--bind-interfaces",
+                    f"--dhcp-range={DHCP_RANGE}", "--no-resolv", "--no-hosts",
+                    f"--dhcp-leasefile={self.workdir / 'leases'}")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for process in reversed(self.processes):
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        run("ip", "netns", "del", NETNS, check=False)
+        run("modprobe", "-r", "mac80211_hwsim", check=False)
+
+    def _netns(self, *cmd: str) -> subprocess.CompletedProcess:
+        return run("ip", "netns", "exec", NETNS, *cmd)
+
+    def _spawn(self, *cmd: str) -> subprocess.Popen:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        self.processes.append(process)
+        return process
+
+
+def bench_networkmanager(rig: HwsimRig, fast_join: bool, iterations: int,
+                         timeout: float) -> List[Dict]:
+    """Time scan, auth and DHCP through NetworkManager"""
+    network = NetworkManager(fast_join=fast_join, interface=rig.station)
+    run("nmcli", "device", "set", rig.station, "managed", "yes")
+    if not network.configure_network(TEST_USERNAME, TEST_PASSWORD, backend="networkmanager"):
+        raise SystemExit("Failed to configure NetworkManager profile")
+
+    samples = []
+    for _ in range(iterations):
+        run("nmcli", "connection", "down", network.connection_name, check=False)
+        network_module._scan_cache.clear()
+
+        monitor = subprocess.Popen(["nmcli", "device", "monitor", rig.station],
+                                   stdout=subprocess.PIPE, text=True)
+        timer = LineTimer(monitor, {
+            "auth": "getting IP configuration",
+            "connected": ": connected",
+        })
+
+        start = time.monotonic()
+        visible = network.scan_for_ssid(max_age=0, scan_wait=timeout)
+        scanned = time.monotonic()
+        result = network.activate() if visible else {"connected": False}
+        connected = timer.wait("connected", timeout)
+        auth = timer.times.get("auth")
+        monitor.terminate()
+
+        samples.append(_sample(start, scanned, auth, connected if result["connected"] else None))
+
+    run("nmcli", "connection", "delete", network.connection_name, check=False)
+    return samples
+
+
+def bench_wpa_supplicant(rig: HwsimRig, fast_join: bool, iterations: int,
+                         timeout: float) -> List[Dict]:
+    """Time scan, auth and DHCP with the generated wpa_supplicant config"""
+    root = rig.workdir / "root"
+    (root / "etc" / "wpa_supplicant").mkdir(parents=True, exist_ok=True)
+    network = NetworkManager(fast_join=fast_join, root=str(root), interface=rig.station)
+    network.configure_network(TEST_USERNAME, TEST_PASSWORD, backend="wpa_supplicant")
+    config = root / "etc" / "wpa_supplicant" / "wpa_supplicant.conf"
+
+    run("nmcli", "device", "set", rig.station, "managed", "no", check=False)
+    dhcp_client = ["dhclient", "-1", rig.station] if shutil.which("dhclient") else \
+        ["udhcpc", "-i", rig.station, "-n", "-q", "-f"]
+
+    samples = []
+    for _ in range(iterations):
+        run("ip", "addr", "flush", "dev", rig.station, check=False)
+        start = time.monotonic()
+        supplicant = subprocess.Popen(
+            ["wpa_supplicant", "-D", "nl80211", "-i", rig.station, "-c", str(config)],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
+        timer = LineTimer(supplicant, {
+            "scan": "CTRL-EVENT-SCAN-RESULTS",
+            "auth": "CTRL-EVENT-CONNECTED",
+        })
+
+        auth = timer.wait("auth", timeout)
+        connected = None
+        if auth is not None:
+            try:
+                run(*dhcp_client, timeout=timeout)
+                connected = time.monotonic()
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+                pass
+
+        samples.append(_sample(start, timer.times.get("scan"), auth, connected))
+
+        supplicant.terminate()
+        supplicant.wait()
+        if dhcp_client[0] == "dhclient":
+            run("dhclient", "-r", rig.station, check=False)
+
+    return samples
+
+
+def _sample(start: float, scanned: Optional[float], auth: Optional[float],
+            connected: Optional[float]) -> Dict:
+    """Per-iteration phase durations in seconds (None if not reached)"""
+    def since(t0, t1):
+        return round(t1 - t0, 4) if t0 is not None and t1 is not None else None
+
+    return {
+        "scan": since(start, scanned),
+        "auth": since(scanned, auth),
+        "dhcp": since(auth, connected),
+        "total": since(start, connected),
+    }
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    """Median and p95 per phase plus failure count"""
+    summary = {"iterations": len(samples),
+               "failures": sum(1 for s in samples if s["total"] is None)}
+    for phase in ("scan", "auth", "dhcp", "total"):
+        values = sorted(s[phase] for s in samples if s[phase] is not None)
+        summary[phase] = {
+            "median": statistics.median(values) if values else None,
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))] if values else None,
+        }
+    return summary
+
+
+BACKENDS = {
+    "networkmanager": bench_networkmanager,
+    "wpa_supplicant": bench_wpa_supplicant,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", action="append", choices=sorted(BACKENDS),
+                        help="Backend to benchmark (repeatable; default: all)")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--fast-join", choices=("off", "on", "both"), default="both")
+    parser.add_argument("--samples", action="store_true", help="Include per-iteration samples")
+    args = parser.parse_args()
+
+    if os.geteuid() != 0:
+        raise SystemExit("The hwsim rig must run as root")
+
+    modes = {"off": [False], "on": [True], "both": [False, True]}[args.fast_join]
+    report = []
+    with tempfile.TemporaryDirectory(prefix="wsgx-hwsim-") as workdir:
+        # Keep benchmark connects out of the user's history and metrics
+        os.environ["WIRELESSSGX_HISTORY_FILE"] = str(Path(workdir) / "history.db")
+        os.environ.pop("WIRELESSSGX_TEXTFILE_DIR", None)
+        with HwsimRig(Path(workdir)) as rig:
+            for backend in args.backend or sorted(BACKENDS):
+                for fast_join in modes:
+                    samples = BACKENDS[backend](rig, fast_join, args.iterations, args.timeout)
+                    entry = {"backend": backend, "fast_join": fast_join, **summarize(samples)}
+                    if args.samples:
+                        entry["samples"] = samples
+                    report.append(entry)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
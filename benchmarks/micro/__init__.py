@@ -0,0 +1,13 @@
+"""Offline microbenchmarks for core, storage and network hot paths
+
+Run from the repository root::
+
+    python -m benchmarks.micro                 # run everything, append to history
+    python -m benchmarks.micro -k storage      # only cases whose name matches
+    python -m benchmarks.micro --no-save       # don't record this run
+
+Nothing touches the network, the real keyring or system services: the
+keyring is an in-memory backend, the file fallback lives in a temporary
+directory and ``systemctl``/``nmcli`` are stub scripts on ``PATH``. Each
+run is appended to ``history.jsonl`` and compared with the previous entry.
+"""
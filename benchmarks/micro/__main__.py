@@ -0,0 +1,52 @@
+"""Run the microbenchmarks and record them in the JSON history"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from . import cases  # noqa: F401  (registers the cases)
+from .harness import CASES, HISTORY_FILE, append_history, compare, load_history, make_entry, run_cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.micro", description=__doc__)
+    parser.add_argument("-k", dest="pattern", default="",
+                        help="only run cases whose name contains this string")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--history", type=Path, default=HISTORY_FILE)
+    parser.add_argument("--no-save", action="store_true", help="don't append this run to the history")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="median slowdown vs the previous run reported as a regression (default: 0.25)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if args.pattern in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print(f"No cases match {args.pattern!r}", file=sys.stderr)
+        return 2
+
+    entry = make_entry(run_cases(names, args.rounds))
+    history = load_history(args.history)
+    previous = history[-1]["results"] if history else {}
+    regressions = compare(entry["results"], previous, args.threshold)
+
+    for name, stats in entry["results"].items():
+        flag = f"  REGRESSED x{regressions[name]}" if name in regressions else ""
+        print(f"{name:40} {stats['median_us']:>12.1f} us  (min {stats['min_us']:.1f}){flag}")
+
+    if not args.no_save:
+        append_history(entry, args.history)
+    if regressions:
+        print(json.dumps({"regressions": regressions}), file=sys.stderr)
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""Benchmark cases: decryption, storage round trips, detection, nmcli, CLI"""
+
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+from .harness import REPO_ROOT, case
+
+SSID = "Wireless@SGx"
+OTP = "123456"
+
+# ``nmcli -t -f ACTIVE,SSID,BSSID,SIGNAL,DEVICE device wifi list`` output
+# for a busy location
+NMCLI_WIFI_LIST = "\n".join(
+    f"{'yes' if i == 0 else 'no'}:{SSID if i % 3 == 0 else f'Network {i}'}:"
+    f"AA\\:BB\\:CC\\:DD\\:{i:02X}\\:01:{90 - i}:wlan0"
+    for i in range(40)
+) + "\n"
+
+CLI_COMMANDS = ("show", "connect", "autoconnect", "forget", "status", "watch",
+                "daemon", "history", "provision", "register", "verify")
+
+
+@contextmanager
+def stub_binaries(scripts: Dict[str, str]) -> Iterator[Path]:
+    """Put shell-script stand-ins for system binaries first on PATH"""
+    with tempfile.TemporaryDirectory(prefix="wirelesssgx-bench-") as tmp:
+        for name, body in scripts.items():
+            path = Path(tmp) / name
+            path.write_text(f"#!/bin/sh\n{body}\n")
+            path.chmod(0o755)
+        saved = os.environ["PATH"]
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{saved}"
+        try:
+            yield Path(tmp)
+        finally:
+            os.environ["PATH"] = saved
+
+
+def _encrypted_payload(client, date: datetime.datetime) -> Dict[str, bytes]:
+    """What validate_otp returns, encrypted with the key for ``date``"""
+    from Crypto.Cipher import AES
+
+    key = client._build_decrypt_key(date, OTP)
+    nonce = b"0123456789ab"
+    payload = {"userid": b"user@singtel", "nonce": nonce}
+    for field, plaintext in (("userid", b"user@singtel"), ("password", b"secret")):
+        tag = os.urandom(16)
+        aes = AES.new(key, AES.MODE_CCM, nonce)
+        aes.update(tag)
+        payload[f"enc_{field}"] = aes.encrypt(plaintext)
+        payload[f"tag_{field}"] = tag
+    return payload
+
+
+@case("core/decrypt_key")
+def decrypt_key():
+    from wirelesssgx.core import WirelessSGXClient
+
+    client = WirelessSGXClient()
+    date = datetime.datetime.now()
+    yield lambda: client._build_decrypt_key(date, OTP)
+
+
+@case("core/decrypt_credentials_window")
+def decrypt_credentials_window():
+    """Worst case: the payload was encrypted with yesterday's key, the last
+    of the three dates tried"""
+    from wirelesssgx.core import WirelessSGXClient
+
+    client = WirelessSGXClient()
+    payload = _encrypted_payload(client, datetime.datetime.now() - datetime.timedelta(1))
+    assert client.decrypt_credentials(payload, OTP) == ("user@singtel", "secret")
+    yield lambda: client.decrypt_credentials(payload, OTP)
+
+
+@case("core/replay_validate_otp")
+def replay_validate_otp():
+    """validate_otp response checks and decryption on a replayed exchange"""
+    import codecs
+    import json
+
+    from wirelesssgx.cassette import ReplayTransport
+    from wirelesssgx.core import WirelessSGXClient
+
+    client = WirelessSGXClient()
+    payload = _encrypted_payload(client, datetime.datetime(2026, 10, 13, 1, 30))
+    body = {"userid": "user@singtel", "iv": payload["nonce"].decode()}
+    for field in ("enc_userid", "tag_userid", "enc_password", "tag_password"):
+        body[field] = codecs.encode(payload[field], "hex").decode()
+    interaction = {
+        "request": {"method": "GET", "url": "", "params": {"api": "create_user_r12x1b"}},
+        "response": {"status": 200, "headers": {"Date": "Mon, 12 Oct 2026 17:30:00 GMT"},
+                     "json": {"status": {"resultcode": 1100}, "api": "create_user_r12x1b",
+                              "version": "2.8", "body": body}},
+        "elapsed": 0.0,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="wirelesssgx-bench-") as tmp:
+        path = Path(tmp) / "essa.json"
+        path.write_text(json.dumps({"version": 1, "interactions": [interaction]}))
+        client.transport = ReplayTransport(path)
+
+        def run():
+            client.transport.rewind()
+            encrypted = client.validate_otp("6590000000", "01011990", OTP, "success")
+            assert client.decrypt_credentials(encrypted, OTP) == ("user@singtel", "secret")
+        yield run
+
+
+@contextmanager
+def _keyring_backend(backend):
+    import keyring
+
+    saved = keyring.get_keyring()
+    keyring.set_keyring(backend)
+    try:
+        yield
+    finally:
+        keyring.set_keyring(saved)
+
+
+def _memory_keyring():
+    from keyring.backend import KeyringBackend
+
+    class MemoryKeyring(KeyringBackend):
+        priority = 1
+
+        def __init__(self):
+            super().__init__()
+            self.store = {}
+
+        def get_password(self, service, username):
+            return self.store.get((service, username))
+
+        def set_password(self, service, username, password):
+            self.store[(service, username)] = password
+
+        def delete_password(self, service, username):
+            self.store.pop((service, username), None)
+
+    return MemoryKeyring()
+
+
+def _failing_keyring():
+    from keyring.backend import KeyringBackend
+    from keyring.errors import KeyringError
+
+    class FailingKeyring(KeyringBackend):
+        priority = 1
+
+        def get_password(self, service, username):
+            raise KeyringError("No keyring available")
+
+        def set_password(self, service, username, password):
+            raise KeyringError("No keyring available")
+
+        def delete_password(self, service, username):
+            raise KeyringError("No keyring available")
+
+    return FailingKeyring()
+
+
+def _round_trip(storage):
+    def run():
+        storage.save_credentials("user@singtel", "secret", "singtel")
+        assert storage.get_credentials()["password"] == "secret"
+    return run
+
+
+@case("storage/keyring_round_trip")
+def keyring_round_trip():
+    from wirelesssgx.storage import SecureStorage
+
+    with _keyring_backend(_memory_keyring()):
+        yield _round_trip(SecureStorage())
+
+
+@case("storage/file_round_trip")
+def file_round_trip():
+    from wirelesssgx.storage import SecureStorage
+
+    with tempfile.TemporaryDirectory(prefix="wirelesssgx-bench-") as tmp, \
+            _keyring_backend(_failing_keyring()):
+        storage = SecureStorage()
+        storage.fallback_file = Path(tmp) / "credentials.enc"
+        storage.pending_file = Path(tmp) / "pending.enc"
+        yield _round_trip(storage)
+
+
+@case("network/detect_networkmanager")
+def detect_networkmanager():
+    from wirelesssgx.network import NetworkManager
+
+    with stub_binaries({"systemctl": "printf 'active\\ninactive\\n'"}):
+        yield NetworkManager().detect_network_manager
+
+
+@case("network/detect_wpa_supplicant")
+def detect_wpa_supplicant():
+    """Neither service active: falls through to the filesystem check"""
+    from wirelesssgx.network import NetworkManager
+
+    with tempfile.TemporaryDirectory(prefix="wirelesssgx-bench-") as root, \
+            stub_binaries({"systemctl": "printf 'inactive\\ninactive\\n'; exit 3"}):
+        (Path(root) / "etc" / "wpa_supplicant").mkdir(parents=True)
+        yield NetworkManager(root=root).detect_network_manager
+
+
+@case("nmcli/parse_terse_line")
+def parse_terse_lines():
+    from wirelesssgx.network import parse_terse_line
+
+    lines = NMCLI_WIFI_LIST.splitlines()
+    yield lambda: [parse_terse_line(line) for line in lines]
+
+
+@case("nmcli/list_access_points")
+def list_access_points():
+    """Spawning a stub nmcli and parsing its 40-line scan list"""
+    from wirelesssgx.network import NetworkManager
+
+    with stub_binaries({"nmcli": "cat \"$(dirname \"$0\")/wifi-list.txt\""}) as bin_dir:
+        (bin_dir / "wifi-list.txt").write_text(NMCLI_WIFI_LIST)
+        network = NetworkManager()
+        assert len(network.list_access_points()) == 40
+        yield network.list_access_points
+
+
+@contextmanager
+def _history_store() -> Iterator:
+    from wirelesssgx.history import HistoryStore
+
+    with tempfile.TemporaryDirectory(prefix="wirelesssgx-bench-") as tmp:
+        with HistoryStore(str(Path(tmp) / "history.db")) as store:
+            yield store
+
+
+@case("history/record_attempt")
+def history_record_attempt():
+    """Appending one connect attempt (a WAL commit)"""
+    with _history_store() as store:
+        yield lambda: store.record_attempt(True, 3.2, "02:00:00:00:00:01")
+
+
+@case("history/year_report")
+def history_year_report():
+    """The default 'history' queries over a year of busy history"""
+    import random
+    import time
+
+    rng = random.Random(0)
+    now = time.time()
+    with _history_store() as store:
+        with store.db:
+            store.db.execute("BEGIN")
+            # 24 attempts and a link change every 20 minutes, for a year
+            store.db.executemany(
+                "INSERT INTO attempts (ts, profile, bssid, ok, duration, reason) "
+                "VALUES (?, 'Wireless@SGx', ?, ?, ?, ?)",
+                [(now - i * 3600, f"02:00:00:00:00:{i % 8:02x}", int(i % 10 != 0),
+                  rng.uniform(1, 20), None if i % 10 else "rejected") for i in range(365 * 24)])
+            store.db.executemany(
+                "INSERT INTO links (ts, profile, up, bssid) VALUES (?, 'Wireless@SGx', ?, ?)",
+                [(now - i * 1200, i % 2, "02:00:00:00:00:01" if i % 2 else None)
+                 for i in range(365 * 72, 0, -1)])
+
+        def run():
+            store.uptime_per_day(365, now=now)
+            store.failure_rate(365, now=now)
+            store.slowest_connects(5, 365, now=now)
+        yield run
+
+
+def _cold_start_case(command: str):
+    def cold_start():
+        yield lambda: subprocess.run(
+            [sys.executable, "-m", "wirelesssgx", command, "--help"],
+            cwd=REPO_ROOT, capture_output=True, check=True
+        )
+    cold_start.__name__ = f"cli_{command}"
+    case(f"cli/{command}", number=1)(cold_start)
+
+
+for _command in CLI_COMMANDS:
+    _cold_start_case(_command)
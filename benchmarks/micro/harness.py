@@ -0,0 +1,104 @@
+"""Timing and JSON history for the microbenchmarks"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+import timeit
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, Iterator, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+HISTORY_FILE = Path(__file__).resolve().parent / "history.jsonl"
+
+# A case is a context manager that sets up its fixtures and yields the
+# callable to time
+Case = Callable[[], ContextManager[Callable[[], object]]]
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, number: Optional[int] = None):
+    """Register a benchmark case (``number``: calls per round, else auto)"""
+    def register(func: Callable[[], Iterator[Callable[[], object]]]) -> Case:
+        wrapped = contextmanager(func)
+        wrapped.number = number
+        CASES[name] = wrapped
+        return wrapped
+    return register
+
+
+def measure(func: Callable[[], object], number: Optional[int] = None,
+            rounds: int = 5) -> Dict[str, float]:
+    """Time ``func``; returns per-call statistics in microseconds"""
+    timer = timeit.Timer(func)
+    if number is None:
+        # Enough calls per round for the round to take at least 0.2s
+        number, _ = timer.autorange()
+    func()  # warm up
+    samples = [seconds / number * 1e6 for seconds in timer.repeat(repeat=rounds, number=number)]
+    return {
+        "min_us": round(min(samples), 3),
+        "median_us": round(statistics.median(samples), 3),
+        "mean_us": round(statistics.mean(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def run_cases(names: List[str], rounds: int = 5) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name in names:
+        factory = CASES[name]
+        with factory() as func:
+            results[name] = measure(func, factory.number, rounds)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+def make_entry(results: Dict[str, Dict[str, float]]) -> Dict:
+    from wirelesssgx import __version__
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "version": __version__,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def load_history(path: Path = HISTORY_FILE) -> List[Dict]:
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def append_history(entry: Dict, path: Path = HISTORY_FILE) -> None:
+    with path.open("a") as f:
+        f.write(json.dumps(entry, sort_keys=True) + "\n")
+
+
+def compare(current: Dict[str, Dict[str, float]], previous: Dict[str, Dict[str, float]],
+            threshold: float) -> Dict[str, float]:
+    """Cases whose median grew by more than ``threshold`` (ratio new/old)"""
+    regressions = {}
+    for name, stats in current.items():
+        before = previous.get(name)
+        if before and before["median_us"] > 0:
+            ratio = stats["median_us"] / before["median_us"]
+            if ratio > 1 + threshold:
+                regressions[name] = round(ratio, 2)
+    return regressions
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Credential verification against a local RADIUS stand-in
+
+Starts hostapd as a standalone RADIUS server (``driver=none``) with its
+internal EAP server configured for PEAP/MSCHAPv2, then times
+``verify_credentials`` with good and bad credentials. Needs ``hostapd``,
+``eapol_test`` and ``openssl``; no root or Wi-Fi hardware required.
+
+    python benchmarks/radius_standin.py --iterations 20
+
+Point ``--server``/``--secret`` at an existing FreeRADIUS instance to skip
+starting hostapd.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.hwsim_rig import TEST_PASSWORD, TEST_USERNAME, LineTimer, write_eap_server_files
+from wirelesssgx.eaptest import CredentialVerificationError, verify_credentials
+
+RADIUS_PORT = 18120
+RADIUS_SECRET = "testing123"
+
+HOSTAPD_RADIUS_CONF = """driver=none
+interface=wsgx-radius
+radius_server_clients={clients_file}
+radius_server_auth_port={port}
+eap_server=1
+eap_user_file={eap_user_file}
+ca_cert={cert}
+server_cert={cert}
+private_key={key}
+"""
+
+
+def start_standin(workdir: Path) -> subprocess.Popen:
+    """Run hostapd as a RADIUS server on localhost"""
+    files = write_eap_server_files(workdir)
+    clients_file = workdir / "radius_clients"
+    clients_file.write_text(f"127.0.0.1/32 {RADIUS_SECRET}\n")
+
+    conf = workdir / "hostapd-radius.conf"
+    conf.write_text(HOSTAPD_RADIUS_CONF.format(clients_file=clients_file, port=RADIUS_PORT, **files))
+
+    hostapd = subprocess.Popen(["hostapd", str(conf)], stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT, text=True)
+    # hostapd has no readiness message for driver=none; give it a moment
+    LineTimer(hostapd, {"ready": "RADIUS"}).wait("ready", 1.0)
+    time.sleep(0.2)
+    if hostapd.poll() is not None:
+        raise SystemExit("hostapd failed to start")
+    return hostapd
+
+
+def time_verification(username: str, password: str, server: str, secret: str,
+                      iterations: int) -> dict:
+    """Time verification runs, recording outcomes"""
+    durations = []
+    accepted = 0
+    for _ in range(iterations):
+        start = time.monotonic()
+        try:
+            verify_credentials(username, password, server, secret)
+            accepted += 1
+        except CredentialVerificationError:
+            pass
+        durations.append(time.monotonic() - start)
+
+    return {
+        "iterations": iterations,
+        "accepted": accepted,
+        "median": statistics.median(durations),
+        "max": max(durations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--server", help="Use an existing RADIUS server (host[:port])")
+    parser.add_argument("--secret", default=RADIUS_SECRET)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="wsgx-radius-") as workdir:
+        hostapd = None if args.server else start_standin(Path(workdir))
+        server = args.server or f"127.0.0.1:{RADIUS_PORT}"
+        try:
+            report = {
+                "good_credentials": time_verification(TEST_USERNAME, TEST_PASSWORD, server,
+                                                      args.secret, args.iterations),
+                "bad_credentials": time_verification(TEST_USERNAME, "wrong-password", server,
+                                                     args.secret, args.iterations),
+            }
+        finally:
+            if hostapd:
+                hostapd.terminate()
+                hostapd.wait()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Cold-start import budget for CLI subcommands
+
+Runs ``python -X importtime -m wirelesssgx <command> --help`` in a fresh
+interpreter and fails if the import graph pulls in the TUI stack or its
+total import time exceeds the budget. A real ``status`` run is measured
+the same way, with its system commands answered by a ``SimulatedSystem``;
+it checks for credentials, so keyring is part of its budget. Override the
+budget (milliseconds) with ``WIRELESSSGX_IMPORT_BUDGET_MS``.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IMPORT_BUDGET_MS = float(os.environ.get("WIRELESSSGX_IMPORT_BUDGET_MS", "150"))
+
+# Modules that must never be imported just to run a CLI subcommand
+HEAVY_MODULES = ("textual", "rich", "requests", "Crypto", "keyring", "cryptography")
+# ``status`` reports whether credentials are saved, which needs keyring
+STATUS_HEAVY_MODULES = tuple(m for m in HEAVY_MODULES if m != "keyring")
+
+# Runs ``wirelesssgx status`` against a simulated system; only the imports
+# after the marker count
+STATUS_DRIVER = """
+import sys
+from pathlib import Path
+from wirelesssgx import runner
+from wirelesssgx.sandbox import SimulatedSystem
+system = SimulatedSystem(root=Path(sys.argv[1]))
+system.add_access_point()
+runner.set_system(system)
+print("-- status --", file=sys.stderr, flush=True)
+sys.argv = ["wirelesssgx", "status"]
+from wirelesssgx.__main__ import main
+main()
+"""
+
+
+def _parse_import_time(stderr: str) -> Tuple[float, Dict[str, int]]:
+    modules = {}
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+        # Top-level imports are not indented; their cumulative times add up
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+    
+    return total_us / 1000, modules
+
+
+def measure_import_time(*args: str) -> Tuple[float, Dict[str, int]]:
+    """Return (total ms, {module: cumulative us}) for a cold start"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "wirelesssgx", *args],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        timeout=60,
+    )
+    return _parse_import_time(result.stderr)
+
+
+def measure_status_import_time(tmp_path: Path) -> Tuple[float, Dict[str, int]]:
+    """Like ``measure_import_time`` for a real ``status`` run"""
+    env = dict(
+        os.environ,
+        HOME=str(tmp_path / "home"),
+        XDG_RUNTIME_DIR=str(tmp_path / "run"),
+        XDG_STATE_HOME=str(tmp_path / "state"),
+        WIRELESSSGX_ROOT=str(tmp_path),
+        WIRELESSSGX_PROC_WIRELESS=str(tmp_path / "proc" / "net" / "wireless"),
+        # Keep desktop secret-service backends out of the measurement
+        PYTHON_KEYRING_BACKEND="keyring.backends.null.Keyring",
+    )
+    for name in ("WIRELESSSGX_STATE_FILE", "WIRELESSSGX_HISTORY_FILE", "WIRELESSSGX_TEXTFILE_DIR"):
+        env.pop(name, None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STATUS_DRIVER, str(tmp_path)],
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        env=env,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert "Not connected to Wireless@SGx" in result.stdout
+    return _parse_import_time(result.stderr.partition("-- status --")[2])
+
+
+def test_status_does_not_import_tui_stack():
+    _, modules = measure_import_time("status", "--help")
+    
+    heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+    assert not heavy, f"'status' imported heavy modules: {heavy}"
+
+
+def test_status_run_skips_tui_stack_within_budget(tmp_path):
+    runs = [measure_status_import_time(tmp_path) for _ in range(3)]
+    total_ms = min(total for total, _ in runs)
+    modules = runs[0][1]
+    
+    heavy = sorted(m for m in modules if m.split(".")[0] in STATUS_HEAVY_MODULES)
+    assert not heavy, f"'status' imported heavy modules: {heavy}"
+    assert "keyring" in modules
+    assert total_ms <= IMPORT_BUDGET_MS, (
+        f"'status' cold start imports took {total_ms:.1f}ms "
+        f"(budget {IMPORT_BUDGET_MS:.0f}ms, keyring included)"
+    )
+
+
+@pytest.mark.parametrize("command", ["status", "show", "connect"])
+def test_cold_start_within_budget(command):
+    # Take the best of a few runs to smooth out scheduler noise
+    total_ms = min(measure_import_time(command, "--help")[0] for _ in range(3))
+    
+    assert total_ms <= IMPORT_BUDGET_MS, (
+        f"'{command}' cold start imports took {total_ms:.1f}ms "
+        f"(budget {IMPORT_BUDGET_MS:.0f}ms)"
+    )
+
+
+def test_cached_status_skips_cli(tmp_path, monkeypatch):
+    state_file = tmp_path / "state.json"
+    state_file.write_text('{"timestamp": 9e12, "connected": true, "signal": 70}')
+    monkeypatch.setenv("WIRELESSSGX_STATE_FILE", str(state_file))
+    
+    _, modules = measure_import_time("status", "--cached", "--format={signal}")
+    
+    loaded = sorted(m for m in modules if m.startswith("wirelesssgx") or m.split(".")[0] == "click")
+    assert loaded == ["wirelesssgx", "wirelesssgx.statecache"]
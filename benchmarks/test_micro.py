@@ -0,0 +1,34 @@
+"""Smoke test for the microbenchmark cases
+
+Runs every case once so they keep working as the code changes; timing
+them is left to ``python -m benchmarks.micro``.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.micro import cases  # noqa: E402
+from benchmarks.micro.harness import CASES, compare  # noqa: E402
+
+
+@pytest.mark.parametrize("name", [name for name in CASES if not name.startswith("cli/")])
+def test_case_runs(name):
+    with CASES[name]() as func:
+        func()
+
+
+def test_cli_cases_cover_every_command():
+    from wirelesssgx.cli import cli
+
+    assert set(cases.CLI_COMMANDS) == set(cli.commands)
+
+
+def test_compare_flags_slower_medians():
+    previous = {"a": {"median_us": 100.0}, "b": {"median_us": 100.0}}
+    current = {"a": {"median_us": 130.0}, "b": {"median_us": 110.0}, "c": {"median_us": 1.0}}
+
+    assert compare(current, previous, threshold=0.25) == {"a": 1.3}
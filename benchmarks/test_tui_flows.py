@@ -0,0 +1,263 @@
+"""Latency budget for scripted TUI flows
+
+Drives the app headlessly with Textual's pilot through new registration,
+account retrieval, auto-connect and credential management, with the ESSA
+client, credential storage and network layers replaced by in-memory
+fakes. Time-to-interactive and each transition (from the click until the
+next screen is up and idle, or the step's result is shown) are compared
+with ``tui_baselines.json``; a run fails when any of them exceeds its
+baseline by more than ``WIRELESSSGX_TUI_TOLERANCE`` (default 3x).
+
+Re-record the baselines on a quiet machine with
+``WIRELESSSGX_UPDATE_BASELINES=1 pytest benchmarks/test_tui_flows.py``.
+"""
+
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pytest
+
+from wirelesssgx import app as app_module
+from wirelesssgx import runner
+from wirelesssgx.runner import CommandResult
+from wirelesssgx.screens import autoconnect, credentials, otp, success
+
+BASELINES = Path(__file__).resolve().parent / "tui_baselines.json"
+TOLERANCE = float(os.environ.get("WIRELESSSGX_TUI_TOLERANCE", "3"))
+UPDATE_BASELINES = os.environ.get("WIRELESSSGX_UPDATE_BASELINES", "").lower() in ('1', 'true', 'yes', 'on')
+REPEATS = 3
+SIZE = (120, 60)
+
+CREDENTIALS = {"username": "user@singtel", "password": "secret", "isp": "singtel"}
+
+
+class FakeClient:
+    """ESSA client that answers immediately"""
+
+    def __init__(self, isp="singtel"):
+        self.isp = isp
+
+    def request_registration(self, mobile, dob, retrieve_mode=False, deadline=None):
+        return "fake-success-code"
+
+    def validate_otp(self, mobile, dob, otp, success_code, retrieve_mode=False, deadline=None):
+        return {"userid": CREDENTIALS["username"].encode()}
+
+    def decrypt_credentials(self, encrypted_data, otp):
+        return CREDENTIALS["username"], CREDENTIALS["password"]
+
+
+class FakeStorage:
+    """Credential store shared by every screen of one app"""
+
+    saved: Optional[Dict[str, str]] = None
+
+    def get_credentials(self):
+        return dict(FakeStorage.saved) if FakeStorage.saved else None
+
+    def has_credentials(self):
+        return FakeStorage.saved is not None
+
+    def save_credentials(self, username, password, isp="singtel", deadline=None):
+        FakeStorage.saved = {"username": username, "password": password, "isp": isp}
+        return True
+
+    def delete_credentials(self):
+        FakeStorage.saved = None
+        return True
+
+
+class FakeNetwork:
+    """NetworkManager backend that is always in range and connects"""
+
+    ssid = "Wireless@SGx"
+    connection_name = "Wireless@SGx"
+    activations = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def detect_network_manager(self, deadline=None):
+        return "networkmanager"
+
+    def configure_network(self, username, password, backend=None, deadline=None):
+        return True
+
+    def get_profile_info(self, deadline=None):
+        return {"connection.autoconnect": "yes", "IP4.ADDRESS": "10.0.0.2/24"}
+
+    def list_access_points(self, rescan=False, deadline=None):
+        return [{"ssid": self.ssid, "bssid": "00:11:22:33:44:55", "signal": 70,
+                 "device": "", "active": True}]
+
+    def scan_for_ssid(self, max_age=0, scan_wait=0, deadline=None):
+        return self.list_access_points()
+
+    def activate(self, deadline=None):
+        FakeNetwork.activations += 1
+        return {"connected": True, "in_range": True, "bssid": "00:11:22:33:44:55"}
+
+    def test_connection(self, deadline=None):
+        return True
+
+    def get_manual_config_instructions(self, username, password):
+        return ""
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    """Replace the client, storage and network layers everywhere"""
+    FakeStorage.saved = None
+    FakeNetwork.activations = 0
+    monkeypatch.setattr(otp, "WirelessSGXClient", FakeClient)
+    for module in (app_module, success, credentials):
+        monkeypatch.setattr(module, "SecureStorage", FakeStorage)
+    for module in (app_module, success, credentials, autoconnect):
+        monkeypatch.setattr(module, "NetworkManager", FakeNetwork)
+
+    async def run(cmd, **kwargs):
+        return CommandResult(list(cmd), 0, "", "", 0.0)
+
+    monkeypatch.setattr(runner, "run", run)
+    monkeypatch.setenv("WIRELESSSGX_LINGER", "0")
+    return FakeStorage
+
+
+class FlowTimer:
+    """Times transitions of one scripted run"""
+
+    def __init__(self, pilot):
+        self.pilot = pilot
+        self.app = pilot.app
+        self.timings: Dict[str, float] = {}
+
+    async def wait_until(self, condition: Callable[[], bool], timeout: float = 10.0) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                raise AssertionError(f"Timed out waiting on {self.app.screen!r}")
+            await self.pilot.pause(0.005)
+        await self.pilot.pause()
+
+    def on_screen(self, name: str) -> Callable[[], bool]:
+        return lambda: type(self.app.screen).__name__ == name
+
+    def shows(self, selector: str, text: str) -> Callable[[], bool]:
+        def condition():
+            try:
+                return text in str(self.app.screen.query_one(selector).render())
+            except Exception:
+                return False
+        return condition
+
+    async def step(self, name: str, action, condition: Callable[[], bool]) -> None:
+        start = time.perf_counter()
+        await action()
+        await self.wait_until(condition)
+        self.timings[name] = (time.perf_counter() - start) * 1000
+
+
+async def run_flow(script) -> Dict[str, float]:
+    start = time.perf_counter()
+    app = app_module.WirelessSGXApp()
+    async with app.run_test(size=SIZE) as pilot:
+        timer = FlowTimer(pilot)
+        await timer.wait_until(timer.on_screen("WelcomeScreen"))
+        timer.timings["time_to_interactive"] = (time.perf_counter() - start) * 1000
+        await script(timer)
+        await pilot.pause()
+    return timer.timings
+
+
+def registration_script(retrieve: bool):
+    async def script(timer: FlowTimer):
+        pilot = timer.pilot
+        button = "#retrieve-account" if retrieve else "#new-registration"
+        await timer.step("open_register", lambda: pilot.click(button), timer.on_screen("RegisterScreen"))
+
+        await pilot.click("#mobile")
+        await pilot.press(*"91234567")
+        await pilot.click("#dob")
+        await pilot.press(*"01012000")
+        timer.app.screen.query_one("#isp").value = "Singtel"
+        await pilot.pause()
+
+        await timer.step("request_otp", lambda: pilot.click("#continue"),
+                         timer.shows("#status", "OTP sent"))
+        await pilot.click("#otp-input")
+        await pilot.press(*"123456")
+        await timer.step("verify_otp", lambda: pilot.click("#verify"), timer.on_screen("SuccessScreen"))
+        await timer.step("save_and_connect", pilot.pause,
+                         timer.shows("#network-status", "Connected to Wireless@SGx"))
+    return script
+
+
+async def autoconnect_script(timer: FlowTimer):
+    # With no linger the screen may close before it can be observed, so
+    # time the round trip: connected and back on the welcome screen
+    activations = FakeNetwork.activations
+    await timer.step("auto_connect", lambda: timer.pilot.click("#auto-connect"),
+                     lambda: FakeNetwork.activations > activations and timer.on_screen("WelcomeScreen")())
+
+
+async def credentials_script(timer: FlowTimer):
+    pilot = timer.pilot
+    await timer.step("open_credentials", lambda: pilot.click("#manage-credentials"),
+                     lambda: bool(timer.app.screen.query(".credentials-box")))
+    await timer.step("test_connection", lambda: pilot.click("#test"),
+                     timer.shows("#status", "Connected to Wireless@SGx"))
+    await timer.step("connect_now", lambda: pilot.click("#connect"),
+                     timer.shows("#status", "Connected to Wireless@SGx!"))
+    await timer.step("delete_credentials", lambda: pilot.click("#delete"),
+                     lambda: bool(timer.app.screen.query("#no-credentials")))
+    await timer.step("back_to_welcome", lambda: pilot.click("#back"), timer.on_screen("WelcomeScreen"))
+
+
+FLOWS = {
+    "new_registration": (registration_script(retrieve=False), False),
+    "retrieve_account": (registration_script(retrieve=True), False),
+    "auto_connect": (autoconnect_script, True),
+    "credentials": (credentials_script, True),
+}
+
+
+def load_baselines() -> Dict[str, Dict[str, float]]:
+    if BASELINES.exists():
+        return json.loads(BASELINES.read_text())
+    return {}
+
+
+@pytest.mark.parametrize("flow", list(FLOWS))
+def test_flow_within_baseline(flow, fakes, record_property):
+    script, needs_credentials = FLOWS[flow]
+
+    best: Dict[str, float] = {}
+    for _ in range(REPEATS):
+        fakes.saved = dict(CREDENTIALS) if needs_credentials else None
+        timings = asyncio.run(run_flow(script))
+        for name, ms in timings.items():
+            best[name] = min(ms, best.get(name, ms))
+
+    for name, ms in best.items():
+        record_property(name, round(ms, 1))
+
+    baselines = load_baselines()
+    if UPDATE_BASELINES:
+        baselines[flow] = {name: round(ms, 1) for name, ms in best.items()}
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return
+
+    expected = baselines.get(flow)
+    if expected is None:
+        pytest.skip(f"No baseline for {flow}; record one with WIRELESSSGX_UPDATE_BASELINES=1")
+
+    slow = {
+        name: f"{best[name]:.0f}ms > {TOLERANCE:g} x {limit:.0f}ms"
+        for name, limit in expected.items()
+        if name in best and best[name] > limit * TOLERANCE
+    }
+    assert not slow, f"{flow} regressed: {slow}"
@@ -13,6 +13,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/siva-sub/wireless-sgx-linux-tui",
     packages=find_packages(),
+    package_data={"wirelesssgx": ["*.tcss"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -22,7 +23,7 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=[
-        "textual>=0.41.0",
+        "textual>=0.47.0",
         "pycryptodome>=3.19.0",
         "keyring>=24.0.0",
         "python-dateutil>=2.8.2",
@@ -39,7 +40,7 @@ setup(
     },
     entry_points={
         "console_scripts": [
-            "wirelesssgx=wirelesssgx.app:main",
+            "wirelesssgx=wirelesssgx.__main__:main",
         ],
     },
 )
\ No newline at end of file
@@ -0,0 +1,25 @@
+"""Shared fixtures for the test suite"""
+
+import pytest
+
+
+class FakeClock:
+    """Monotonic clock stand-in that only moves when ``now`` is changed"""
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def isolated_history(tmp_path, monkeypatch):
+    """Keep connection history out of the real ``~/.local/state``"""
+    monkeypatch.setenv("XDG_STATE_HOME", str(tmp_path / "state"))
+    monkeypatch.setenv("WIRELESSSGX_HISTORY_FILE", str(tmp_path / "history.db"))
@@ -0,0 +1,110 @@
+"""Tests for ESSA record/replay cassettes"""
+
+import codecs
+import datetime
+import json
+import time
+
+import pytest
+import requests
+from Crypto.Cipher import AES
+
+from wirelesssgx import cassette
+from wirelesssgx.cassette import RecordingTransport, ReplayTransport
+from wirelesssgx.core import SGT, HTTPError, WirelessSGXClient
+
+OTP = "654321"
+MOBILE = "6591234567"
+USERNAME, PASSWORD = "realuser@singtel", "Hunter2Password"
+# Days in the past, so only the server's date can find the key
+SERVER_DATE = "Mon, 12 Oct 2026 17:30:00 GMT"
+
+
+class FakeResponse:
+    def __init__(self, body, headers):
+        self.status_code = 200
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self._body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeESSA:
+    """ESSA endpoint that encrypts the credentials like the real one"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        headers = {"Date": SERVER_DATE, "Content-Type": "application/json", "Set-Cookie": "x"}
+        api = params["api"]
+        if api == "create_user_r12x1a":
+            return FakeResponse({"status": {"resultcode": 1100}, "api": api, "version": "2.6",
+                                 "body": {"success_code": "real-success-code"}}, headers)
+
+        client = WirelessSGXClient(transport=self)
+        date = datetime.datetime(2026, 10, 13, 1, 30, tzinfo=SGT)
+        key = client._build_decrypt_key(date, params["otp"])
+        body = {"userid": USERNAME, "iv": "0123456789ab"}
+        for field, plaintext in (("userid", USERNAME), ("password", PASSWORD)):
+            tag = b"t" * 16
+            aes = AES.new(key, AES.MODE_CCM, body["iv"].encode())
+            aes.update(tag)
+            body[f"enc_{field}"] = codecs.encode(aes.encrypt(plaintext.encode()), "hex").decode()
+            body[f"tag_{field}"] = tag.hex()
+        return FakeResponse({"status": {"resultcode": 1100}, "api": api, "version": "2.8",
+                             "body": body}, headers)
+
+
+def register(client, otp=OTP):
+    success_code = client.request_registration(MOBILE, "01012000")
+    encrypted = client.validate_otp(MOBILE, "01012000", otp, success_code)
+    return client.decrypt_credentials(encrypted, otp)
+
+
+def test_server_date_is_used_for_decryption():
+    assert register(WirelessSGXClient(transport=FakeESSA())) == (USERNAME, PASSWORD)
+
+
+def test_recorded_cassette_is_redacted_and_replays(tmp_path):
+    path = tmp_path / "essa.json"
+    register(WirelessSGXClient(transport=RecordingTransport(path, inner=FakeESSA())))
+
+    text = path.read_text()
+    for secret in (MOBILE, OTP, "realuser", PASSWORD, "real-success-code", "Set-Cookie"):
+        assert secret not in text
+    assert SERVER_DATE in text
+
+    replay = ReplayTransport(path)
+    username, password = register(WirelessSGXClient(transport=replay), otp=cassette.REDACTED_OTP)
+    assert (len(username), len(password)) == (len(USERNAME), len(PASSWORD))
+    assert username.endswith("@singtel")
+    assert replay.remaining == 0
+
+    # Nothing left to serve
+    with pytest.raises(HTTPError):
+        WirelessSGXClient(transport=replay).request_registration(MOBILE, "01012000")
+
+
+def test_replay_timing_and_env(tmp_path, monkeypatch):
+    path = tmp_path / "essa.json"
+    register(WirelessSGXClient(transport=RecordingTransport(path, inner=FakeESSA())))
+    data = json.loads(path.read_text())
+    for interaction in data["interactions"]:
+        interaction["elapsed"] = 0.2
+    path.write_text(json.dumps(data))
+
+    monkeypatch.setenv("WIRELESSSGX_REPLAY", str(path))
+    monkeypatch.setenv("WIRELESSSGX_REPLAY_TIMING", "1")
+    client = WirelessSGXClient()
+    assert isinstance(client.transport, ReplayTransport)
+
+    start = time.monotonic()
+    register(client, otp=cassette.REDACTED_OTP)
+    assert time.monotonic() - start >= 0.4
@@ -0,0 +1,90 @@
+"""Tests for the connection state machine"""
+
+from wirelesssgx import connection
+from wirelesssgx.connection import ConnectionStateMachine, parse_device_event
+
+
+class FakeNetwork:
+    """Stands in for NetworkManager with scripted outcomes"""
+
+    ssid = "Wireless@SGx"
+
+    def __init__(self, configured=True, visible=True, connected=True, ip="10.0.0.2/24"):
+        self.configured = configured
+        self.visible = visible
+        self.connected = connected
+        self.ip = ip
+
+    def configure_network(self, username, password, backend=None, deadline=None):
+        return self.configured
+
+    def scan_for_ssid(self, deadline=None):
+        if not self.visible:
+            return []
+        return [{"ssid": self.ssid, "bssid": "00:11:22:33:44:55", "signal": 70,
+                 "device": "", "active": False}]
+
+    def activate(self, deadline=None):
+        return {"connected": self.connected, "in_range": self.visible, "bssid": None}
+
+    def get_profile_info(self, deadline=None):
+        return {"IP4.ADDRESS": self.ip} if self.ip else {}
+
+    def test_connection(self, deadline=None):
+        return False
+
+
+def test_parse_device_event():
+    assert parse_device_event("wlan0: connecting (need authentication)\n") == connection.AUTHENTICATING
+    assert parse_device_event("wlan0: connecting (getting IP configuration)") == connection.IP_CONFIG
+    assert parse_device_event("wlan0: connected") is None
+    assert parse_device_event("wlan0: using connection 'Wireless@SGx'") is None
+
+
+def test_machine_only_moves_forward():
+    seen = []
+    machine = ConnectionStateMachine(on_change=lambda m: seen.append(m.state))
+
+    assert machine.advance(connection.CONFIGURING)
+    assert machine.advance(connection.AUTHENTICATING)
+    assert not machine.advance(connection.ACTIVATING)
+    assert machine.advance(connection.VERIFIED)
+    assert not machine.fail("late failure")
+
+    assert seen == [connection.CONFIGURING, connection.AUTHENTICATING, connection.VERIFIED]
+    assert machine.done
+
+
+def test_connect_reaches_verified_with_ip():
+    machine = ConnectionStateMachine()
+
+    assert connection.connect(FakeNetwork(), "user", "pass", machine) == connection.VERIFIED
+    assert machine.detail == "10.0.0.2/24"
+    assert [state for state, _ in machine.history] == [
+        connection.CONFIGURING, connection.ACTIVATING, connection.VERIFIED
+    ]
+
+
+def test_connect_out_of_range_skips_activation():
+    machine = ConnectionStateMachine()
+
+    assert connection.connect(FakeNetwork(visible=False), "user", "pass", machine) == connection.OUT_OF_RANGE
+    assert machine.stage == connection.CONFIGURING
+
+
+def test_connect_reports_failed_stage():
+    machine = ConnectionStateMachine()
+    assert connection.connect(FakeNetwork(configured=False), "user", "pass", machine) == connection.FAILED
+    assert machine.stage == connection.CONFIGURING
+
+    machine = ConnectionStateMachine()
+    assert connection.connect(FakeNetwork(connected=False), "user", "pass", machine) == connection.FAILED
+    assert machine.stage == connection.ACTIVATING
+    assert "❌ Activating" in connection.render_progress(machine)
+
+
+def test_linger_time_from_env(monkeypatch):
+    monkeypatch.setenv("WIRELESSSGX_LINGER", "0")
+    assert connection.linger_time() == 0.0
+    monkeypatch.setenv("WIRELESSSGX_LINGER", "bogus")
+    assert connection.linger_time() == connection.DEFAULT_LINGER
@@ -0,0 +1,96 @@
+"""Tests for the reconnect supervisor against a simulated backend"""
+
+import sys
+import time
+
+from wirelesssgx.daemon import OUT_OF_RANGE_POLL, EventSource, ReconnectSupervisor
+
+
+class FakeBackend:
+    def __init__(self, connected=False, visible=True, succeed_after=0):
+        self.connected = connected
+        self.visible = visible
+        self.succeed_after = succeed_after
+        self.activations = 0
+
+    def probe(self):
+        return self.connected, self.visible
+
+    def activate(self):
+        self.activations += 1
+        self.connected = self.activations > self.succeed_after
+        return self.connected
+
+
+def test_idle_when_connected(clock):
+    backend = FakeBackend(connected=True)
+    supervisor = ReconnectSupervisor(backend, clock=clock)
+
+    assert supervisor.step() is None
+    assert backend.activations == 0
+    assert supervisor.state == ReconnectSupervisor.CONNECTED
+
+
+def test_waits_for_ssid_when_out_of_range(clock):
+    backend = FakeBackend(visible=False)
+    supervisor = ReconnectSupervisor(backend, clock=clock)
+
+    assert supervisor.step() == OUT_OF_RANGE_POLL
+    assert backend.activations == 0
+
+
+def test_bounded_exponential_backoff_then_reconnect(clock):
+    backend = FakeBackend(succeed_after=5)
+    supervisor = ReconnectSupervisor(backend, clock=clock, base_delay=2, max_delay=10)
+
+    delays = []
+    while True:
+        delay = supervisor.step()
+        if delay is None:
+            break
+        delays.append(delay)
+        clock.now += delay
+
+    assert delays == [2, 4, 8, 10, 10]
+    stats = supervisor.stats()
+    assert stats["reconnects"] == 1
+    assert stats["attempts"] == 6
+    assert stats["last_reconnect_latency"] == 34
+    assert supervisor.failures == 0
+
+
+def test_no_attempt_before_backoff_expires(clock):
+    backend = FakeBackend(succeed_after=10)
+    supervisor = ReconnectSupervisor(backend, clock=clock, base_delay=2)
+
+    supervisor.step()
+    clock.now += 1
+    assert supervisor.step() == 1
+    assert backend.activations == 1
+
+
+def test_event_source_wakes_on_monitor_output():
+    events = EventSource([[sys.executable, "-c", "print('device wlan0: connected')"]])
+    try:
+        assert events.wait(5, settle=0.05)
+        # The monitor has exited, so the next wait just times out
+        assert not events.wait(0.01)
+    finally:
+        events.close()
+
+
+def test_event_source_drains_bursts_and_sees_later_events():
+    monitor = ("import sys, time\n"
+               "print('a\\nb\\nc', flush=True)\n"
+               "time.sleep(0.3)\n"
+               "print('d', flush=True)\n"
+               "time.sleep(5)\n")
+    events = EventSource([[sys.executable, "-c", monitor]])
+    try:
+        assert events.wait(5, settle=0, max_settle=0)
+        start = time.monotonic()
+        assert events.wait(5, settle=0)
+        assert time.monotonic() - start < 2
+        assert not events.wait(0.1)
+    finally:
+        events.close()
@@ -0,0 +1,69 @@
+"""Tests for flow deadlines and cancellation"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from wirelesssgx import runner
+from wirelesssgx.deadline import Deadline, DeadlineExceeded, FlowCancelled, bounded
+
+
+def test_timeout_is_capped_by_remaining_budget(clock):
+    deadline = Deadline(10, clock=clock)
+
+    assert deadline.timeout(30) == 10
+    clock.now += 8
+    assert deadline.timeout(30) == pytest.approx(2)
+    assert bounded(None, 30) == 30
+
+    clock.now += 5
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout(30)
+
+
+def test_child_inherits_expiry_and_cancellation(clock):
+    parent = Deadline(5, clock=clock)
+    child = parent.child(60)
+
+    assert child.remaining() == 5
+    parent.cancel("Back pressed")
+    with pytest.raises(FlowCancelled):
+        child.check()
+
+
+def test_closed_child_detaches_from_parent():
+    parent = Deadline()
+    with parent.child() as child:
+        pass
+    parent.cancel()
+
+    assert not child.cancelled
+
+
+def test_sleep_wakes_on_cancel():
+    deadline = Deadline()
+    threading.Timer(0.2, deadline.cancel).start()
+
+    start = time.monotonic()
+    with pytest.raises(FlowCancelled):
+        deadline.sleep(30)
+    assert time.monotonic() - start < 5
+
+
+def test_cancel_kills_running_command():
+    deadline = Deadline()
+    threading.Timer(0.5, deadline.cancel).start()
+
+    start = time.monotonic()
+    with pytest.raises(FlowCancelled):
+        runner.run_sync([sys.executable, "-c", "import time; time.sleep(30)"], deadline=deadline)
+    assert time.monotonic() - start < 10
+
+
+def test_expired_budget_kills_running_command():
+    deadline = Deadline(0.5)
+
+    with pytest.raises(DeadlineExceeded):
+        runner.run_sync([sys.executable, "-c", "import time; time.sleep(30)"], deadline=deadline)
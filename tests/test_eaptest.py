@@ -0,0 +1,54 @@
+"""Tests for eapol_test based credential verification"""
+
+import os
+import stat
+
+import pytest
+
+from wirelesssgx.eaptest import CredentialVerificationError, parse_server, verify_credentials
+from wirelesssgx.network import NetworkManager
+
+
+@pytest.fixture
+def fake_eapol_test(tmp_path, monkeypatch):
+    """Install a fake eapol_test that accepts only the password 'good'"""
+    script = tmp_path / "eapol_test"
+    script.write_text(
+        "#!/bin/sh\n"
+        'if grep -q \'password="good"\' "$2"; then echo SUCCESS; exit 0; fi\n'
+        "echo 'RADIUS message: code=3 (Access-Reject)'\n"
+        "echo FAILURE\n"
+        "exit 255\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_parse_server():
+    assert parse_server("radius.example") == ("radius.example", 1812)
+    assert parse_server("10.0.0.1:18120") == ("10.0.0.1", 18120)
+    assert parse_server("[::1]:1645") == ("::1", 1645)
+
+
+def test_verify_accepts_good_credentials(fake_eapol_test):
+    assert verify_credentials("user", "good", "127.0.0.1", "secret") >= 0
+
+
+def test_verify_rejects_bad_credentials(fake_eapol_test):
+    with pytest.raises(CredentialVerificationError, match="credentials rejected"):
+        verify_credentials("user", "bad", "127.0.0.1", "secret")
+
+
+def test_bad_credentials_leave_existing_config_untouched(fake_eapol_test, tmp_path):
+    config = tmp_path / "etc" / "wpa_supplicant" / "wpa_supplicant.conf"
+    config.parent.mkdir(parents=True)
+    config.write_text("previous")
+
+    network = NetworkManager(root=str(tmp_path), radius_server="127.0.0.1", radius_secret="s")
+    with pytest.raises(CredentialVerificationError):
+        network.configure_network("user", "bad", backend="wpa_supplicant")
+    assert config.read_text() == "previous"
+
+    assert network.configure_network("user", "good", backend="wpa_supplicant")
+    assert 'password="good"' in config.read_text()
+    assert stat.S_IMODE(config.stat().st_mode) == 0o600
@@ -0,0 +1,121 @@
+"""Tests for the connection history store and 'wirelesssgx history'"""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from wirelesssgx import history
+from wirelesssgx.cli import cli
+from wirelesssgx.history import HistoryStore, day_starts
+from wirelesssgx.network import NetworkManager
+from wirelesssgx.sandbox import Sandbox
+
+HOUR = 3600.0
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(str(tmp_path / "history.db")) as store:
+        yield store
+
+
+def test_uptime_is_split_at_midnight(store):
+    starts = day_starts(3, 0)
+    now = starts[2] + 12 * HOUR
+    # Up from 22:00 two days ago until 02:00 the next day, then all of today
+    store.record_link(True, "aa", ts=starts[0] + 22 * HOUR)
+    store.record_link(True, "bb", ts=starts[0] + 23 * HOUR)  # roamed, still up
+    store.record_link(False, ts=starts[1] + 2 * HOUR)
+    store.record_link(True, "aa", ts=starts[2])
+
+    uptime = [day["uptime"] for day in store.uptime_per_day(3, now=now)]
+    assert uptime == [2 * HOUR, 2 * HOUR, 12 * HOUR]
+    assert store.uptime_per_day(3, now=now)[2]["ratio"] == 1.0
+    # The link was already up when a shorter window starts
+    assert store.uptime_per_day(1, now=starts[1] + HOUR)[0]["uptime"] == HOUR
+
+
+def test_link_changes_are_only_recorded_once(store):
+    assert not store.record_link(False)
+    assert store.record_link(True, "aa")
+    assert not store.record_link(True, "aa")
+    assert store.record_link(True, "bb")
+    assert store.record_link(False, "bb")
+    assert not store.record_link(False)
+    assert store.db.execute("SELECT count(*) FROM links").fetchone()[0] == 3
+
+
+def test_failure_rate_and_slowest_connects(store):
+    store.record_attempt(True, 3.0, "aa")
+    store.record_attempt(True, 12.5, "bb")
+    store.record_attempt(False, 90.0, "aa", "timeout")
+    store.record_attempt(False, 1.0, "aa", "rejected")
+    store.record_attempt(False, 1.2, "aa", "rejected")
+    store.record_attempt(True, 30.0, "cc", ts=0)  # outside the window
+
+    assert store.failure_rate(7) == {
+        "attempts": 5, "failures": 3, "rate": 0.6,
+        "reasons": {"rejected": 2, "timeout": 1},
+    }
+    assert [(a["bssid"], a["duration"]) for a in store.slowest_connects(1)] == [("bb", 12.5)]
+
+    plan = " ".join(row[-1] for row in store.db.execute(
+        "EXPLAIN QUERY PLAN SELECT ts FROM attempts WHERE profile = ? AND ts >= ?", ("x", 0)))
+    assert "attempts_profile_ts" in plan
+
+
+def test_compaction_drops_old_rows_but_keeps_link_state(store):
+    now = 1000 * 86400.0 + 12 * HOUR
+    store.record_link(True, "aa", ts=now - 600 * 86400)
+    store.record_attempt(True, 3.0, ts=now - 500 * 86400 - 60)
+    store.record_link(True, "bb", ts=now - 500 * 86400)
+
+    # Compacted on the first write already; not again within a day
+    assert not store.maybe_compact(now - 500 * 86400)
+    # The first write over a day later compacts
+    store.record_attempt(True, 3.0, ts=now)
+    assert store.db.execute("SELECT count(*) FROM attempts").fetchone()[0] == 1
+    assert store.db.execute("SELECT count(*) FROM links").fetchone()[0] == 1
+    assert not store.maybe_compact(now + 60)
+
+    # Still up on "bb" from before the retention period
+    assert store.uptime_per_day(1, now=now)[0]["ratio"] == 1.0
+    assert store.compact(now) == {"attempts": 0, "links": 0}
+
+
+def test_connects_are_recorded_and_reported():
+    with Sandbox() as sandbox:
+        sandbox.system.accounts = {"user@singtel": "secret"}
+        network = NetworkManager()
+        network.configure_network("user@singtel", "wrong")
+        network.activate()
+        network.configure_network("user@singtel", "secret")
+        network.activate()
+
+        result = CliRunner().invoke(cli, ["history", "--json"])
+        assert result.exit_code == 0, result.output
+        report = json.loads(result.output)
+        assert history.history_file_path().startswith(str(sandbox.prefix))
+
+    assert report["failures"] == {"attempts": 2, "failures": 1, "rate": 0.5,
+                                  "reasons": {"rejected": 1}}
+    assert report["slowest"][0]["bssid"] == "02:00:00:00:00:01"
+    assert report["uptime"][-1]["uptime"] >= 0
+    assert len(report["uptime"]) == 7
+
+
+def test_record_link_reuses_an_open_store(monkeypatch):
+    store = history.open_store()
+    opened = []
+    monkeypatch.setattr(history, "HistoryStore", lambda *args, **kwargs: opened.append(args))
+    try:
+        history.record_link(True, "aa", store=store)
+        history.record_link(True, "aa", store=store)
+        history.record_link(False, store=store)
+    finally:
+        store.close()
+
+    assert opened == []
+    with HistoryStore() as reopened:
+        assert reopened.db.execute("SELECT count(*) FROM links").fetchone()[0] == 2
@@ -0,0 +1,45 @@
+"""Tests for the offline NetworkManager keyfile backend"""
+
+import configparser
+import stat
+
+from wirelesssgx.keyfile import keyfile_path, provision, render_keyfile
+from wirelesssgx.network import NetworkManager
+
+
+def test_render_keyfile_802_1x_settings():
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read_string(render_keyfile(NetworkManager(fast_join=False), "user@wsg", "secret", "1234"))
+
+    assert parser["connection"]["uuid"] == "1234"
+    assert parser["wifi"]["ssid"] == "Wireless@SGx"
+    assert parser["wifi-security"]["key-mgmt"] == "wpa-eap"
+    assert dict(parser["802-1x"]) == {
+        "eap": "peap;",
+        "identity": "user@wsg",
+        "password": "secret",
+        "phase2-auth": "mschapv2",
+    }
+
+
+def test_render_keyfile_escapes_values():
+    text = render_keyfile(NetworkManager(fast_join=False), "a\\b", " lead\nline")
+
+    assert "identity=a\\\\b\n" in text
+    assert "password=\\slead\\nline\n" in text
+
+
+def test_provision_manifest_in_parallel(tmp_path):
+    manifest = [
+        {"root": str(tmp_path / f"rootfs{i}"), "username": f"user{i}", "password": "pw"}
+        for i in range(20)
+    ]
+    manifest.append({"root": str(tmp_path / "broken")})
+
+    results = provision(manifest, workers=4)
+
+    assert [r["ok"] for r in results] == [True] * 20 + [False]
+    assert "Missing manifest field" in results[-1]["error"]
+    path = keyfile_path(NetworkManager(root=manifest[7]["root"]))
+    assert "identity=user7" in path.read_text()
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
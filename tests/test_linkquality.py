@@ -0,0 +1,124 @@
+"""Tests for link quality sampling"""
+
+import asyncio
+import json
+import threading
+
+from click.testing import CliRunner
+
+from wirelesssgx.cli import cli
+from wirelesssgx.linkquality import LinkMonitor, RingBuffer, read_proc_wireless
+from wirelesssgx.network import NetworkManager
+from wirelesssgx.sandbox import Sandbox
+from wirelesssgx.storage import SecureStorage
+
+PROC_NET_WIRELESS = """\
+Inter-| sta-|   Quality        |   Discarded packets               | Missed | WE
+ face | tus | link level noise |  nwid  crypt   frag  retry   misc | beacon | 22
+ wlp2s0: 0000   54.  -56.  -256        0      0      0     12      3        7
+"""
+
+
+def test_ring_buffer_keeps_the_last_values():
+    buffer = RingBuffer(4)
+    assert buffer.stats() is None
+    for value in range(10):
+        buffer.append(value)
+
+    assert len(buffer) == 4
+    assert buffer.values() == [6, 7, 8, 9]
+    assert buffer.stats() == {"last": 9, "min": 6, "mean": 7.5, "p95": 9}
+    # Preallocated: appending never grows it
+    assert len(buffer._data) == 4
+
+
+def test_read_proc_wireless(tmp_path):
+    path = tmp_path / "wireless"
+    path.write_text(PROC_NET_WIRELESS)
+
+    assert read_proc_wireless("wlp2s0", str(path)) == {
+        "quality": 54.0, "level": -56.0, "noise": -256.0, "retries": 12, "missed_beacons": 7,
+    }
+    assert read_proc_wireless("wlan0", str(path)) is None
+    assert read_proc_wireless("wlp2s0", str(tmp_path / "missing")) is None
+
+
+def test_monitor_and_status_report_the_link():
+    with Sandbox() as sandbox:
+        SecureStorage().save_credentials("user@singtel", "secret")
+        network = NetworkManager()
+        network.configure_network("user@singtel", "secret")
+        network.activate()
+
+        monitor = LinkMonitor("wlan0", capacity=3)
+        for signal, retries in ((70, 0), (50, 4), (60, 0), (80, 2)):
+            sandbox.system.set_link_quality(signal, retries)
+            assert monitor.sample()
+        link = monitor.snapshot()
+        assert link["samples"] == 3
+        assert link["rssi"] == {"last": -60, "min": -75, "mean": -68.33, "p95": -60}
+        assert monitor.values("retries") == [4, 0, 2]
+        # ``iw`` is only asked once per BITRATE_INTERVAL
+        assert link["bitrate"]["last"] == 72.1 and sandbox.system.calls["iw"] == 1
+
+        status = json.loads(CliRunner().invoke(cli, ["status", "--json"]).output)
+        assert status["link"]["samples"] == 1
+        assert status["link"]["quality"]["last"] == 80
+        # status only reads /proc/net/wireless
+        assert status["link"]["bitrate"] is None and sandbox.system.calls["iw"] == 1
+
+        sandbox.system.drop_link()
+        assert not monitor.sample()
+        status = json.loads(CliRunner().invoke(cli, ["status", "--json"]).output)
+        assert status["link"] is None
+
+
+def test_credentials_screen_shows_a_sparkline(monkeypatch):
+    monkeypatch.setenv("WIRELESSSGX_LINK_INTERVAL", "0.05")
+    from textual.widgets import Sparkline
+    from wirelesssgx.app import WirelessSGXApp
+
+    async def scenario():
+        app = WirelessSGXApp()
+        async with app.run_test(size=(120, 60)) as pilot:
+            await app.push_screen("credentials")
+            await pilot.pause(0.5)
+            screen = app.screen
+            assert len(screen.query_one("#link-sparkline", Sparkline).data) >= 2
+            assert "dBm" in str(screen.query_one("#link-stats").render())
+
+            await app.pop_screen()
+            await pilot.pause()
+            assert screen.link_monitor is None
+
+    with Sandbox():
+        SecureStorage().save_credentials("user@singtel", "secret")
+        network = NetworkManager()
+        network.configure_network("user@singtel", "secret")
+        network.activate()
+        asyncio.run(scenario())
+
+
+def test_stop_without_waiting_does_not_join(monkeypatch):
+    monitor = LinkMonitor("wlan0", interval=60)
+    sampling = threading.Event()
+    release = threading.Event()
+
+    def slow_sample():
+        sampling.set()
+        release.wait(5)
+        return False
+
+    monkeypatch.setattr(monitor, "sample", slow_sample)
+    monitor.start()
+    thread = monitor._thread
+    assert sampling.wait(5)
+
+    monitor.stop(wait=False)
+    assert thread.is_alive() and monitor._thread is None
+    # Restarting must not revive the old thread
+    monitor.start()
+    release.set()
+    thread.join(5)
+    assert not thread.is_alive()
+    monitor.stop()
@@ -0,0 +1,25 @@
+"""Tests for the low-CPU render mode settings"""
+
+import os
+
+from wirelesssgx import lite
+
+
+def test_lite_mode_from_env(monkeypatch):
+    monkeypatch.delenv("WIRELESSSGX_LITE", raising=False)
+    assert not lite.lite_mode()
+    monkeypatch.setenv("WIRELESSSGX_LITE", "yes")
+    assert lite.lite_mode()
+
+
+def test_lite_defaults_keep_explicit_textual_settings(monkeypatch):
+    # Set before deleting so monkeypatch restores the variable afterwards,
+    # rather than leaving apply_lite_defaults' value for later tests
+    monkeypatch.setenv("TEXTUAL_FPS", "")
+    monkeypatch.delenv("TEXTUAL_FPS")
+    monkeypatch.setenv("TEXTUAL_ANIMATIONS", "basic")
+
+    lite.apply_lite_defaults()
+
+    assert int(os.environ["TEXTUAL_FPS"]) == lite.LITE_FPS
+    assert os.environ["TEXTUAL_ANIMATIONS"] == "basic"
@@ -0,0 +1,103 @@
+"""Tests for the node_exporter textfile metrics"""
+
+import pytest
+
+from wirelesssgx import metrics
+from wirelesssgx.network import NetworkManager
+from wirelesssgx.sandbox import Sandbox
+from wirelesssgx.state import collect_state
+from wirelesssgx.storage import SecureStorage
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    metrics.registry.drain()
+    yield
+    metrics.registry.drain()
+
+
+def samples(path):
+    """{series: value} for the sample lines of a textfile"""
+    lines = path.read_text().splitlines()
+    return {line.rpartition(" ")[0]: float(line.rpartition(" ")[2])
+            for line in lines if not line.startswith("#")}
+
+
+def test_flush_needs_a_directory(monkeypatch):
+    monkeypatch.delenv("WIRELESSSGX_TEXTFILE_DIR", raising=False)
+    metrics.count_reconnect()
+
+    assert metrics.flush() is None
+    # Kept for a later flush
+    assert metrics.registry.counters == {metrics.RECONNECTS: 1}
+
+
+def test_failed_flush_keeps_the_deltas(tmp_path):
+    metrics.count_reconnect()
+    metrics.observe_connect(1.5, "connected")
+
+    with pytest.raises(OSError):
+        metrics.flush(str(tmp_path / "missing"))
+    # Counted again after the failure, before the retry
+    metrics.count_reconnect()
+    metrics.flush(str(tmp_path))
+
+    values = samples(tmp_path / metrics.TEXTFILE_NAME)
+    assert values[metrics.RECONNECTS] == 2
+    assert values['wirelesssgx_connect_duration_seconds_count{result="connected"}'] == 1
+
+
+def test_flushes_accumulate_with_bounded_labels(tmp_path, monkeypatch):
+    monkeypatch.setenv("WIRELESSSGX_TEXTFILE_DIR", str(tmp_path))
+    metrics.observe_essa("create_user_r12x1a", 0.3, ok=True)
+    metrics.count_auth_failure("rejected")
+    metrics.count_auth_failure("no such reason")
+    metrics.flush()
+
+    # A second process adds to the first one's totals
+    metrics.observe_essa("create_user_r12x1a", 12.0, ok=True)
+    metrics.observe_essa("not an api", 0.05, ok=False)
+    metrics.count_auth_failure("rejected")
+    path = metrics.flush()
+
+    values = samples(tmp_path / metrics.TEXTFILE_NAME)
+    assert path == str(tmp_path / metrics.TEXTFILE_NAME)
+    assert values['wirelesssgx_auth_failures_total{reason="rejected"}'] == 2
+    assert values['wirelesssgx_auth_failures_total{reason="other"}'] == 1
+
+    ok = 'api="create_user_r12x1a",outcome="ok"'
+    assert values[f'wirelesssgx_essa_request_duration_seconds_bucket{{{ok},le="0.25"}}'] == 0
+    assert values[f'wirelesssgx_essa_request_duration_seconds_bucket{{{ok},le="0.5"}}'] == 1
+    assert values[f'wirelesssgx_essa_request_duration_seconds_bucket{{{ok},le="+Inf"}}'] == 2
+    assert values[f"wirelesssgx_essa_request_duration_seconds_count{{{ok}}}"] == 2
+    assert values[f"wirelesssgx_essa_request_duration_seconds_sum{{{ok}}}"] == pytest.approx(12.3)
+    # Unknown APIs share the last allowed value rather than adding series
+    assert 'wirelesssgx_essa_request_duration_seconds_count{api="retrieve_user_r12x2b",outcome="error"}' in values
+    assert metrics.UPDATED in values
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_connection_metrics_from_the_sandbox(tmp_path):
+    with Sandbox() as sandbox:
+        sandbox.system.accounts = {"user@singtel": "secret"}
+        SecureStorage().save_credentials("user@singtel", "secret")
+        network = NetworkManager()
+        network.configure_network("user@singtel", "wrong")
+        assert not network.activate()["connected"]
+        network.configure_network("user@singtel", "secret")
+        assert network.activate()["connected"]
+        collect_state(network)
+
+        sandbox.system.remove_access_points()
+        sandbox.system.drop_link()
+        collect_state(network)
+        metrics.flush(str(tmp_path))
+
+    values = samples(tmp_path / metrics.TEXTFILE_NAME)
+    assert values['wirelesssgx_auth_failures_total{reason="rejected"}'] == 1
+    assert values['wirelesssgx_connect_duration_seconds_count{result="connected"}'] == 1
+    assert values['wirelesssgx_connect_duration_seconds_count{result="failed"}'] == 1
+    assert values["wirelesssgx_connected"] == 0
+    assert values["wirelesssgx_in_range"] == 0
+    # The signal of a link that is gone is dropped, not left stale
+    assert "wirelesssgx_signal_percent" not in values
@@ -0,0 +1,68 @@
+"""Tests for nmcli output parsing"""
+
+import pytest
+
+from wirelesssgx.network import NetworkManager, parse_terse_line
+
+
+def test_parse_terse_line_unescapes_colons():
+    line = r"yes:Wireless@SGx:AA\:BB\:CC\:DD\:EE\:FF:72:wlan0"
+
+    assert parse_terse_line(line) == ["yes", "Wireless@SGx", "AA:BB:CC:DD:EE:FF", "72", "wlan0"]
+
+
+def test_parse_terse_line_maxsplit_keeps_ipv6_value():
+    assert parse_terse_line(r"IP6.ADDRESS[1]:fe80\:\:1/64", maxsplit=1) == ["IP6.ADDRESS[1]", "fe80::1/64"]
+    assert parse_terse_line("IP6.ADDRESS[1]:fe80::1/64", maxsplit=1) == ["IP6.ADDRESS[1]", "fe80::1/64"]
+
+
+def test_parse_terse_line_escaped_backslash():
+    assert parse_terse_line(r"a\\b:c") == ["a\\b", "c"]
+
+
+def test_test_connection_uses_active_access_point(monkeypatch):
+    network = NetworkManager()
+    monkeypatch.setattr(network, "list_access_points", lambda rescan=False, deadline=None: [
+        {"active": False, "ssid": "Other", "bssid": "", "signal": 90, "device": "wlan0"},
+        {"active": True, "ssid": "Wireless@SGx", "bssid": "", "signal": 60, "device": "wlan0"},
+    ])
+
+    assert network.test_connection()
+
+
+def test_activate_skips_when_ssid_not_visible(monkeypatch):
+    network = NetworkManager()
+    monkeypatch.setattr(network, "scan_for_ssid", lambda deadline=None: [])
+    monkeypatch.setattr("wirelesssgx.network.run_sync", lambda *a, **k: pytest.fail("activation attempted"))
+
+    assert network.activate() == {"connected": False, "in_range": False, "bssid": None}
+
+
+def test_scan_for_ssid_sorts_by_signal_and_caches(monkeypatch):
+    network = NetworkManager()
+    network.ssid = "Cache-Test"
+    calls = []
+
+    def list_access_points(rescan=False, deadline=None):
+        calls.append(rescan)
+        return [
+            {"active": False, "ssid": "Cache-Test", "bssid": "AA", "signal": 40, "device": "wlan0"},
+            {"active": False, "ssid": "Cache-Test", "bssid": "BB", "signal": 80, "device": "wlan0"},
+            {"active": False, "ssid": "Other", "bssid": "CC", "signal": 99, "device": "wlan0"},
+        ]
+
+    monkeypatch.setattr(network, "list_access_points", list_access_points)
+
+    assert [ap["bssid"] for ap in network.scan_for_ssid()] == ["BB", "AA"]
+    network.scan_for_ssid()
+    assert len(calls) == 1
+
+
+def test_fast_join_wpa_options():
+    assert NetworkManager(fast_join=False)._wpa_global_options() == ""
+
+    network = NetworkManager(fast_join=True)
+    block = network._wpa_network_block("user", "pass")
+    assert "fast_reauth=1" in network._wpa_global_options()
+    assert "proactive_key_caching=1" in block
+    assert 'phase1="tls_disable_session_ticket=0"' in block
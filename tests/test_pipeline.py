@@ -0,0 +1,76 @@
+"""Tests for the post-OTP dependency pipeline"""
+
+import threading
+
+import pytest
+
+from wirelesssgx import pipeline as stages
+from wirelesssgx.deadline import FlowCancelled
+from wirelesssgx.pipeline import Pipeline, render_timings
+
+
+def test_independent_stages_overlap_and_dependents_wait():
+    both_running = threading.Barrier(2, timeout=5)
+    order = []
+
+    def save():
+        both_running.wait()
+        order.append("save")
+        return True
+
+    def configure():
+        both_running.wait()
+        order.append("configure")
+        return "nm"
+
+    pipeline = Pipeline()
+    pipeline.add("save", save)
+    pipeline.add("configure", configure)
+    pipeline.add("connect", lambda backend: order.append("connect") or backend + "-connected",
+                 after=["configure"])
+
+    results = pipeline.run()
+
+    assert results == {"save": True, "configure": "nm", "connect": "nm-connected"}
+    assert order.index("connect") > order.index("configure")
+    assert set(pipeline.durations()) == {"save", "configure", "connect"}
+
+
+def test_failure_skips_dependents_only():
+    def configure():
+        raise RuntimeError("no backend")
+
+    pipeline = Pipeline()
+    pipeline.add("save", lambda: True)
+    pipeline.add("configure", configure, label="Configure network")
+    pipeline.add("connect", lambda _: "connected", after=["configure"])
+
+    assert pipeline.run() == {"save": True}
+    assert pipeline.status["connect"] == stages.SKIPPED
+    with pytest.raises(RuntimeError, match="no backend"):
+        pipeline.result("connect")
+    assert "❌ Configure network" in render_timings(pipeline)
+
+
+def test_cancellation_propagates():
+    def validate():
+        raise FlowCancelled("Back pressed")
+
+    pipeline = Pipeline()
+    pipeline.add("validate", validate)
+    pipeline.add("decrypt", lambda payload: payload, after=["validate"])
+
+    with pytest.raises(FlowCancelled):
+        pipeline.run()
+
+
+def test_on_change_reports_every_transition():
+    seen = []
+    pipeline = Pipeline(on_change=lambda p: seen.append(dict(p.status)))
+    pipeline.add("validate", lambda: b"payload")
+    pipeline.add("decrypt", lambda payload: payload.decode(), after=["validate"])
+
+    pipeline.run()
+
+    assert seen[-1] == {"validate": stages.DONE, "decrypt": stages.DONE}
+    assert len(seen) == 4
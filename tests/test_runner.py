@@ -0,0 +1,77 @@
+"""Tests for the command runner"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from wirelesssgx import runner
+from wirelesssgx.runner import CommandError, CommandNotFound
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    runner.metrics.reset()
+    yield
+    runner.metrics.reset()
+
+
+def test_run_sync_captures_output_and_metrics():
+    result = runner.run_sync([sys.executable, "-c", "import sys; print('hi'); sys.exit(3)"], name="py")
+
+    assert result.returncode == 3
+    assert result.stdout == "hi\n"
+    assert not result.ok
+    stats = runner.metrics.snapshot()["py"]
+    assert stats["calls"] == 1
+    assert stats["failures"] == 1
+    assert stats["exit_codes"] == {3: 1}
+
+
+def test_run_sync_kills_child_on_timeout():
+    start = time.monotonic()
+    result = runner.run_sync([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5)
+
+    assert result.timed_out
+    assert not result.ok
+    assert time.monotonic() - start < 10
+
+
+def test_check_raises_command_error():
+    with pytest.raises(CommandError):
+        runner.run_sync([sys.executable, "-c", "raise SystemExit(1)"], check=True)
+
+
+def test_missing_command_is_file_not_found():
+    with pytest.raises(FileNotFoundError):
+        runner.run_sync(["wirelesssgx-no-such-command"])
+    with pytest.raises(CommandNotFound):
+        asyncio.run(runner.run(["wirelesssgx-no-such-command"]))
+
+
+def test_async_run_passes_input():
+    result = asyncio.run(runner.run(
+        [sys.executable, "-c", "import sys; print(sys.stdin.read().upper())"], input="abc"
+    ))
+
+    assert result.ok
+    assert result.stdout.strip() == "ABC"
+
+
+def test_async_cancellation_kills_child():
+    async def scenario():
+        task = asyncio.ensure_future(runner.run([sys.executable, "-c", "import time; time.sleep(30)"]))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    start = time.monotonic()
+    asyncio.run(scenario())
+    assert time.monotonic() - start < 10
+
+
+def test_command_name_groups_by_subcommand():
+    assert runner._command_name(["nmcli", "-t", "-f", "ACTIVE,SSID", "device", "wifi"]) == "nmcli device"
+    assert runner._command_name(["/usr/sbin/iwconfig"]) == "iwconfig"
@@ -0,0 +1,135 @@
+"""End-to-end tests of the CLI and backends against the simulated system"""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from wirelesssgx import connection, runner
+from wirelesssgx.cli import cli
+from wirelesssgx.daemon import EventSource, NetworkManagerBackend, ReconnectSupervisor
+from wirelesssgx.network import NetworkManager
+from wirelesssgx.sandbox import Sandbox, SimulatedSystem
+from wirelesssgx.storage import SecureStorage
+
+
+@pytest.fixture
+def sandbox():
+    with Sandbox() as sandbox:
+        sandbox.system.accounts = {"user@singtel": "secret"}
+        SecureStorage().save_credentials("user@singtel", "secret")
+        yield sandbox
+
+
+def invoke(*args):
+    result = CliRunner().invoke(cli, list(args))
+    assert result.exit_code == 0, result.output
+    return json.loads(result.output) if "--json" in args else result.output
+
+
+def test_connect_status_and_forget(sandbox):
+    assert not invoke("status", "--json")["connected"]
+
+    result = invoke("connect", "--json")
+    assert result["connected"]
+    assert result["state"]["ip4"] == "10.0.0.2/24"
+    assert sandbox.system.profiles["Wireless@SGx"]["connection.autoconnect"] == "yes"
+    assert "Wireless@SGx.new" not in sandbox.system.profiles
+
+    status = invoke("status", "--json")
+    assert status["connected"] and status["signal"] == 70 and status["autoconnect"]
+
+    assert invoke("forget", "--yes", "--json")["deleted"]
+    assert sandbox.system.profiles == {}
+    assert sandbox.system.link is None
+    assert SecureStorage().get_credentials() is None
+
+
+def test_rejected_credentials_and_injected_failures(sandbox):
+    network = NetworkManager()
+    assert network.configure_network("user@singtel", "wrong")
+    assert network.activate() == {"connected": False, "in_range": True, "bssid": "02:00:00:00:00:01"}
+
+    network.configure_network("user@singtel", "secret")
+    sandbox.system.inject_failure("nmcli connection add", returncode=2, stderr="Error: boom")
+    assert not network.configure_network("user@singtel", "secret")
+    # The working profile was left alone
+    assert sandbox.system.profiles["Wireless@SGx"]["802-1x.password"] == "secret"
+    assert network.activate()["connected"]
+    assert runner.metrics.snapshot()["nmcli connection"]["exit_codes"][2] >= 1
+
+
+def test_failed_rename_keeps_the_working_profile(sandbox):
+    network = NetworkManager()
+    network.configure_network("user@singtel", "secret")
+    assert network.activate()["connected"]
+    old_uuid = sandbox.system.profiles["Wireless@SGx"]["connection.uuid"]
+
+    sandbox.system.inject_failure("nmcli connection modify", returncode=10, stderr="Error: boom")
+    assert not network.configure_network("user@singtel", "changed")
+
+    assert list(sandbox.system.profiles) == ["Wireless@SGx"]
+    assert sandbox.system.profiles["Wireless@SGx"]["connection.uuid"] == old_uuid
+    assert sandbox.system.profiles["Wireless@SGx"]["802-1x.password"] == "secret"
+    assert sandbox.system.link is not None
+
+    # A successful swap replaces the old profile by UUID
+    assert network.configure_network("user@singtel", "secret")
+    assert list(sandbox.system.profiles) == ["Wireless@SGx"]
+    assert sandbox.system.profiles["Wireless@SGx"]["connection.uuid"] != old_uuid
+
+
+def test_connect_json_stays_parseable_when_configuration_fails(sandbox):
+    sandbox.system.inject_failure("nmcli connection add", returncode=2, stderr="Error: boom")
+
+    result = CliRunner().invoke(cli, ["connect", "--json"])
+
+    assert result.exit_code == 1
+    assert json.loads(result.stdout) == {"ok": False, "error": "Failed to configure network"}
+
+
+def test_state_machine_follows_device_monitor(sandbox):
+    # Give the monitor thread time to see each stage
+    sandbox.system.activation_delay = 0.1
+    machine = connection.ConnectionStateMachine()
+
+    state = connection.connect(NetworkManager(), "user@singtel", "secret", machine)
+
+    assert state == connection.VERIFIED
+    assert [s for s, _ in machine.history] == [
+        connection.CONFIGURING, connection.ACTIVATING, connection.AUTHENTICATING,
+        connection.IP_CONFIG, connection.VERIFIED,
+    ]
+
+
+def test_systemd_networkd_backend_uses_wpa_supplicant():
+    with Sandbox(SimulatedSystem(backend="systemd-networkd")) as sandbox:
+        network = NetworkManager()
+        assert network.configure_network("user@singtel", "secret")
+
+        assert (sandbox.root / "etc" / "wpa_supplicant" / "wpa_supplicant-wlan0.conf").exists()
+        assert sandbox.system.enabled["wpa_supplicant@wlan0"]
+        assert runner.run_sync(["wpa_cli", "-i", "wlan0", "status"]).stdout.count("wpa_state=COMPLETED")
+        # nmcli has nothing to report, so iwconfig decides
+        assert network.test_connection()
+        assert invoke("status", "--json")["connected"]
+
+
+def test_supervisor_reconnects_on_monitor_events(sandbox):
+    network = NetworkManager()
+    network.configure_network("user@singtel", "secret")
+    supervisor = ReconnectSupervisor(NetworkManagerBackend(network), base_delay=0)
+    events = EventSource()
+    try:
+        # Initial connection
+        assert supervisor.step() is None
+        connected = supervisor.reconnects
+        for _ in range(20):
+            sandbox.system.drop_link()
+            assert events.wait(1, settle=0)
+            assert supervisor.step() is None
+    finally:
+        events.close()
+
+    assert supervisor.reconnects == connected + 20
+    assert sandbox.system.link is not None
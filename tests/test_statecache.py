@@ -0,0 +1,62 @@
+"""Tests for the cached state file used by status bars"""
+
+import json
+import time
+
+from click.testing import CliRunner
+
+from wirelesssgx.cli import cli
+from wirelesssgx.sandbox import Sandbox
+from wirelesssgx.statecache import fast_status, format_state, read_state, write_state
+
+
+def test_write_then_read_round_trip(tmp_path):
+    path = str(tmp_path / "sub" / "state.json")
+    write_state({"timestamp": time.time(), "connected": True}, path)
+
+    assert read_state(path=path)["connected"] is True
+
+
+def test_stale_state_is_ignored(tmp_path):
+    path = str(tmp_path / "state.json")
+    write_state({"timestamp": time.time() - 60, "connected": True}, path)
+
+    assert read_state(max_age=15, path=path) is None
+    assert read_state(max_age=None, path=path) is not None
+
+
+def test_format_template_blanks_missing_values():
+    state = {"timestamp": time.time(), "connected": False, "signal": None}
+
+    assert format_state(state, "{icon} {status} {signal}|{nonexistent}") == "❌ disconnected |"
+
+
+def test_format_waybar():
+    state = {"timestamp": time.time(), "connected": True, "signal": 64, "ip4": "10.0.0.2/24"}
+
+    assert json.loads(format_state(state, "waybar"))["text"] == "64%"
+
+
+def test_fast_status_falls_through_when_stale(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "state.json"
+    monkeypatch.setenv("WIRELESSSGX_STATE_FILE", str(path))
+
+    assert not fast_status(["wirelesssgx", "status", "--cached"])
+
+    write_state({"timestamp": time.time(), "connected": True, "signal": 50}, str(path))
+    assert fast_status(["wirelesssgx", "status", "--cached", "--format", "{signal}"])
+    assert capsys.readouterr().out == "50\n"
+    assert not fast_status(["wirelesssgx", "status", "--cached", "--unknown"])
+
+
+def test_cached_status_has_one_shape_regardless_of_cache_age():
+    with Sandbox():
+        write_state({"timestamp": time.time(), "connected": False})
+        assert fast_status(["wirelesssgx", "status", "--cached"])
+
+        # Stale: the live probe answers, in the fast path's format
+        write_state({"timestamp": time.time() - 60, "connected": True})
+        assert not fast_status(["wirelesssgx", "status", "--cached"])
+        result = CliRunner().invoke(cli, ["status", "--cached"])
+        assert result.exit_code == 0
+        assert result.output == "❌ disconnected\n"
@@ -0,0 +1,47 @@
+"""Tests for the encrypted pending-session store"""
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from wirelesssgx.cli import cli
+from wirelesssgx.core import WirelessSGXClient
+from wirelesssgx.storage import SecureStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SecureStorage()
+    storage.fallback_file = tmp_path / "credentials.enc"
+    storage.pending_file = tmp_path / "pending.enc"
+    return storage
+
+
+def test_pending_session_round_trip(storage):
+    saved = storage.save_pending_session("code123", "6591234567", "01011990", "starhub", True)
+
+    assert saved["mode"] == "retrieve"
+    assert b"code123" not in storage.pending_file.read_bytes()
+    assert storage.get_pending_session() == saved
+
+
+def test_pending_session_delete(storage):
+    storage.save_pending_session("code123", "6591234567", "01011990", "singtel")
+    storage.delete_pending_session()
+
+    assert storage.get_pending_session() is None
+
+
+def test_register_reports_a_pending_session_that_cannot_be_saved(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(WirelessSGXClient, "request_registration", lambda *args, **kwargs: "code123")
+    # A directory where the file should go makes the write fail
+    SecureStorage().pending_file.mkdir(parents=True)
+
+    result = CliRunner().invoke(cli, ["register", "--isp", "singtel", "--mobile", "91234567",
+                                      "--dob", "01011990", "--json"])
+
+    assert result.exit_code == 1
+    output = json.loads(result.stdout)
+    assert not output["ok"] and output["error"].startswith("Failed to save pending session")
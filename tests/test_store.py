@@ -0,0 +1,87 @@
+"""Tests for the prefetching app store"""
+
+import asyncio
+import threading
+
+from wirelesssgx import store
+from wirelesssgx.network import NetworkConfigError
+from wirelesssgx.store import AppStore
+
+
+class FakeStorage:
+    def __init__(self, credentials=None):
+        self.credentials = credentials
+        self.calls = 0
+
+    def get_credentials(self):
+        self.calls += 1
+        return self.credentials
+
+
+class FakeNetwork:
+    ssid = "Wireless@SGx"
+
+    def __init__(self, backend="networkmanager", aps=()):
+        self.backend = backend
+        self.aps = list(aps)
+        self.release = threading.Event()
+        self.release.set()
+
+    def detect_network_manager(self):
+        self.release.wait(5)
+        if self.backend is None:
+            raise NetworkConfigError("No supported network manager found")
+        return self.backend
+
+    def get_profile_info(self):
+        return {"connection.autoconnect": "yes"}
+
+    def list_access_points(self):
+        return self.aps
+
+
+def ap(ssid="Wireless@SGx", signal=60, active=False):
+    return {"ssid": ssid, "bssid": "00:11:22:33:44:55", "signal": signal,
+            "device": "wlan0", "active": active}
+
+
+def test_prefetch_loads_everything():
+    creds = {"username": "u", "password": "p", "isp": "singtel"}
+    app_store = AppStore(FakeStorage(creds), FakeNetwork(aps=[ap(signal=40), ap(signal=70, active=True),
+                                                              ap(ssid="Other", signal=99)]))
+    app_store.prefetch()
+
+    async def load():
+        return [await app_store.get(key) for key in
+                (store.CREDENTIALS, store.BACKEND, store.PROFILE, store.LINK)]
+
+    credentials, backend, profile, link = asyncio.run(load())
+    assert credentials == creds
+    assert backend == "networkmanager"
+    assert profile["connection.autoconnect"] == "yes"
+    assert link == {"connected": True, "in_range": True, "signal": 70, "bssid": "00:11:22:33:44:55",
+                    "device": "wlan0"}
+
+
+def test_get_waits_for_running_prefetch_and_peek_does_not():
+    network = FakeNetwork()
+    network.release.clear()
+    app_store = AppStore(FakeStorage(), network)
+    app_store.prefetch(store.BACKEND)
+
+    assert app_store.peek(store.BACKEND, "pending") == "pending"
+    threading.Timer(0.1, network.release.set).start()
+    assert asyncio.run(app_store.get(store.BACKEND)) == "networkmanager"
+    assert app_store.peek(store.BACKEND) == "networkmanager"
+
+
+def test_missing_backend_and_set_override():
+    storage = FakeStorage({"username": "u", "password": "p", "isp": "singtel"})
+    app_store = AppStore(storage, FakeNetwork(backend=None))
+
+    assert asyncio.run(app_store.get(store.BACKEND)) is None
+    assert asyncio.run(app_store.get(store.LINK))["in_range"] is False
+
+    app_store.set(store.CREDENTIALS, None)
+    assert asyncio.run(app_store.get(store.CREDENTIALS)) is None
+    assert storage.calls == 0
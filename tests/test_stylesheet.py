@@ -0,0 +1,22 @@
+"""Tests for the shared TUI stylesheet"""
+
+from pathlib import Path
+
+from textual.app import App
+from textual.css.stylesheet import Stylesheet
+
+from wirelesssgx.app import WirelessSGXApp
+
+STYLESHEET = Path(__file__).resolve().parent.parent / "wirelesssgx" / WirelessSGXApp.CSS_PATH
+
+
+def test_stylesheet_parses_and_covers_every_screen():
+    stylesheet = Stylesheet(variables=App().get_css_variables())
+    stylesheet.read(STYLESHEET)
+    stylesheet.parse()
+
+    selectors = {rule.selectors.split()[0] for rule in stylesheet.rules}
+    for screen in WirelessSGXApp.SCREENS.values():
+        assert screen.__name__ in selectors
+        # Styles live in the stylesheet, not in per-screen CSS strings
+        assert not screen.CSS
@@ -0,0 +1,100 @@
+"""Tests for --trace spans and --profile output"""
+
+import json
+import pstats
+import sys
+import time
+
+import pytest
+
+from wirelesssgx import __main__ as entry, tracing
+from wirelesssgx.network import NetworkManager
+from wirelesssgx.profiling import profiled
+from wirelesssgx.sandbox import Sandbox
+
+
+@pytest.fixture(autouse=True)
+def tracing_off():
+    yield
+    tracing.disable()
+
+
+def test_spans_are_shared_no_ops_when_off():
+    assert tracing.span("a") is tracing.span("b", "essa", isp="singtel")
+    with tracing.span("a") as span:
+        span.set(x=1)
+    assert not tracing.enabled()
+
+
+def test_trace_records_spans_and_commands(tmp_path):
+    tracing.enable()
+    with pytest.raises(ValueError):
+        with tracing.span("outer", "app", step=1):
+            with Sandbox():
+                NetworkManager().detect_network_manager()
+            raise ValueError("boom")
+
+    path = tmp_path / "trace.json"
+    assert tracing.write(str(path)) == 2
+    assert not tracing.enabled()
+
+    events = json.loads(path.read_text())["traceEvents"]
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    assert spans["outer"]["args"] == {"step": 1, "error": "ValueError"}
+    command = spans["systemctl is-active"]
+    assert command["cat"] == "subprocess" and command["args"]["returncode"] == 0
+    assert spans["outer"]["ts"] <= command["ts"]
+    assert command["ts"] + command["dur"] <= spans["outer"]["ts"] + spans["outer"]["dur"]
+    assert any(e["ph"] == "M" and e["args"]["name"] == "MainThread" for e in events)
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampling_profile_writes_collapsed_stacks(tmp_path):
+    path = tmp_path / "out.collapsed"
+    with profiled(str(path)):
+        busy(0.2)
+
+    lines = path.read_text().splitlines()
+    stack, _, count = lines[0].rpartition(" ")
+    assert stack.startswith(("MainThread;", "Thread"))
+    assert int(count) >= 1
+    assert any("busy (test_tracing.py" in line for line in lines)
+
+
+def test_deterministic_profile_writes_pstats(tmp_path):
+    path = tmp_path / "out.prof"
+    with profiled(str(path)):
+        busy(0.01)
+
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert "busy" in functions
+
+
+def test_pop_option(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["wirelesssgx", "status", "--trace", "--profile=out.prof"])
+
+    assert entry._pop_option("--profile", "default") == "out.prof"
+    assert entry._pop_option("--trace", "trace.json") == "trace.json"
+    assert entry._pop_option("--trace", "trace.json") is None
+    assert sys.argv == ["wirelesssgx", "status"]
+
+
+def test_pop_option_space_form_and_double_dash(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["wirelesssgx", "--trace", "status", "--profile", "out.prof",
+                                      "--", "--profile", "x"])
+
+    assert entry._pop_option("--profile", "default") == "out.prof"
+    assert entry._pop_option("--trace", "trace.json") == "trace.json"
+    assert entry._pop_option("--profile", "default") is None
+    assert sys.argv == ["wirelesssgx", "status", "--", "--profile", "x"]
+
+
+def test_command_names_match_the_cli():
+    from wirelesssgx.cli import cli
+
+    assert entry.COMMANDS == set(cli.commands)
@@ -1,14 +1,111 @@
-"""Main entry point for the wirelesssgx package."""
+"""Main entry point for the wirelesssgx package.
 
+Kept deliberately small: the CLI and the TUI each pull in their own
+dependencies only once we know which one is being launched.
+"""
+
+import os
 import sys
-from .app import main
-from .cli import cli
+
+DEFAULT_PROFILE = "wirelesssgx-profile.collapsed"
+DEFAULT_TRACE = "wirelesssgx-trace.json"
+
+# Subcommands of ``cli``, listed here so parsing --profile/--trace does not
+# import Click; a following command name is never taken as an option value
+COMMANDS = frozenset({
+    "autoconnect", "connect", "daemon", "forget", "history", "provision",
+    "register", "show", "status", "verify", "watch",
+})
+
+
+def _pop_option(name: str, default: str):
+    """Remove ``name VALUE``, ``name=VALUE`` or a bare ``name`` from argv.
+
+    Returns the value (``default`` for the bare form), or None if the
+    option is not given. Arguments after ``--`` are left alone. The next
+    argument is only taken as the value if it is neither an option nor a
+    command name, so ``--trace status`` traces the status command.
+    """
+    args = sys.argv
+    end = args.index("--") if "--" in args else len(args)
+    for i in range(1, end):
+        arg = args[i]
+        if arg.startswith(name + "="):
+            del args[i]
+            return arg.partition("=")[2] or default
+        if arg == name:
+            value = args[i + 1] if i + 1 < end else None
+            if value and not value.startswith("-") and value not in COMMANDS:
+                del args[i:i + 2]
+                return value
+            del args[i]
+            return default
+    return None
+
+
+def main():
+    """Dispatch to the Click CLI or the Textual TUI"""
+    # Check for debug flag
+    if '--debug' in sys.argv:
+        os.environ['WIRELESSSGX_DEBUG'] = '1'
+        sys.argv.remove('--debug')
+        print("Debug mode enabled. Check log file for details.")
+
+    # Low-CPU rendering for kiosks and slow SSH links
+    if '--lite' in sys.argv:
+        os.environ['WIRELESSSGX_LITE'] = '1'
+        sys.argv.remove('--lite')
+
+    # Off unless asked for; see ``profiling`` and ``tracing``
+    profile = _pop_option('--profile', DEFAULT_PROFILE)
+    trace = _pop_option('--trace', DEFAULT_TRACE)
+    if not (profile or trace):
+        _run()
+        return
+
+    if trace:
+        from . import tracing
+        tracing.enable()
+    try:
+        if profile:
+            from .profiling import profiled
+            with profiled(profile):
+                _run()
+        else:
+            _run()
+    finally:
+        if trace:
+            count = tracing.write(trace)
+            print(f"Trace written to {trace} ({count} spans)", file=sys.stderr)
+
+
+def _run():
+    """Run the requested CLI command or the TUI"""
+    # Status bars poll 'status --cached'; serve it without loading Click
+    from .statecache import fast_status
+    if fast_status(sys.argv):
+        return
+
+    from . import metrics
+    try:
+        # Check if CLI commands are being used
+        if len(sys.argv) > 1:
+            from .cli import cli
+            cli()
+        else:
+            # Launch TUI app
+            from .lite import lite_mode, apply_lite_defaults
+            if lite_mode():
+                apply_lite_defaults()
+            from .app import run_tui
+            run_tui()
+    finally:
+        # Whatever the command counted, for node_exporter's textfile collector
+        try:
+            metrics.flush()
+        except OSError as e:
+            print(f"Could not write metrics: {e}", file=sys.stderr)
+
 
 if __name__ == "__main__":
-    # Check if CLI commands are being used
-    if len(sys.argv) > 1:
-        # Use Click CLI for commands
-        cli()
-    else:
-        # Launch TUI app
-        main()
\ No newline at end of file
+    main()
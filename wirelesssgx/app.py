@@ -14,6 +14,9 @@ from datetime import datetime
 from .screens import WelcomeScreen, RegisterScreen, OTPScreen, SuccessScreen, CredentialsScreen, AutoConnectScreen
 from .storage import SecureStorage
 from .network import NetworkManager
+from .store import AppStore, CREDENTIALS
+from .lite import lite_mode
+from .tracing import span
 
 # Set up debug logging
 DEBUG_MODE = os.environ.get('WIRELESSSGX_DEBUG', '').lower() in ('1', 'true', 'yes', 'on')
@@ -38,31 +41,6 @@ else:
 class ManualInstructionsScreen(Screen):
     """Screen to show manual configuration instructions"""
     
-    CSS = """
-    ManualInstructionsScreen {
-        align: center middle;
-    }
-    
-    #instructions-container {
-        width: 80;
-        height: 80%;
-        border: thick $background 80%;
-        background: $surface;
-        padding: 2 4;
-        overflow-y: auto;
-    }
-    
-    #instructions {
-        margin: 1;
-    }
-    
-    #close-button {
-        dock: bottom;
-        height: 3;
-        align: center middle;
-    }
-    """
-    
     def __init__(self, *, instructions: str):
         super().__init__()
         self.instructions = instructions
@@ -89,11 +67,8 @@ class ManualInstructionsScreen(Screen):
 class WirelessSGXApp(App):
     """Main TUI Application for Wireless@SGx"""
     
-    CSS = """
-    Screen {
-        background: $background;
-    }
-    """
+    # All screen styles, parsed once when the app starts
+    CSS_PATH = "wirelesssgx.tcss"
     
     SCREENS = {
         "welcome": WelcomeScreen,
@@ -105,10 +80,19 @@ class WirelessSGXApp(App):
         "autoconnect": AutoConnectScreen,
     }
     
+    # Screens kept after they are closed and reset on reuse instead of rebuilt
+    POOLED_SCREENS = ("welcome", "register", "credentials")
+    
     def __init__(self):
         super().__init__()
         self.storage = SecureStorage()
         self.network_manager = NetworkManager()
+        # Prefetched state shared by the screens (filled from WelcomeScreen)
+        self.store = AppStore(self.storage, self.network_manager)
+        self._screen_pool: Dict[str, Screen] = {}
+        if lite_mode():
+            # Also covers apps started after Textual was already imported
+            self.animation_level = "none"
         self.debug_mode = DEBUG_MODE
         if self.debug_mode:
             logger.info("WirelessSGXApp initialized in debug mode")
@@ -119,14 +103,18 @@ class WirelessSGXApp(App):
             logger.info("App mounted, pushing welcome screen")
         await self.push_screen("welcome")
     
+    def on_unmount(self) -> None:
+        """Stop the prefetch threads"""
+        self.store.shutdown()
+    
     async def action_auto_connect(self) -> None:
         """Auto-connect with saved credentials"""
         if self.debug_mode:
             logger.info("action_auto_connect called")
         
         try:
-            # Check for saved credentials
-            creds = self.storage.get_credentials()
+            # Check for saved credentials (usually already prefetched)
+            creds = await self.store.get(CREDENTIALS)
             
             if self.debug_mode:
                 logger.info(f"Retrieved credentials: {bool(creds)}")
@@ -181,13 +169,17 @@ class WirelessSGXApp(App):
                     if self.debug_mode:
                         logger.info(f"Creating instance of {screen_class.__name__} with kwargs: {kwargs}")
                     
-                    screen_instance = screen_class(**kwargs)
-                    
-                    if self.debug_mode:
-                        logger.info(f"Screen instance created successfully: {screen_instance}")
-                        logger.info("Calling super().push_screen()")
-                    
-                    await super().push_screen(screen_instance)
+                    with span(f"push {screen}", "screen"):
+                        if screen in self.POOLED_SCREENS:
+                            screen_instance = await self._pooled_screen(screen, kwargs)
+                        else:
+                            screen_instance = screen_class(**kwargs)
+                        
+                        if self.debug_mode:
+                            logger.info(f"Screen instance created successfully: {screen_instance}")
+                            logger.info("Calling super().push_screen()")
+                        
+                        await super().push_screen(screen_instance)
                     
                     if self.debug_mode:
                         logger.info(f"Screen pushed successfully. New stack size: {len(self.screen_stack)}")
@@ -226,6 +218,22 @@ class WirelessSGXApp(App):
                 if self.debug_mode:
                     logger.error(f"Failed to show error screen: {nested_e}")
     
+    async def _pooled_screen(self, name: str, kwargs: Dict) -> Screen:
+        """Reset and return the pooled ``name`` screen, building it on first use"""
+        screen = self._screen_pool.get(name)
+        if screen is not None and screen not in self.screen_stack:
+            if self.debug_mode:
+                logger.info(f"Reusing pooled {screen.__class__.__name__}")
+            await screen.reset(**kwargs)
+            return screen
+        
+        screen = self.SCREENS[name](**kwargs)
+        if name not in self._screen_pool:
+            # Installed screens are not removed when popped
+            self._screen_pool[name] = screen
+            self.install_screen(screen, f"pool:{name}")
+        return screen
+    
     async def pop_screen(self) -> None:
         """Override pop_screen to add debugging"""
         if self.debug_mode:
@@ -244,7 +252,8 @@ class WirelessSGXApp(App):
                     logger.info("Logging target screen button states BEFORE pop:")
                     returning_to._log_button_states("BEFORE_POP_RETURN")
         
-        result = await super().pop_screen()
+        with span(f"pop {self.screen.__class__.__name__}", "screen"):
+            result = await super().pop_screen()
         
         if self.debug_mode:
             logger.info("AFTER POP_SCREEN:")
@@ -263,27 +272,19 @@ class WirelessSGXApp(App):
         return result
 
 
+def run_tui():
+    """Launch the TUI app"""
+    app = WirelessSGXApp()
+    if DEBUG_MODE:
+        print(f"Starting WirelessSGX TUI in debug mode. Log file: wirelesssgx_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+    app.run()
+
+
 def main():
-    """Main entry point"""
-    import sys
-    
-    # Check for debug flag
-    if '--debug' in sys.argv:
-        os.environ['WIRELESSSGX_DEBUG'] = '1'
-        sys.argv.remove('--debug')
-        print("Debug mode enabled. Check log file for details.")
-    
-    # Check if CLI commands are being used
-    if len(sys.argv) > 1:
-        from .cli import cli
-        cli()
-    else:
-        # Launch TUI app
-        app = WirelessSGXApp()
-        if DEBUG_MODE:
-            print(f"Starting WirelessSGX TUI in debug mode. Log file: wirelesssgx_debug_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
-        app.run()
+    """Main entry point (kept for backwards compatibility)"""
+    from .__main__ import main as _main
+    _main()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,240 @@
+"""Record/replay cassettes for ESSA traffic
+
+``RecordingTransport`` wraps the real HTTP transport of
+``WirelessSGXClient`` and appends every exchange (request parameters,
+status, ``Date`` header, JSON body and elapsed time) to a JSON cassette.
+``ReplayTransport`` serves a cassette back in order, optionally with the
+recorded timing, so registration and OTP validation can be debugged,
+tested and benchmarked without triggering real SMS OTPs.
+
+Cassettes are redacted as they are written: personal request parameters
+and the session's success code are replaced with placeholders, and the
+credentials in a validate-OTP response are re-encrypted as same-length
+placeholders under ``REDACTED_OTP``, with the captured nonce, tags and
+server date kept. Replaying a validate-OTP exchange with ``REDACTED_OTP``
+therefore exercises ``decrypt_credentials`` on the real payload shape.
+
+Set ``WIRELESSSGX_RECORD=PATH`` or ``WIRELESSSGX_REPLAY=PATH`` (plus
+``WIRELESSSGX_REPLAY_TIMING=1``) to use them from the CLI or the TUI.
+"""
+
+import codecs
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_VERSION = 1
+
+REDACTED_OTP = "123456"
+
+# Request parameters replaced when recording
+REDACTED_PARAMS = {
+    "api_password": "",
+    "mobile": "6590000000",
+    "dob": "01011990",
+    "name": "Some Person",
+    "email": "nonexistent@noaddresshere.com",
+    "otp": REDACTED_OTP,
+    "success_code": "redacted-success-code",
+}
+
+# Response headers kept in a cassette
+RECORDED_HEADERS = ("Date", "Content-Type")
+
+
+class CassetteError(requests.RequestException):
+    """No recorded exchange matches a request during replay"""
+    pass
+
+
+def load_cassette(path) -> Dict:
+    """Read a cassette, or an empty one if the file does not exist"""
+    try:
+        with open(path) as f:
+            cassette = json.load(f)
+    except FileNotFoundError:
+        return {"version": CASSETTE_VERSION, "interactions": []}
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version in {path}: {cassette.get('version')}")
+    return cassette
+
+
+def _placeholder(value: str, filler: str) -> str:
+    """Same-length stand-in for ``value`` (keeping any ``@domain``)"""
+    local, at, domain = value.partition("@")
+    return (filler * len(local))[:len(local)] + at + domain
+
+
+def redact_credentials(body: Dict, otp: str, tid: str, date) -> Dict:
+    """Re-encrypt the credentials of a validate-OTP body under REDACTED_OTP.
+
+    The placeholders are encrypted under the date the captured key
+    matched, so replays hit it on the same attempt. If the payload cannot
+    be decrypted with ``otp``, the encrypted fields are replaced with
+    random bytes of the same length.
+    """
+    from Crypto.Cipher import AES
+
+    from .core import WirelessSGXClient, parse_credentials
+
+    client = WirelessSGXClient(transport=requests)
+    client.transid = tid.encode()
+    encrypted = parse_credentials(body)
+    encrypted["date"] = date
+
+    redacted = dict(body, userid=_placeholder(body["userid"], "user"))
+    try:
+        _, password = client.decrypt_credentials(encrypted, otp)
+    except Exception:
+        for field in ("enc_userid", "enc_password"):
+            redacted[field] = os.urandom(len(encrypted[field])).hex()
+        return redacted
+
+    key = client._build_decrypt_key(client.find_key_date(encrypted, otp), REDACTED_OTP)
+    for field, plaintext in (("userid", redacted["userid"]),
+                             ("password", _placeholder(password, "secret"))):
+        aes = AES.new(key, AES.MODE_CCM, encrypted["nonce"])
+        aes.update(encrypted[f"tag_{field}"])
+        redacted[f"enc_{field}"] = codecs.encode(aes.encrypt(plaintext.encode()), "hex").decode()
+    return redacted
+
+
+def redact_interaction(params: Dict, body, headers) -> tuple:
+    """Redacted copies of a request's parameters and its JSON response body"""
+    from .core import server_date
+
+    redacted_params = {key: REDACTED_PARAMS.get(key, value) for key, value in params.items()}
+    if not isinstance(body, dict) or not isinstance(body.get("body"), dict):
+        return redacted_params, body
+
+    body = dict(body, body=dict(body["body"]))
+    if "success_code" in body["body"]:
+        body["body"]["success_code"] = REDACTED_PARAMS["success_code"]
+    if "enc_userid" in body["body"] and "otp" in params:
+        body["body"] = redact_credentials(body["body"], params["otp"],
+                                          params.get("tid", ""), server_date(headers))
+    return redacted_params, body
+
+
+class RecordingTransport:
+    """Passes requests to ``inner`` and appends each exchange to a cassette"""
+
+    def __init__(self, path, inner=None):
+        self.path = Path(path)
+        self.inner = inner or requests
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout=None, **kwargs):
+        start = time.monotonic()
+        response = self.inner.get(url, params=params, timeout=timeout, **kwargs)
+        elapsed = time.monotonic() - start
+
+        try:
+            body, text = response.json(), None
+        except ValueError:
+            body, text = None, response.text
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS
+                   if name in response.headers}
+        recorded_params, recorded_body = redact_interaction(dict(params or {}), body, headers)
+
+        interaction = {
+            "request": {"method": "GET", "url": url, "params": recorded_params},
+            "response": {"status": response.status_code, "headers": headers,
+                         "json": recorded_body, "text": text},
+            "elapsed": round(elapsed, 3),
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            cassette = load_cassette(self.path)
+            cassette["interactions"].append(interaction)
+            self._save(cassette)
+        return response
+
+    def _save(self, cassette: Dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(cassette, indent=2) + "\n")
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+
+class CassetteResponse:
+    """The parts of ``requests.Response`` the client uses"""
+
+    def __init__(self, url: str, recorded: Dict):
+        self.url = url
+        self.status_code = recorded["status"]
+        self.headers = CaseInsensitiveDict(recorded.get("headers") or {})
+        self._json = recorded.get("json")
+        self.text = recorded.get("text") or (json.dumps(self._json) if self._json is not None else "")
+
+    def json(self):
+        if self._json is None:
+            raise ValueError("Recorded response is not JSON")
+        # A fresh copy, as each real response would be
+        return json.loads(json.dumps(self._json))
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class ReplayTransport:
+    """Serves a cassette's responses in recorded order, per ESSA ``api``.
+
+    With ``timing`` each response takes as long as it did when recorded
+    (raising ``requests.Timeout`` if that exceeds the request timeout).
+    """
+
+    def __init__(self, path, timing: bool = False):
+        self.path = Path(path)
+        self.timing = timing
+        self.interactions: List[Dict] = load_cassette(self.path)["interactions"]
+        self._used = [False] * len(self.interactions)
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Optional[Dict] = None, timeout=None, **kwargs):
+        api = (params or {}).get("api")
+        with self._lock:
+            for index, interaction in enumerate(self.interactions):
+                if not self._used[index] and interaction["request"]["params"].get("api") == api:
+                    self._used[index] = True
+                    break
+            else:
+                raise CassetteError(f"No recorded response left for api={api} in {self.path}")
+
+        if self.timing:
+            delay = interaction.get("elapsed", 0.0)
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                raise requests.Timeout(f"Recorded response took {delay:.1f}s (timeout {timeout}s)")
+            time.sleep(delay)
+        return CassetteResponse(url, interaction["response"])
+
+    def rewind(self) -> None:
+        """Serve the cassette again from the start"""
+        with self._lock:
+            self._used = [False] * len(self.interactions)
+
+    @property
+    def remaining(self) -> int:
+        """Recorded exchanges not served yet"""
+        return self._used.count(False)
+
+
+def transport_from_env():
+    """Transport selected by WIRELESSSGX_RECORD / WIRELESSSGX_REPLAY"""
+    record = os.environ.get("WIRELESSSGX_RECORD")
+    replay = os.environ.get("WIRELESSSGX_REPLAY")
+    if record and replay:
+        raise ValueError("Set only one of WIRELESSSGX_RECORD and WIRELESSSGX_REPLAY")
+    if record:
+        return RecordingTransport(record)
+    timing = os.environ.get("WIRELESSSGX_REPLAY_TIMING", "").lower() in ('1', 'true', 'yes', 'on')
+    return ReplayTransport(replay, timing=timing)
@@ -1,11 +1,14 @@
 """CLI commands for managing Wireless@SGx"""
 
 import click
+import json
+import os
+import re
 import sys
-from .storage import SecureStorage
+import time
+from .storage import SecureStorage, StorageError
 from .network import NetworkManager, NetworkConfigError
-from textual.widgets import Button, Label, Static
-from textual.containers import Container, Vertical
+from .runner import run_sync
 
 
 @click.group()
@@ -14,14 +17,53 @@ def cli():
     pass
 
 
+def _echo_json(data: dict) -> None:
+    """Print a JSON document to stdout"""
+    click.echo(json.dumps(data, indent=2))
+
+
+def _fail(message: str, as_json: bool, code: int = 1) -> None:
+    """Report an error and exit with a non-zero status"""
+    if as_json:
+        _echo_json({"ok": False, "error": message})
+    else:
+        click.echo(f"❌ {message}", err=True)
+    sys.exit(code)
+
+
+def _flush_metrics() -> None:
+    """Update the metrics textfile from a long-running command"""
+    from . import metrics
+    try:
+        metrics.flush()
+    except OSError as e:
+        click.echo(f"Could not write metrics: {e}", err=True)
+
+
 @cli.command()
-def show():
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+def show(as_json):
     """Show saved credentials"""
+    from .state import collect_state
+    
     storage = SecureStorage()
     creds = storage.get_credentials()
     
     if not creds:
-        click.echo("No saved credentials found.")
+        if as_json:
+            _echo_json({"ok": True, "credentials": None})
+        else:
+            click.echo("No saved credentials found.")
+        return
+    
+    state = collect_state(storage=storage)
+    
+    if as_json:
+        _echo_json({
+            "ok": True,
+            "credentials": {"username": creds["username"], "isp": creds["isp"]},
+            "state": state
+        })
         return
     
     click.echo("\n🔐 Saved Wireless@SGx Credentials:")
@@ -32,25 +74,13 @@ def show():
     click.echo("─" * 40)
     
     # Check if auto-connect is enabled
-    network = NetworkManager()
-    try:
-        network_manager = network.detect_network_manager()
-        if network_manager == "networkmanager":
-            # Check if connection exists and has autoconnect
-            import subprocess
-            result = subprocess.run(
-                ["nmcli", "-t", "-f", "connection.autoconnect", "con", "show", "Wireless@SGx"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0 and result.stdout.strip() == "yes":
-                click.echo("✅ Auto-connect: Enabled")
-            else:
-                click.echo("❌ Auto-connect: Disabled")
+    if state["backend"] == "networkmanager":
+        if state["autoconnect"]:
+            click.echo("✅ Auto-connect: Enabled")
         else:
-            click.echo("ℹ️  Auto-connect: Available for NetworkManager only")
-    except:
-        pass
+            click.echo("❌ Auto-connect: Disabled")
+    elif state["backend"]:
+        click.echo("ℹ️  Auto-connect: Available for NetworkManager only")
     
     click.echo("\nOptions:")
     click.echo("  wirelesssgx connect     - Connect using saved credentials")
@@ -59,147 +89,510 @@ def show():
 
 
 @cli.command()
-def connect():
+@click.option("--fast-join", is_flag=True, default=None,
+              help="Use the fast re-authentication profile (or set WIRELESSSGX_FAST_JOIN=1)")
+@click.option("--verify-radius", metavar="HOST[:PORT]", default=None,
+              help="Verify credentials against this RADIUS server before replacing the profile")
+@click.option("--radius-secret", default=None, help="Shared secret for --verify-radius")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+def connect(fast_join, verify_radius, radius_secret, as_json):
     """Connect using saved credentials"""
     storage = SecureStorage()
     creds = storage.get_credentials()
     
     if not creds:
-        click.echo("❌ No saved credentials found. Run 'wirelesssgx' to set up.")
-        return 1
+        _fail("No saved credentials found. Run 'wirelesssgx' to set up.", as_json)
     
-    network = NetworkManager()
-    click.echo(f"🔄 Connecting to Wireless@SGx using saved credentials...")
+    network = NetworkManager(fast_join=fast_join, radius_server=verify_radius,
+                             radius_secret=radius_secret)
+    if not as_json:
+        click.echo(f"🔄 Connecting to Wireless@SGx using saved credentials...")
     
     try:
         # Configure network
-        if network.configure_network(creds['username'], creds['password']):
-            click.echo("✅ Network configured successfully!")
-            
-            # Try to connect immediately with NetworkManager
-            try:
-                import subprocess
-                subprocess.run(
-                    ["nmcli", "connection", "up", "Wireless@SGx"],
-                    capture_output=True,
-                    check=True
-                )
-                click.echo("✅ Connected to Wireless@SGx!")
-            except:
-                click.echo("ℹ️  Network configured. Connection will be established when in range.")
-        else:
-            click.echo("❌ Failed to configure network")
-            return 1
-            
+        if not network.configure_network(creds['username'], creds['password']):
+            _fail("Failed to configure network", as_json)
     except NetworkConfigError as e:
-        click.echo(f"❌ Error: {str(e)}")
-        return 1
+        _fail(f"Error: {str(e)}", as_json)
+    
+    if not as_json:
+        click.echo("✅ Network configured successfully!")
+    
+    # Try to connect immediately, skipping the attempt if out of range
+    result = network.activate()
+    
+    if as_json:
+        from .state import collect_state
+        _echo_json({
+            "ok": True,
+            "configured": True,
+            "connected": result["connected"],
+            "in_range": result["in_range"],
+            "bssid": result["bssid"],
+            "state": collect_state(network, storage)
+        })
+    elif result["connected"]:
+        click.echo(f"✅ Connected to Wireless@SGx! (BSSID {result['bssid']})")
+    elif not result["in_range"]:
+        click.echo("ℹ️  Wireless@SGx is not in range. Connection will be established when in range.")
+    else:
+        click.echo("ℹ️  Network configured. Connection will be established when in range.")
 
 
 @cli.command()
-def autoconnect():
+@click.option("--fast-join", is_flag=True, default=None,
+              help="Use the fast re-authentication profile (or set WIRELESSSGX_FAST_JOIN=1)")
+@click.option("--verify-radius", metavar="HOST[:PORT]", default=None,
+              help="Verify credentials against this RADIUS server before replacing the profile")
+@click.option("--radius-secret", default=None, help="Shared secret for --verify-radius")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+def autoconnect(fast_join, verify_radius, radius_secret, as_json):
     """Enable auto-connect for Wireless@SGx"""
     storage = SecureStorage()
     creds = storage.get_credentials()
     
     if not creds:
-        click.echo("❌ No saved credentials found. Run 'wirelesssgx' to set up.")
-        return 1
+        _fail("No saved credentials found. Run 'wirelesssgx' to set up.", as_json)
     
-    network = NetworkManager()
+    network = NetworkManager(fast_join=fast_join, radius_server=verify_radius,
+                             radius_secret=radius_secret)
     
     try:
         network_manager = network.detect_network_manager()
         
         if network_manager != "networkmanager":
-            click.echo("❌ Auto-connect is only available with NetworkManager")
-            click.echo("ℹ️  Your system uses: " + network_manager)
-            return 1
+            _fail(f"Auto-connect is only available with NetworkManager (your system uses: {network_manager})", as_json)
         
         # First ensure the connection is configured
-        click.echo("🔄 Configuring auto-connect for Wireless@SGx...")
+        if not as_json:
+            click.echo("🔄 Configuring auto-connect for Wireless@SGx...")
         
-        if network.configure_network(creds['username'], creds['password']):
-            # The connection is created with autoconnect=yes by default
-            click.echo("✅ Auto-connect enabled!")
-            click.echo("\nWireless@SGx will now connect automatically when in range.")
-            click.echo("To disable auto-connect, run: nmcli connection modify Wireless@SGx connection.autoconnect no")
-        else:
-            click.echo("❌ Failed to enable auto-connect")
-            return 1
+        if not network.configure_network(creds['username'], creds['password']):
+            _fail("Failed to enable auto-connect", as_json)
             
-    except Exception as e:
-        click.echo(f"❌ Error: {str(e)}")
-        return 1
+    except NetworkConfigError as e:
+        _fail(f"Error: {str(e)}", as_json)
+    
+    # The connection is created with autoconnect=yes by default
+    if as_json:
+        _echo_json({"ok": True, "autoconnect": True, "backend": network_manager})
+    else:
+        click.echo("✅ Auto-connect enabled!")
+        click.echo("\nWireless@SGx will now connect automatically when in range.")
+        click.echo("To disable auto-connect, run: nmcli connection modify Wireless@SGx connection.autoconnect no")
 
 
 @cli.command()
-def forget():
+@click.option("--yes", "-y", is_flag=True, help="Do not ask for confirmation")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+def forget(yes, as_json):
     """Delete saved credentials"""
     storage = SecureStorage()
     
     if not storage.has_credentials():
-        click.echo("No saved credentials to delete.")
+        if as_json:
+            _echo_json({"ok": True, "deleted": False})
+        else:
+            click.echo("No saved credentials to delete.")
         return
     
-    # Confirm deletion
-    if click.confirm("Are you sure you want to delete saved credentials?"):
-        if storage.delete_credentials():
-            click.echo("✅ Credentials deleted successfully")
-            
-            # Also try to remove network configuration
-            try:
-                import subprocess
-                subprocess.run(
-                    ["nmcli", "connection", "delete", "Wireless@SGx"],
-                    capture_output=True
-                )
-            except:
-                pass
+    # Confirm deletion (prompt on stderr so JSON output stays clean)
+    if not yes and not click.confirm("Are you sure you want to delete saved credentials?", err=as_json):
+        if as_json:
+            _echo_json({"ok": True, "deleted": False})
         else:
-            click.echo("❌ Failed to delete credentials")
-            return 1
+            click.echo("Cancelled.")
+        return
+    
+    if not storage.delete_credentials():
+        _fail("Failed to delete credentials", as_json)
+    
+    # Also try to remove network configuration
+    try:
+        run_sync(["nmcli", "connection", "delete", "Wireless@SGx"])
+    except FileNotFoundError:
+        pass
+    
+    if as_json:
+        _echo_json({"ok": True, "deleted": True})
     else:
-        click.echo("Cancelled.")
+        click.echo("✅ Credentials deleted successfully")
 
 
 @cli.command()
-def status():
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+@click.option("--cached", is_flag=True, help="Use the state file kept by 'wirelesssgx watch' if fresh")
+@click.option("--format", "fmt", default=None,
+              help="Output format: json, waybar or a template such as '{icon} {signal}%' "
+                   "(default with --cached: '{icon} {status}')")
+@click.option("--max-age", type=float, default=None, help="Maximum age of cached state in seconds")
+def status(as_json, cached, fmt, max_age):
     """Check connection status"""
-    network = NetworkManager()
+    from .statecache import DEFAULT_FORMAT, DEFAULT_MAX_AGE, format_state, read_state, write_state
+    
+    state = read_state(max_age if max_age is not None else DEFAULT_MAX_AGE) if cached else None
+    if state is None:
+        from .state import collect_state
+        state = collect_state()
+        # Keep the cache warm for the next poll
+        try:
+            write_state(state)
+        except OSError:
+            pass
+    
+    if as_json:
+        _echo_json(state)
+        return
+    
+    if fmt or cached:
+        # --cached prints the same one-line status whether or not the fast
+        # path could serve it from the state file
+        try:
+            click.echo(format_state(state, fmt or DEFAULT_FORMAT))
+        except (ValueError, IndexError) as e:
+            _fail(f"Invalid format: {e}", False)
+        return
     
-    if network.test_connection():
+    if state["connected"]:
         click.echo("✅ Connected to Wireless@SGx")
         
         # Show connection details if using NetworkManager
-        try:
-            import subprocess
-            result = subprocess.run(
-                ["nmcli", "-t", "-f", "IP4.ADDRESS,GENERAL.STATE", "con", "show", "Wireless@SGx"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                for line in lines:
-                    if "IP4.ADDRESS" in line:
-                        ip = line.split(':')[1]
-                        click.echo(f"IP Address: {ip}")
-                    elif "GENERAL.STATE" in line:
-                        state = line.split(':')[1]
-                        click.echo(f"State: {state}")
-        except:
-            pass
+        if state["ip4"]:
+            click.echo(f"IP Address: {state['ip4']}")
+        if state["state"]:
+            click.echo(f"State: {state['state']}")
+        if state["signal"] is not None:
+            click.echo(f"Signal: {state['signal']}%")
+        if state.get("link"):
+            from .linkquality import format_link
+            click.echo(f"Link: {format_link(state['link'])}")
     else:
         click.echo("❌ Not connected to Wireless@SGx")
         
-        storage = SecureStorage()
-        if storage.has_credentials():
+        if state["credentials"]:
             click.echo("\nYou have saved credentials. Try:")
             click.echo("  wirelesssgx connect - to connect now")
         else:
             click.echo("\nNo saved credentials. Run 'wirelesssgx' to set up.")
 
 
+def _link_monitor(network: NetworkManager, interval: float):
+    """Start sampling link quality for the state file's rolling stats, or
+    None if ``interval`` is 0 (off)"""
+    if interval <= 0:
+        return None
+    from .linkquality import LinkMonitor
+    return LinkMonitor(network.interface, interval=interval).start()
+
+
+def _with_link_stats(state: dict, monitor) -> None:
+    """Replace the state's single link sample with the monitor's stats"""
+    if monitor is None:
+        return
+    if state["device"]:
+        monitor.set_interface(state["device"])
+    if state["connected"]:
+        link = monitor.snapshot()
+        if link["samples"]:
+            state["link"] = link
+
+
+def _link_interval_option(command):
+    return click.option(
+        "--link-interval", type=float, envvar="WIRELESSSGX_DAEMON_LINK_INTERVAL", default=0.0,
+        show_default=True,
+        help="Seconds between background link quality samples for rolling stats (0: off)"
+    )(command)
+
+
+@cli.command()
+@click.option("--interval", type=float, default=5.0, show_default=True, help="Seconds between probes")
+@_link_interval_option
+def watch(interval, link_interval):
+    """Keep the cached state file current for 'status --cached'"""
+    from . import history
+    from .state import collect_state
+    from .statecache import state_file_path, write_state
+    
+    network = NetworkManager()
+    storage = SecureStorage()
+    click.echo(f"Writing state to {state_file_path()} every {interval:g}s (Ctrl+C to stop)", err=True)
+    
+    monitor = _link_monitor(network, link_interval)
+    # One connection for the whole loop rather than one per poll
+    store = history.open_store()
+    try:
+        while True:
+            state = collect_state(network, storage)
+            _with_link_stats(state, monitor)
+            write_state(state)
+            history.record_link(state["connected"], state["bssid"], profile=network.connection_name,
+                                store=store)
+            _flush_metrics()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if monitor is not None:
+            monitor.stop()
+        if store is not None:
+            store.close()
+
+
+@cli.command()
+@click.option("--max-backoff", type=float, default=300.0, show_default=True,
+              help="Upper bound for the reconnect backoff in seconds")
+@click.option("--print-unit", is_flag=True, help="Print a systemd unit for the daemon and exit")
+@click.option("--system", is_flag=True, help="With --print-unit, print a system (not user) unit")
+@_link_interval_option
+def daemon(max_backoff, print_unit, system, link_interval):
+    """Keep Wireless@SGx connected, reconnecting when it drops"""
+    from .daemon import (EventSource, NetworkManagerBackend, ReconnectSupervisor,
+                         render_systemd_unit, run_daemon)
+    from . import history
+    from .state import collect_state
+    from .statecache import write_state
+    
+    if print_unit:
+        click.echo(render_systemd_unit(system), nl=False)
+        return
+    
+    network = NetworkManager()
+    storage = SecureStorage()
+    supervisor = ReconnectSupervisor(NetworkManagerBackend(network), max_delay=max_backoff)
+    last_state = [None]
+    monitor = _link_monitor(network, link_interval)
+    store = history.open_store()
+    
+    def on_step(supervisor):
+        if supervisor.state != last_state[0]:
+            click.echo(f"[{time.strftime('%H:%M:%S')}] {supervisor.state} {json.dumps(supervisor.stats())}", err=True)
+            last_state[0] = supervisor.state
+        # Keep 'status --cached' current
+        state = collect_state(network, storage)
+        _with_link_stats(state, monitor)
+        state["daemon"] = supervisor.stats()
+        try:
+            write_state(state)
+        except OSError:
+            pass
+        history.record_link(state["connected"], state["bssid"], profile=network.connection_name,
+                            store=store)
+        _flush_metrics()
+    
+    try:
+        run_daemon(supervisor, EventSource(), on_step)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if monitor is not None:
+            monitor.stop()
+        if store is not None:
+            store.close()
+
+
+@cli.command()
+@click.option("--days", type=click.IntRange(1, 366), default=7, show_default=True,
+              help="Number of days to report on")
+@click.option("--slowest", type=int, default=5, show_default=True,
+              help="Number of slowest connects to list")
+@click.option("--compact", is_flag=True, help="Drop entries past the retention period now")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+def history(days, slowest, compact, as_json):
+    """Show connection uptime, failures and slow connects"""
+    import sqlite3
+    from .history import HistoryStore
+
+    try:
+        with HistoryStore() as store:
+            removed = store.compact() if compact else None
+            report = {
+                "uptime": store.uptime_per_day(days),
+                "failures": store.failure_rate(days),
+                "slowest": store.slowest_connects(slowest, days),
+            }
+    except (sqlite3.Error, OSError) as e:
+        _fail(f"Could not read connection history: {e}", as_json)
+
+    if as_json:
+        if removed is not None:
+            report["compacted"] = removed
+        _echo_json(report)
+        return
+
+    if removed is not None:
+        click.echo(f"Compacted: removed {removed['attempts']} attempts and {removed['links']} link changes\n")
+
+    click.echo("Uptime per day:")
+    for day in report["uptime"]:
+        hours = day["uptime"] / 3600
+        click.echo(f"  {day['date']}  {hours:5.1f}h  {'█' * round(day['ratio'] * 24):<24} {day['ratio']:.0%}")
+
+    failures = report["failures"]
+    click.echo(f"\nConnect attempts: {failures['attempts']}, failed: {failures['failures']} "
+               f"({failures['rate']:.0%})")
+    for reason, count in failures["reasons"].items():
+        click.echo(f"  {reason}: {count}")
+
+    if report["slowest"]:
+        click.echo("\nSlowest connects:")
+        for attempt in report["slowest"]:
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(attempt["ts"]))
+            click.echo(f"  {when}  {attempt['duration']:6.2f}s  {attempt['bssid'] or '-'}")
+
+
+@cli.command()
+@click.option("--root", "roots", multiple=True, type=click.Path(file_okay=False),
+              help="Root directory to write the keyfile into (repeatable)")
+@click.option("--manifest", type=click.Path(exists=True, dir_okay=False),
+              help="JSON list of {root, username, password[, fast_join]} entries")
+@click.option("--username", default=None, help="Username (defaults to saved credentials)")
+@click.option("--password", default=None, help="Password (defaults to saved credentials)")
+@click.option("--fast-join", is_flag=True, default=None, help="Write the fast re-authentication profile")
+@click.option("--workers", type=int, default=8, show_default=True, help="Roots provisioned in parallel")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+def provision(roots, manifest, username, password, fast_join, workers, as_json):
+    """Write NetworkManager keyfiles into root filesystems without nmcli"""
+    from .keyfile import load_manifest, provision as provision_roots
+    
+    entries = load_manifest(manifest) if manifest else []
+    if roots:
+        if not (username and password):
+            creds = SecureStorage().get_credentials()
+            if not creds:
+                _fail("No credentials given and none saved. Use --username/--password.", as_json)
+            username = username or creds["username"]
+            password = password or creds["password"]
+        entries += [{"root": root, "username": username, "password": password} for root in roots]
+    
+    if not entries:
+        _fail("Nothing to provision. Use --root or --manifest.", as_json)
+    
+    results = provision_roots(entries, workers=workers, fast_join=fast_join)
+    
+    # Load the profile into a running NetworkManager when writing to the live system
+    for r in results:
+        if r["ok"] and os.path.abspath(r["root"]) == "/":
+            try:
+                run_sync(["nmcli", "connection", "load", r["path"]])
+            except FileNotFoundError:
+                pass
+    
+    failed = [r for r in results if not r["ok"]]
+    if as_json:
+        _echo_json({"ok": not failed, "results": results})
+    else:
+        for r in results:
+            click.echo(f"✅ {r['path']}" if r["ok"] else f"❌ {r['root']}: {r['error']}")
+        click.echo(f"\nProvisioned {len(results) - len(failed)}/{len(results)} root(s)")
+    
+    if failed:
+        sys.exit(1)
+
+
+@cli.command()
+@click.option("--isp", type=click.Choice(["singtel", "starhub"], case_sensitive=False),
+              default="singtel", show_default=True, help="Your ISP")
+@click.option("--mobile", required=True, help="8-digit Singapore mobile number")
+@click.option("--dob", required=True, help="Date of birth (DDMMYYYY)")
+@click.option("--retrieve", is_flag=True, help="Retrieve an existing account instead of registering")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+def register(isp, mobile, dob, retrieve, as_json):
+    """Request an OTP and save the pending session"""
+    from .core import WirelessSGXClient, WirelessSGXError
+    
+    if not re.match(r"^(65)?[0-9]{8}$", mobile):
+        _fail("Mobile must be an 8-digit Singapore mobile number", as_json)
+    if not re.match(r"^[0-3][0-9][0-1][0-9][1-2][0-9]{3}$", dob):
+        _fail("Date of birth must be in DDMMYYYY format", as_json)
+    
+    # Add Singapore country code if not present
+    if len(mobile) == 8:
+        mobile = "65" + mobile
+    isp = isp.lower()
+    
+    try:
+        client = WirelessSGXClient(isp)
+        success_code = client.request_registration(mobile, dob, retrieve_mode=retrieve)
+    except WirelessSGXError as e:
+        message = str(e)
+        if "registered before" in message.lower() and not retrieve:
+            message += " (try again with --retrieve)"
+        _fail(message, as_json)
+    
+    storage = SecureStorage()
+    try:
+        session = storage.save_pending_session(success_code, mobile, dob, isp, retrieve)
+    except StorageError as e:
+        _fail(str(e), as_json)
+    
+    if as_json:
+        _echo_json({
+            "ok": True,
+            "isp": session["isp"],
+            "mode": session["mode"],
+            "mobile": mobile[2:],
+            "timestamp": session["timestamp"]
+        })
+    else:
+        click.echo(f"✅ OTP sent to {mobile[2:]}")
+        click.echo("Run 'wirelesssgx verify --otp XXXXXX' once you receive it.")
+
+
+@cli.command()
+@click.option("--otp", required=True, help="6-digit OTP received by SMS")
+@click.option("--show-password", is_flag=True, help="Include the password in the output")
+@click.option("--json", "as_json", is_flag=True, help="Output JSON")
+def verify(otp, show_password, as_json):
+    """Verify the OTP of a pending session and save credentials"""
+    from .core import WirelessSGXClient, WirelessSGXError
+    
+    if not re.match(r"^[0-9]{6}$", otp):
+        _fail("OTP must be 6 digits", as_json)
+    
+    storage = SecureStorage()
+    session = storage.get_pending_session()
+    if not session:
+        _fail("No pending session. Run 'wirelesssgx register' first.", as_json)
+    
+    retrieve_mode = session["mode"] == "retrieve"
+    
+    try:
+        client = WirelessSGXClient(session["isp"])
+        encrypted_data = client.validate_otp(
+            session["mobile"], session["dob"], otp,
+            session["success_code"], retrieve_mode
+        )
+        username, password = client.decrypt_credentials(encrypted_data, otp)
+    except WirelessSGXError as e:
+        _fail(f"Verification failed: {str(e)}", as_json)
+    
+    try:
+        saved = storage.save_credentials(username, password, session["isp"])
+    except StorageError as e:
+        _fail(str(e), as_json)
+    storage.delete_pending_session()
+    
+    if as_json:
+        result = {
+            "ok": True,
+            "username": username,
+            "isp": session["isp"],
+            "mode": session["mode"],
+            "saved": saved,
+            "session_age": round(time.time() - session["timestamp"], 1)
+        }
+        if show_password:
+            result["password"] = password
+        _echo_json(result)
+    else:
+        click.echo("✅ Verification successful!")
+        click.echo(f"Username: {username}")
+        click.echo(f"Password: {password if show_password else '*' * len(password)}")
+        click.echo(f"ISP: {session['isp']}")
+        if saved:
+            click.echo("💾 Credentials saved. Run 'wirelesssgx connect' to connect.")
+
+
 if __name__ == "__main__":
     cli()
\ No newline at end of file
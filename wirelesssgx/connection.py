@@ -0,0 +1,225 @@
+"""Connection state machine for configuring and joining Wireless@SGx
+
+Setup moves through ``configuring → activating → authenticating → ip →
+verified``. ``connect`` drives a ``ConnectionStateMachine`` through those
+stages from real backend events: the result of each step, and
+NetworkManager device state changes read from ``nmcli device monitor``
+while the activation is running. Screens subscribe to the changes to show
+live progress and close as soon as a terminal state is reached.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .deadline import Deadline
+from .network import NetworkManager, NetworkConfigError
+from .runner import spawn
+
+CONFIGURING = "configuring"
+ACTIVATING = "activating"
+AUTHENTICATING = "authenticating"
+IP_CONFIG = "ip"
+VERIFIED = "verified"
+
+# Terminal states besides VERIFIED
+OUT_OF_RANGE = "out_of_range"
+FAILED = "failed"
+
+STAGES = (CONFIGURING, ACTIVATING, AUTHENTICATING, IP_CONFIG, VERIFIED)
+TERMINAL = (VERIFIED, OUT_OF_RANGE, FAILED)
+
+STAGE_LABELS = {
+    CONFIGURING: "Configuring profile",
+    ACTIVATING: "Activating",
+    AUTHENTICATING: "Authenticating",
+    IP_CONFIG: "Getting IP address",
+    VERIFIED: "Connected",
+}
+
+# How long a finished screen stays up before closing
+DEFAULT_LINGER = 1.0
+
+# NetworkManager device states (as printed by ``nmcli device monitor``)
+# and the stage they put us in
+_DEVICE_STATES = (
+    ("connecting (prepare)", ACTIVATING),
+    ("connecting (configuring)", ACTIVATING),
+    ("connecting (need authentication)", AUTHENTICATING),
+    ("connecting (getting IP configuration)", IP_CONFIG),
+    ("connecting (checking IP connectivity)", IP_CONFIG),
+    ("connecting (starting secondary connections)", IP_CONFIG),
+)
+
+
+def linger_time() -> float:
+    """Seconds to keep a finished screen visible (``WIRELESSSGX_LINGER``)"""
+    try:
+        return max(0.0, float(os.environ.get("WIRELESSSGX_LINGER", DEFAULT_LINGER)))
+    except ValueError:
+        return DEFAULT_LINGER
+
+
+def parse_device_event(line: str) -> Optional[str]:
+    """Map a ``nmcli device monitor`` line to a stage, if it is one"""
+    _, _, state = line.strip().partition(": ")
+    for prefix, stage in _DEVICE_STATES:
+        if state.startswith(prefix):
+            return stage
+    return None
+
+
+class ConnectionStateMachine:
+    """Tracks progress through the connection stages.
+
+    Stages only move forward (late or repeated device events are ignored)
+    and nothing changes after a terminal state. ``on_change`` is called
+    with the machine after every transition, from whichever thread made
+    it.
+    """
+
+    def __init__(self, on_change: Optional[Callable[["ConnectionStateMachine"], None]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.on_change = on_change
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state: Optional[str] = None
+        self.detail: Optional[str] = None
+        # (state, monotonic time entered)
+        self.history: List[Tuple[str, float]] = []
+
+    @property
+    def done(self) -> bool:
+        return self.state in TERMINAL
+
+    @property
+    def stage(self) -> Optional[str]:
+        """Last stage entered (after FAILED, the one that failed)"""
+        entered = [state for state, _ in self.history if state in STAGES]
+        return entered[-1] if entered else None
+
+    def advance(self, state: str, detail: Optional[str] = None) -> bool:
+        """Move to ``state``; returns False if the transition is ignored"""
+        with self._lock:
+            if self.done:
+                return False
+            if state in STAGES and self.state in STAGES and \
+                    STAGES.index(state) <= STAGES.index(self.state):
+                return False
+            self.state = state
+            self.detail = detail
+            self.history.append((state, self._clock()))
+        if self.on_change:
+            self.on_change(self)
+        return True
+
+    def fail(self, reason: str) -> bool:
+        return self.advance(FAILED, reason)
+
+    def durations(self) -> Dict[str, float]:
+        """Seconds spent in each state that has been left"""
+        return {
+            state: round(end - start, 3)
+            for (state, start), (_, end) in zip(self.history, self.history[1:])
+        }
+
+
+def _follow_device(device: str, machine: ConnectionStateMachine,
+                   deadline: Optional[Deadline]):
+    """Feed ``nmcli device monitor`` events into ``machine`` from a thread.
+
+    Returns the monitor process (the caller terminates it), or None if
+    nmcli is not available.
+    """
+    try:
+        process = spawn(["nmcli", "device", "monitor", device])
+    except FileNotFoundError:
+        return None
+    if deadline is not None:
+        deadline.add_callback(process.kill)
+
+    def follow():
+        for line in process.stdout:
+            stage = parse_device_event(line)
+            if stage:
+                machine.advance(stage)
+
+    threading.Thread(target=follow, daemon=True).start()
+    return process
+
+
+def connect(network: NetworkManager, username: str, password: str,
+            machine: ConnectionStateMachine, deadline: Optional[Deadline] = None,
+            configure: bool = True, backend: Optional[str] = None) -> str:
+    """Configure (unless ``configure`` is False), activate and verify.
+
+    ``backend`` skips detection when it is already known. Blocks until a
+    terminal state is reached and returns it. Configuration errors are
+    reported as FAILED; FlowCancelled propagates.
+    """
+    if configure:
+        machine.advance(CONFIGURING)
+        try:
+            if not network.configure_network(username, password, backend=backend, deadline=deadline):
+                machine.fail("Failed to configure network")
+                return machine.state
+        except NetworkConfigError as e:
+            machine.fail(str(e))
+            return machine.state
+
+    aps = network.scan_for_ssid(deadline=deadline)
+    if not aps:
+        machine.advance(OUT_OF_RANGE)
+        return machine.state
+
+    machine.advance(ACTIVATING, aps[0]["bssid"])
+    monitor = _follow_device(aps[0]["device"], machine, deadline) if aps[0]["device"] else None
+    try:
+        result = network.activate(deadline=deadline)
+    finally:
+        if monitor is not None:
+            if deadline is not None:
+                deadline.remove_callback(monitor.kill)
+            monitor.kill()
+            monitor.wait()
+
+    if not result["in_range"]:
+        machine.advance(OUT_OF_RANGE)
+    elif not result["connected"]:
+        machine.fail("Activation failed")
+    else:
+        info = network.get_profile_info(deadline=deadline) or {}
+        if info.get("IP4.ADDRESS"):
+            machine.advance(VERIFIED, info["IP4.ADDRESS"])
+        elif network.test_connection(deadline=deadline):
+            machine.advance(VERIFIED)
+        else:
+            machine.fail("Connected but no IP address")
+    return machine.state
+
+
+def render_progress(machine: ConnectionStateMachine) -> str:
+    """One line per stage: done, in progress, failed or pending"""
+    durations = machine.durations()
+    current = machine.stage
+
+    lines = []
+    for stage in STAGES:
+        if current is None or STAGES.index(stage) > STAGES.index(current):
+            marker = "·"
+        elif stage != current or stage == VERIFIED:
+            marker = "✅"
+        elif machine.state == FAILED:
+            marker = "❌"
+        elif machine.done:
+            marker = "✅"
+        else:
+            marker = "⏳"
+        line = f"{marker} {STAGE_LABELS[stage]}"
+        if stage in durations:
+            line += f" ({durations[stage]:.1f}s)"
+        elif stage == VERIFIED and machine.state == VERIFIED and machine.detail:
+            line += f" ({machine.detail})"
+        lines.append(line)
+    return "\n".join(lines)
@@ -2,12 +2,20 @@
 
 import sys
 import os
+import time
 import requests
 import datetime
 import codecs
+import email.utils
+import logging
 from typing import Dict, Optional, Tuple
 from Crypto.Cipher import AES
 
+from . import metrics
+from .deadline import Deadline, bounded
+from .tracing import span
+
+logger = logging.getLogger('wirelesssgx.core')
 
 # ISP Configuration
 ISP_CONFIG = {
@@ -29,6 +37,12 @@ DEFAULT_ISP = "singtel"
 DEFAULT_TRANSID = b"053786654500000000000000"
 RC_SUCCESS = 1100
 
+# Per-request HTTP timeout (capped by the flow deadline, if any)
+HTTP_TIMEOUT = 30
+
+# The ESSA servers derive the credential key from the Singapore date
+SGT = datetime.timezone(datetime.timedelta(hours=8))
+
 
 class WirelessSGXError(Exception):
     """Base exception for Wireless@SGx errors"""
@@ -50,15 +64,56 @@ class ValidationError(WirelessSGXError):
     pass
 
 
+def server_date(headers) -> Optional[datetime.datetime]:
+    """Singapore-time date from a response's ``Date`` header, if it has one"""
+    try:
+        return email.utils.parsedate_to_datetime(headers["Date"]).astimezone(SGT)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def default_transport():
+    """``requests``, or a cassette transport when one is configured.
+
+    ``WIRELESSSGX_RECORD=PATH`` records every exchange to a redacted
+    cassette; ``WIRELESSSGX_REPLAY=PATH`` serves them back (see
+    ``cassette``).
+    """
+    if os.environ.get("WIRELESSSGX_RECORD") or os.environ.get("WIRELESSSGX_REPLAY"):
+        from .cassette import transport_from_env
+        return transport_from_env()
+    return requests
+
+
+def parse_credentials(body: Dict) -> Dict:
+    """Decode the encrypted credential fields of a validate-OTP response body"""
+    def hexdecode(s):
+        return codecs.decode(bytes(s, "utf8"), encoding="hex")
+    
+    return {
+        "userid": bytes(body["userid"], "utf8"),
+        "enc_userid": hexdecode(body["enc_userid"]),
+        "tag_userid": hexdecode(body["tag_userid"]),
+        "enc_password": hexdecode(body["enc_password"]),
+        "tag_password": hexdecode(body["tag_password"]),
+        "nonce": bytes(body["iv"], "utf8")
+    }
+
+
 class WirelessSGXClient:
-    """Client for Wireless@SGx registration and authentication"""
+    """Client for Wireless@SGx registration and authentication
+    
+    ``transport`` is anything with a ``requests``-compatible ``get``
+    (the ``requests`` module itself by default).
+    """
     
-    def __init__(self, isp: str = DEFAULT_ISP):
+    def __init__(self, isp: str = DEFAULT_ISP, transport=None):
         if isp not in ISP_CONFIG:
             raise ValueError(f"Invalid ISP: {isp}. Choose from: {list(ISP_CONFIG.keys())}")
         self.isp = isp
         self.config = ISP_CONFIG[isp]
         self.transid = DEFAULT_TRANSID
+        self.transport = transport or default_transport()
         
     def _validate_response(self, resp: dict, key: str, val=None) -> None:
         """Validate server response"""
@@ -81,7 +136,8 @@ class WirelessSGXClient:
                            salutation: str = "Mr", name: str = "Some Person",
                            gender: str = "m", country: str = "SG",
                            email: str = "nonexistent@noaddresshere.com",
-                           retrieve_mode: bool = False) -> str:
+                           retrieve_mode: bool = False,
+                           deadline: Optional[Deadline] = None) -> str:
         """Request registration/retrieve and return success code"""
         
         api = "retrieve_user_r12x2a" if retrieve_mode else "create_user_r12x1a"
@@ -103,18 +159,25 @@ class WirelessSGXClient:
         # Debug logging
         import json
         debug_params = {k: (v.decode() if isinstance(v, bytes) else v) for k, v in params.items() if k != 'api_password'}
-        print(f"DEBUG: Making request to {self.config['essa_url']}")
-        print(f"DEBUG: With params: {json.dumps(debug_params, indent=2)}")
+        logger.debug(f"Making request to {self.config['essa_url']}")
+        logger.debug(f"With params: {json.dumps(debug_params, indent=2)}")
         
+        start = time.perf_counter()
         try:
-            r = requests.get(self.config["essa_url"], params=params, timeout=30)
+            with span(f"essa {api}", "essa", isp=self.isp):
+                r = self.transport.get(self.config["essa_url"], params=params,
+                                       timeout=bounded(deadline, HTTP_TIMEOUT))
             r.raise_for_status()
         except requests.RequestException as e:
+            metrics.observe_essa(api, time.perf_counter() - start, ok=False)
+            if deadline is not None:
+                deadline.check()
             raise HTTPError(f"Failed to make registration request: {e}")
+        metrics.observe_essa(api, time.perf_counter() - start, ok=True)
         
         try:
             resp = r.json()
-            print(f"DEBUG: Response: {json.dumps(resp, indent=2)}")
+            logger.debug(f"Response: {json.dumps(resp, indent=2)}")
         except ValueError:
             raise ValidationError("Invalid JSON response from server")
         
@@ -127,7 +190,8 @@ class WirelessSGXClient:
         return resp["body"]["success_code"]
     
     def validate_otp(self, mobile: str, dob: str, otp: str,
-                     success_code: str, retrieve_mode: bool = False) -> Dict:
+                     success_code: str, retrieve_mode: bool = False,
+                     deadline: Optional[Deadline] = None) -> Dict:
         """Validate OTP and return credentials"""
         
         api = "retrieve_user_r12x2b" if retrieve_mode else "create_user_r12x1b"
@@ -143,11 +207,18 @@ class WirelessSGXClient:
             "tid": self.transid.decode() if isinstance(self.transid, bytes) else self.transid
         }
         
+        start = time.perf_counter()
         try:
-            r = requests.get(self.config["essa_url"], params=params, timeout=30)
+            with span(f"essa {api}", "essa", isp=self.isp):
+                r = self.transport.get(self.config["essa_url"], params=params,
+                                       timeout=bounded(deadline, HTTP_TIMEOUT))
             r.raise_for_status()
         except requests.RequestException as e:
+            metrics.observe_essa(api, time.perf_counter() - start, ok=False)
+            if deadline is not None:
+                deadline.check()
             raise HTTPError(f"Failed to validate OTP: {e}")
+        metrics.observe_essa(api, time.perf_counter() - start, ok=True)
         
         try:
             resp = r.json()
@@ -164,22 +235,37 @@ class WirelessSGXClient:
         for field in required_fields:
             self._validate_response(resp["body"], field)
         
-        def hexdecode(s):
-            return codecs.decode(bytes(s, "utf8"), encoding="hex")
-        
-        return {
-            "userid": bytes(resp["body"]["userid"], "utf8"),
-            "enc_userid": hexdecode(resp["body"]["enc_userid"]),
-            "tag_userid": hexdecode(resp["body"]["tag_userid"]),
-            "enc_password": hexdecode(resp["body"]["enc_password"]),
-            "tag_password": hexdecode(resp["body"]["tag_password"]),
-            "nonce": bytes(resp["body"]["iv"], "utf8")
-        }
+        encrypted_data = parse_credentials(resp["body"])
+        # The key is derived from the server's date, not ours
+        encrypted_data["date"] = server_date(r.headers)
+        return encrypted_data
     
     def decrypt_credentials(self, encrypted_data: Dict, otp: str) -> Tuple[str, str]:
         """Decrypt credentials and return username, password"""
         
-        decryption_date = datetime.datetime.now()
+        with span("decrypt_credentials", "crypto"):
+            date = self.find_key_date(encrypted_data, otp)
+        if date is not None:
+            try:
+                password = self._decrypt(
+                    self._build_decrypt_key(date, otp),
+                    encrypted_data["nonce"],
+                    encrypted_data["tag_password"],
+                    encrypted_data["enc_password"]
+                )
+                return (
+                    encrypted_data["userid"].decode(),
+                    password.decode()
+                )
+            except Exception:
+                pass
+        
+        raise ValidationError("Failed to decrypt credentials. Invalid OTP or date mismatch.")
+    
+    def find_key_date(self, encrypted_data: Dict, otp: str) -> Optional[datetime.datetime]:
+        """Date whose key decrypts the user ID, trying the server's date
+        (or today) and the days either side of it"""
+        decryption_date = encrypted_data.get("date") or datetime.datetime.now()
         try_dates = [
             decryption_date,
             decryption_date + datetime.timedelta(1),
@@ -187,31 +273,18 @@ class WirelessSGXClient:
         ]
         
         for date in try_dates:
-            key = self._build_decrypt_key(date, otp)
             try:
                 decrypted_userid = self._decrypt(
-                    key,
+                    self._build_decrypt_key(date, otp),
                     encrypted_data["nonce"],
                     encrypted_data["tag_userid"],
                     encrypted_data["enc_userid"]
                 )
-                
-                if decrypted_userid == encrypted_data["userid"]:
-                    password = self._decrypt(
-                        key,
-                        encrypted_data["nonce"],
-                        encrypted_data["tag_password"],
-                        encrypted_data["enc_password"]
-                    )
-                    
-                    return (
-                        encrypted_data["userid"].decode(),
-                        password.decode()
-                    )
             except Exception:
                 continue
-        
-        raise ValidationError("Failed to decrypt credentials. Invalid OTP or date mismatch.")
+            if decrypted_userid == encrypted_data["userid"]:
+                return date
+        return None
     
     def _build_decrypt_key(self, date: datetime.datetime, otp: str) -> bytes:
         """Build decryption key from date, transid, and OTP"""
@@ -0,0 +1,226 @@
+"""Auto-reconnect supervisor for Wireless@SGx
+
+The daemon sleeps on link/NetworkManager events (``nmcli monitor`` and
+``ip monitor link``) rather than polling, and reconnects with bounded
+exponential backoff whenever Wireless@SGx is in range but not active.
+
+The reconnect logic lives in ``ReconnectSupervisor``, which only talks
+to a backend object and a clock, so it can be driven by simulated
+backends in tests.
+"""
+
+import os
+import select
+import shutil
+import subprocess
+import sys
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import metrics
+from .network import NetworkManager
+from .runner import spawn
+
+# Seconds to wait for an event before re-probing, by situation
+CONNECTED_POLL = 300.0
+OUT_OF_RANGE_POLL = 30.0
+
+SYSTEMD_UNIT = """[Unit]
+Description=Wireless@SGx auto-reconnect supervisor
+{dependencies}
+[Service]
+Type=simple
+ExecStart={exec_start} daemon
+Restart=on-failure
+RestartSec=10
+Nice=10
+
+[Install]
+WantedBy={wanted_by}
+"""
+
+
+class NetworkManagerBackend:
+    """Reconnect backend that drives NetworkManager through nmcli"""
+
+    def __init__(self, network: Optional[NetworkManager] = None):
+        self.network = network or NetworkManager()
+
+    def probe(self) -> Tuple[bool, bool]:
+        """Return (connected, visible) for the Wireless@SGx SSID"""
+        connected = visible = False
+        for ap in self.network.list_access_points():
+            if ap["ssid"] == self.network.ssid:
+                visible = True
+                connected = connected or ap["active"]
+        return connected, visible
+
+    def activate(self) -> bool:
+        """Try to bring the connection up on the strongest BSSID"""
+        return self.network.activate()["connected"]
+
+
+class ReconnectSupervisor:
+    """Reconnect state machine with bounded exponential backoff"""
+
+    CONNECTED = "connected"
+    OUT_OF_RANGE = "out_of_range"
+    BACKOFF = "backoff"
+
+    def __init__(self, backend, clock: Callable[[], float] = time.monotonic,
+                 base_delay: float = 2.0, max_delay: float = 300.0):
+        self.backend = backend
+        self.clock = clock
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.state: Optional[str] = None
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.disconnected_since: Optional[float] = None
+
+        self.reconnects = 0
+        self.attempts = 0
+        self.latencies = deque(maxlen=100)
+
+    def backoff_delay(self) -> float:
+        """Delay before the next attempt after ``self.failures`` failures"""
+        return min(self.base_delay * (2 ** (self.failures - 1)), self.max_delay)
+
+    def step(self) -> Optional[float]:
+        """Probe the link, reconnect if due, and return seconds to sleep.
+
+        ``None`` means there is nothing to do until the next event.
+        """
+        now = self.clock()
+        connected, visible = self.backend.probe()
+
+        if connected:
+            self._mark_connected(now)
+            return None
+
+        if self.disconnected_since is None:
+            self.disconnected_since = now
+
+        if not visible:
+            # Nothing to try until the SSID shows up again
+            self.state = self.OUT_OF_RANGE
+            return OUT_OF_RANGE_POLL
+
+        if now < self.next_attempt:
+            self.state = self.BACKOFF
+            return self.next_attempt - now
+
+        self.attempts += 1
+        if self.backend.activate():
+            self._mark_connected(self.clock())
+            return None
+
+        self.failures += 1
+        self.state = self.BACKOFF
+        self.next_attempt = now + self.backoff_delay()
+        return self.next_attempt - now
+
+    def _mark_connected(self, now: float) -> None:
+        """Record a (re)connection and reset the backoff"""
+        if self.disconnected_since is not None:
+            self.reconnects += 1
+            metrics.count_reconnect()
+            self.latencies.append(now - self.disconnected_since)
+        self.state = self.CONNECTED
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.disconnected_since = None
+
+    def stats(self) -> Dict:
+        """Reconnect counters and latencies"""
+        latencies = sorted(self.latencies)
+        return {
+            "state": self.state,
+            "reconnects": self.reconnects,
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "last_reconnect_latency": self.latencies[-1] if self.latencies else None,
+            "median_reconnect_latency": latencies[len(latencies) // 2] if latencies else None,
+        }
+
+
+class EventSource:
+    """Wake up on output from link and NetworkManager monitors"""
+
+    MONITORS = (
+        ["nmcli", "monitor"],
+        ["ip", "monitor", "link"],
+    )
+
+    def __init__(self, monitors: Optional[List[List[str]]] = None):
+        self.processes = []
+        for cmd in monitors if monitors is not None else self.MONITORS:
+            try:
+                self.processes.append(spawn(cmd))
+            except FileNotFoundError:
+                pass
+
+    def wait(self, timeout: Optional[float], settle: float = 0.25,
+             max_settle: float = 2.0) -> bool:
+        """Block until an event arrives or ``timeout`` expires.
+
+        Events arriving within ``settle`` seconds of each other (for at
+        most ``max_settle`` seconds) are coalesced into one wakeup. Returns
+        True if woken by an event. With no monitor available this degrades
+        to sleeping for ``timeout``.
+        """
+        # Read the raw descriptors: lines held in a file object's buffer
+        # would never make select() report them
+        streams = {p.stdout.fileno(): p for p in self.processes if p.poll() is None}
+        if not streams:
+            time.sleep(timeout if timeout is not None else OUT_OF_RANGE_POLL)
+            return False
+
+        woken = False
+        ready, _, _ = select.select(list(streams), [], [], timeout)
+        settle_until = time.monotonic() + max_settle
+        while ready:
+            woken = True
+            for fd in ready:
+                if not os.read(fd, 65536):
+                    # Monitor exited; stop watching it
+                    streams.pop(fd).wait()
+            if not streams or time.monotonic() >= settle_until:
+                break
+            ready, _, _ = select.select(list(streams), [], [], settle)
+        return woken
+
+    def close(self) -> None:
+        """Stop the monitor processes"""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def render_systemd_unit(system: bool = False) -> str:
+    """Render a systemd user (or system) unit that runs the daemon"""
+    exec_start = shutil.which("wirelesssgx") or f"{sys.executable} -m wirelesssgx"
+    return SYSTEMD_UNIT.format(
+        dependencies="After=NetworkManager.service\nWants=NetworkManager.service\n" if system else "",
+        exec_start=exec_start,
+        wanted_by="multi-user.target" if system else "default.target",
+    )
+
+
+def run_daemon(supervisor: ReconnectSupervisor, events: EventSource,
+               on_step: Optional[Callable[[ReconnectSupervisor], None]] = None) -> None:
+    """Run the supervisor until interrupted"""
+    try:
+        while True:
+            timeout = supervisor.step()
+            if on_step:
+                on_step(supervisor)
+            events.wait(CONNECTED_POLL if timeout is None else timeout)
+    finally:
+        events.close()
@@ -0,0 +1,133 @@
+"""Deadline and cancellation context for the setup flow
+
+A ``Deadline`` is created by a screen (or CLI command) and passed down
+through ``WirelessSGXClient``, ``SecureStorage`` and ``NetworkManager``.
+Blocking calls take their timeout from it and child processes are killed
+when it is cancelled, so leaving a screen or exhausting the flow budget
+releases worker threads promptly instead of waiting on fixed timeouts.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+# Overall budget for one flow (registration, configure + connect)
+DEFAULT_FLOW_BUDGET = 120.0
+
+
+class FlowCancelled(Exception):
+    """The flow was cancelled (e.g. the user left the screen)"""
+    pass
+
+
+class DeadlineExceeded(FlowCancelled):
+    """The flow ran out of time"""
+    pass
+
+
+class Deadline:
+    """Thread-safe deadline with cancellation callbacks"""
+
+    def __init__(self, budget: Optional[float] = None, parent: Optional["Deadline"] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = clock() + budget if budget is not None else None
+        if parent is not None and parent.expires_at is not None:
+            self.expires_at = (parent.expires_at if self.expires_at is None
+                               else min(self.expires_at, parent.expires_at))
+        self.reason: Optional[str] = None
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._parent = parent
+        if parent is not None:
+            parent.add_callback(self.cancel)
+
+    @classmethod
+    def for_flow(cls, parent: Optional["Deadline"] = None) -> "Deadline":
+        """Deadline with the flow budget (``WIRELESSSGX_FLOW_BUDGET`` seconds)"""
+        budget = float(os.environ.get("WIRELESSSGX_FLOW_BUDGET", DEFAULT_FLOW_BUDGET))
+        return cls(budget, parent=parent)
+
+    def child(self, budget: Optional[float] = None) -> "Deadline":
+        """Narrower deadline that is also cancelled with this one"""
+        return Deadline(budget, parent=self, clock=self._clock)
+
+    def close(self) -> None:
+        """Detach from the parent once the work is finished"""
+        if self._parent is not None:
+            self._parent.remove_callback(self.cancel)
+            self._parent = None
+
+    def __enter__(self) -> "Deadline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None if there is no time limit"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and self._clock() >= self.expires_at
+
+    def check(self) -> None:
+        """Raise FlowCancelled/DeadlineExceeded if the work should stop"""
+        if self.cancelled:
+            raise FlowCancelled(self.reason or "Cancelled")
+        if self.expired:
+            raise DeadlineExceeded("Timed out")
+
+    def timeout(self, default: Optional[float]) -> Optional[float]:
+        """``default`` capped to the remaining time (raises if none is left)"""
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+    def sleep(self, seconds: float) -> None:
+        """Sleep that wakes up (and raises) on cancellation or expiry"""
+        self._cancelled.wait(self.timeout(seconds))
+        self.check()
+
+    def cancel(self, reason: str = "Cancelled") -> None:
+        """Cancel the deadline and run its callbacks (once)"""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self.reason = reason
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` on cancellation (immediately if already cancelled)"""
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+def bounded(deadline: Optional[Deadline], default: Optional[float]) -> Optional[float]:
+    """Timeout for a blocking call: ``default`` capped by ``deadline`` if any"""
+    return default if deadline is None else deadline.timeout(default)
@@ -0,0 +1,96 @@
+"""Pre-commit credential verification with eapol_test
+
+Runs the PEAP/MSCHAPv2 exchange our profiles use against a RADIUS server
+(the ISP's, or a local FreeRADIUS/hostapd stand-in) so bad or expired
+credentials are rejected in milliseconds, before a working profile is
+replaced and long before NetworkManager's activation timeout.
+"""
+
+import os
+import re
+import tempfile
+from typing import Optional, Tuple
+
+from . import metrics
+from .deadline import Deadline
+from .network import NetworkConfigError
+from .runner import run_sync
+
+DEFAULT_RADIUS_PORT = 1812
+
+# ``_failure_reason`` results counted under their own metrics label
+FAILURE_METRIC_REASONS = {
+    "credentials rejected": "rejected",
+    "no response from RADIUS server": "no_response",
+}
+
+
+class CredentialVerificationError(NetworkConfigError):
+    """Credentials were rejected or could not be verified"""
+    pass
+
+
+def parse_server(server: str) -> Tuple[str, int]:
+    """Split ``host[:port]`` (or ``[v6addr]:port``) into host and port"""
+    if server.startswith("["):
+        host, _, rest = server[1:].partition("]")
+        return host, int(rest[1:]) if rest.startswith(":") else DEFAULT_RADIUS_PORT
+    if server.count(":") == 1:
+        host, port = server.split(":")
+        return host, int(port)
+    return server, DEFAULT_RADIUS_PORT
+
+
+def _failure_reason(output: str) -> str:
+    """Best-effort reason for a failed eapol_test run"""
+    if "Access-Reject" in output or "EAP-MSCHAPV2: Authentication failed" in output:
+        return "credentials rejected"
+    if "No response from Authentication server" in output or "EAPOL test timed out" in output:
+        return "no response from RADIUS server"
+    match = re.search(r"^(.*(?:failed|error).*)$", output, re.IGNORECASE | re.MULTILINE)
+    return match.group(1).strip() if match else "authentication failed"
+
+
+def verify_credentials(username: str, password: str, server: str, secret: str,
+                       timeout: float = 5.0, network_block: Optional[str] = None,
+                       deadline: Optional[Deadline] = None) -> float:
+    """Run an EAP exchange with ``eapol_test`` and return its duration.
+
+    ``network_block`` is the wpa_supplicant network block to test (as
+    written by ``NetworkManager``); a plain PEAP/MSCHAPv2 block is used
+    if omitted. Raises CredentialVerificationError on failure.
+    """
+    if deadline is not None:
+        timeout = deadline.timeout(timeout)
+    if network_block is None:
+        from .network import NetworkManager
+        network_block = NetworkManager()._wpa_network_block(username, password)
+
+    host, port = parse_server(server)
+
+    # The config contains the password; keep it private and short-lived
+    fd, config_path = tempfile.mkstemp(prefix="wirelesssgx-eapol-", suffix=".conf")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(network_block + "\n")
+
+        try:
+            result = run_sync(
+                ["eapol_test", "-c", config_path, "-a", host, "-p", str(port),
+                 "-s", secret, "-t", str(max(1, int(timeout))), "-r", "0"],
+                timeout=timeout + 5,
+                deadline=deadline
+            )
+        except FileNotFoundError:
+            raise CredentialVerificationError("eapol_test is not installed")
+        if result.timed_out:
+            metrics.count_auth_failure("no_response")
+            raise CredentialVerificationError("no response from RADIUS server")
+    finally:
+        os.unlink(config_path)
+
+    if result.returncode != 0 or "SUCCESS" not in result.stdout.splitlines()[-1:]:
+        reason = _failure_reason(result.stdout + result.stderr)
+        metrics.count_auth_failure(FAILURE_METRIC_REASONS.get(reason, "other"))
+        raise CredentialVerificationError(f"Credential verification failed: {reason}")
+    return result.duration
@@ -0,0 +1,294 @@
+"""Connection history kept in SQLite
+
+Every activation attempt (when, which BSSID, how long it took, why it
+failed) and every change of the link (up on a BSSID, or down) is appended
+to ``history.db`` under ``$XDG_STATE_HOME/wirelesssgx`` (override with
+``WIRELESSSGX_HISTORY_FILE``). Link changes are only written when the state
+actually changes, so a watcher polling every few seconds adds a row per
+roam or drop rather than per poll.
+
+The database runs in WAL mode, so ``wirelesssgx history`` can read while
+the daemon writes, and both tables are indexed on time and on
+(profile, time). Once a day the first writer drops rows older than the
+retention period (``WIRELESSSGX_HISTORY_RETENTION`` days, default 400),
+returns the freed pages to the filesystem and truncates the WAL.
+
+``sqlite3`` is imported on first use: recording is on the connect path
+and the CLI's cold start must not pay for it.
+"""
+
+import bisect
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('wirelesssgx.history')
+
+DEFAULT_PROFILE = "Wireless@SGx"
+DEFAULT_RETENTION_DAYS = 400.0
+# Minimum time between two compactions
+COMPACT_INTERVAL = 86400.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    profile TEXT NOT NULL,
+    bssid TEXT,
+    ok INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_ts ON attempts (ts);
+CREATE INDEX IF NOT EXISTS attempts_profile_ts ON attempts (profile, ts);
+
+CREATE TABLE IF NOT EXISTS links (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    profile TEXT NOT NULL,
+    up INTEGER NOT NULL,
+    bssid TEXT
+);
+CREATE INDEX IF NOT EXISTS links_ts ON links (ts);
+CREATE INDEX IF NOT EXISTS links_profile_ts ON links (profile, ts);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+def history_file_path() -> str:
+    """Location of the history database"""
+    path = os.environ.get("WIRELESSSGX_HISTORY_FILE")
+    if path:
+        return path
+
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".local", "state")
+    return os.path.join(state_home, "wirelesssgx", "history.db")
+
+
+def retention_days() -> float:
+    try:
+        return float(os.environ.get("WIRELESSSGX_HISTORY_RETENTION", DEFAULT_RETENTION_DAYS))
+    except ValueError:
+        return DEFAULT_RETENTION_DAYS
+
+
+def day_starts(days: int, now: float) -> List[float]:
+    """Local midnights of the last ``days`` days, oldest first, plus the next one"""
+    today = time.localtime(now)
+    return [
+        time.mktime((today.tm_year, today.tm_mon, today.tm_mday - offset, 0, 0, 0, 0, 0, -1))
+        for offset in range(days - 1, -2, -1)
+    ]
+
+
+class HistoryStore:
+    """Append-only store of connection attempts and link changes"""
+
+    def __init__(self, path: Optional[str] = None, retention: Optional[float] = None):
+        import sqlite3
+
+        self.path = path or history_file_path()
+        self.retention = retention_days() if retention is None else retention
+
+        os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+        # Attempt records include failure reasons; keep them private
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        os.close(fd)
+
+        # Autocommit; writes use explicit transactions via ``with self.db``
+        self.db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        # Must precede the first table to take effect
+        self.db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # -- recording ------------------------------------------------------------
+
+    def record_attempt(self, ok: bool, duration: float, bssid: Optional[str] = None,
+                       reason: Optional[str] = None, profile: str = DEFAULT_PROFILE,
+                       ts: Optional[float] = None) -> None:
+        """Append one activation attempt"""
+        ts = time.time() if ts is None else ts
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute(
+                "INSERT INTO attempts (ts, profile, bssid, ok, duration, reason) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (ts, profile, bssid, int(ok), duration, None if ok else reason))
+        self.maybe_compact(ts)
+
+    def record_link(self, up: bool, bssid: Optional[str] = None,
+                    profile: str = DEFAULT_PROFILE, ts: Optional[float] = None) -> bool:
+        """Append a link change; returns False if the link was already so"""
+        ts = time.time() if ts is None else ts
+        bssid = bssid if up else None
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            last = self.db.execute(
+                "SELECT up, bssid FROM links WHERE profile = ? ORDER BY ts DESC, id DESC LIMIT 1",
+                (profile,)).fetchone()
+            if last is not None and (bool(last["up"]), last["bssid"]) == (up, bssid):
+                return False
+            if last is None and not up:
+                # Nothing to close
+                return False
+            self.db.execute("INSERT INTO links (ts, profile, up, bssid) VALUES (?, ?, ?, ?)",
+                            (ts, profile, int(up), bssid))
+        self.maybe_compact(ts)
+        return True
+
+    # -- maintenance ----------------------------------------------------------
+
+    def maybe_compact(self, now: Optional[float] = None) -> bool:
+        """Compact if the last compaction is older than ``COMPACT_INTERVAL``"""
+        now = time.time() if now is None else now
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'compacted'").fetchone()
+        if row is not None and now - row["value"] < COMPACT_INTERVAL:
+            return False
+        self.compact(now)
+        return True
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Drop rows past the retention period and shrink the files"""
+        now = time.time() if now is None else now
+        cutoff = now - self.retention * 86400
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            attempts = self.db.execute("DELETE FROM attempts WHERE ts < ?", (cutoff,)).rowcount
+            # Keep each profile's last change before the cutoff: it is the
+            # link state at the start of the retained period
+            links = self.db.execute(
+                "DELETE FROM links WHERE ts < ? AND id NOT IN "
+                "(SELECT max(id) FROM links WHERE ts < ? GROUP BY profile)",
+                (cutoff, cutoff)).rowcount
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('compacted', ?)",
+                            (now,))
+        self.db.execute("PRAGMA incremental_vacuum")
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"attempts": attempts, "links": links}
+
+    # -- queries --------------------------------------------------------------
+
+    def uptime_per_day(self, days: int = 7, profile: str = DEFAULT_PROFILE,
+                       now: Optional[float] = None) -> List[Dict]:
+        """Seconds connected on each of the last ``days`` local days.
+
+        A link counts as up until its next recorded change (or ``now``).
+        """
+        now = time.time() if now is None else now
+        starts = day_starts(days, now)
+        since = starts[0]
+
+        before = self.db.execute(
+            "SELECT up FROM links WHERE profile = ? AND ts < ? ORDER BY ts DESC, id DESC LIMIT 1",
+            (profile, since)).fetchone()
+        changes = self.db.execute(
+            "SELECT ts, up FROM links WHERE profile = ? AND ts >= ? AND ts <= ? ORDER BY ts, id",
+            (profile, since, now)).fetchall()
+
+        uptime = [0.0] * days
+        up_since = since if before is not None and before["up"] else None
+        for ts, up in [(row["ts"], row["up"]) for row in changes] + [(now, 0)]:
+            if up_since is not None:
+                # Split the session at the midnights it spans
+                day = max(bisect.bisect_right(starts, up_since) - 1, 0)
+                while day < days and starts[day] < ts:
+                    overlap = min(ts, starts[day + 1]) - max(up_since, starts[day])
+                    if overlap > 0:
+                        uptime[day] += overlap
+                    day += 1
+            up_since = ts if up else None
+
+        result = []
+        for day in range(days):
+            length = min(starts[day + 1], now) - starts[day]
+            result.append({
+                "date": time.strftime("%Y-%m-%d", time.localtime(starts[day])),
+                "uptime": round(uptime[day], 1),
+                "ratio": round(uptime[day] / length, 4) if length > 0 else 0.0,
+            })
+        return result
+
+    def failure_rate(self, days: float = 7, profile: str = DEFAULT_PROFILE,
+                     now: Optional[float] = None) -> Dict:
+        """Attempts, failures and failures by reason over the last ``days``"""
+        since = (time.time() if now is None else now) - days * 86400
+        row = self.db.execute(
+            "SELECT count(*) AS attempts, coalesce(sum(ok = 0), 0) AS failures "
+            "FROM attempts WHERE profile = ? AND ts >= ?", (profile, since)).fetchone()
+        reasons = self.db.execute(
+            "SELECT coalesce(reason, 'unknown') AS reason, count(*) AS count FROM attempts "
+            "WHERE profile = ? AND ts >= ? AND ok = 0 GROUP BY 1 ORDER BY 2 DESC",
+            (profile, since)).fetchall()
+        return {
+            "attempts": row["attempts"],
+            "failures": row["failures"],
+            "rate": round(row["failures"] / row["attempts"], 4) if row["attempts"] else 0.0,
+            "reasons": {r["reason"]: r["count"] for r in reasons},
+        }
+
+    def slowest_connects(self, limit: int = 5, days: float = 7,
+                         profile: str = DEFAULT_PROFILE,
+                         now: Optional[float] = None) -> List[Dict]:
+        """The longest successful activations over the last ``days``"""
+        since = (time.time() if now is None else now) - days * 86400
+        rows = self.db.execute(
+            "SELECT ts, bssid, duration FROM attempts "
+            "WHERE profile = ? AND ts >= ? AND ok = 1 ORDER BY duration DESC LIMIT ?",
+            (profile, since, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def open_store() -> Optional[HistoryStore]:
+    """The default store for a long-running loop to reuse, or None if it
+    cannot be opened"""
+    import sqlite3
+
+    try:
+        return HistoryStore()
+    except (sqlite3.Error, OSError) as e:
+        logger.debug(f"Could not open connection history: {e}")
+        return None
+
+
+def _record(method: str, store: Optional[HistoryStore] = None, **kwargs) -> None:
+    """Write to ``store``, or open the default one for this write; history
+    never gets in the way of connecting"""
+    import sqlite3
+
+    try:
+        if store is not None:
+            getattr(store, method)(**kwargs)
+            return
+        with HistoryStore() as store:
+            getattr(store, method)(**kwargs)
+    except (sqlite3.Error, OSError) as e:
+        logger.debug(f"Could not record connection history: {e}")
+
+
+def record_attempt(ok: bool, duration: float, bssid: Optional[str] = None,
+                   reason: Optional[str] = None, profile: str = DEFAULT_PROFILE) -> None:
+    _record("record_attempt", ok=ok, duration=duration, bssid=bssid, reason=reason,
+            profile=profile)
+
+
+def record_link(up: bool, bssid: Optional[str] = None, profile: str = DEFAULT_PROFILE,
+                store: Optional[HistoryStore] = None) -> None:
+    _record("record_link", store, up=up, bssid=bssid, profile=profile)
@@ -0,0 +1,113 @@
+"""Offline NetworkManager keyfile backend for rootfs/image provisioning
+
+Writes ``etc/NetworkManager/system-connections/Wireless@SGx.nmconnection``
+into any root directory without talking to NetworkManager, using the same
+802-1x settings as the nmcli backend. ``provision`` applies a manifest of
+roots in parallel.
+"""
+
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .network import NetworkManager, NetworkConfigError
+
+SYSTEM_CONNECTIONS = Path("etc") / "NetworkManager" / "system-connections"
+
+
+def _escape(value: str) -> str:
+    """Escape a string value for a GKeyFile (keyfile) entry"""
+    escaped = (value.replace("\\", "\\\\")
+               .replace("\n", "\\n")
+               .replace("\t", "\\t")
+               .replace("\r", "\\r"))
+    if escaped.startswith(" "):
+        escaped = "\\s" + escaped[1:]
+    return escaped
+
+
+def render_keyfile(network: NetworkManager, username: str, password: str,
+                   connection_uuid: Optional[str] = None) -> str:
+    """Render the keyfile for ``network``'s profile"""
+    sections = [
+        ("connection", [
+            ("id", network.connection_name),
+            ("uuid", connection_uuid or str(uuid.uuid4())),
+            ("type", "wifi"),
+            ("autoconnect", "true"),
+        ]),
+        ("wifi", [
+            ("mode", "infrastructure"),
+            ("ssid", network.ssid),
+        ] + ([("powersave", "2")] if network.fast_join else [])),
+        ("wifi-security", [
+            ("key-mgmt", "wpa-eap"),
+        ]),
+        ("802-1x", [
+            ("eap", "peap;"),
+            ("identity", username),
+            ("password", password),
+            ("phase2-auth", "mschapv2"),
+        ]),
+        ("ipv4", [
+            ("method", "auto"),
+        ] + ([("may-fail", "false")] if network.fast_join else [])),
+        ("ipv6", [
+            ("addr-gen-mode", "default"),
+            ("method", "auto"),
+        ]),
+    ]
+
+    return "\n".join(
+        f"[{name}]\n" + "".join(f"{key}={_escape(value)}\n" for key, value in entries)
+        for name, entries in sections
+    )
+
+
+def keyfile_path(network: NetworkManager) -> Path:
+    """Location of the keyfile under ``network.root``"""
+    return network.root / SYSTEM_CONNECTIONS / f"{network.connection_name}.nmconnection"
+
+
+def write_keyfile(network: NetworkManager, username: str, password: str) -> Path:
+    """Write the keyfile (root-only permissions) and return its path"""
+    path = keyfile_path(network)
+    try:
+        network._write_config(path, render_keyfile(network, username, password), backup=False)
+        if os.geteuid() == 0:
+            os.chown(path, 0, 0)
+    except OSError as e:
+        raise NetworkConfigError(f"Failed to write keyfile {path}: {str(e)}")
+    return path
+
+
+def provision(manifest: List[Dict], workers: int = 8,
+              fast_join: Optional[bool] = None) -> List[Dict]:
+    """Write keyfiles for every entry of a manifest in parallel.
+
+    Each entry needs ``root``, ``username`` and ``password`` and may set
+    ``fast_join``. Returns one ``{"root", "ok", "path"|"error"}`` result per
+    entry, in manifest order.
+    """
+    def apply(entry: Dict) -> Dict:
+        try:
+            network = NetworkManager(fast_join=entry.get("fast_join", fast_join), root=entry["root"])
+            path = write_keyfile(network, entry["username"], entry["password"])
+            return {"root": entry["root"], "ok": True, "path": str(path)}
+        except KeyError as e:
+            return {"root": entry.get("root"), "ok": False, "error": f"Missing manifest field: {e}"}
+        except NetworkConfigError as e:
+            return {"root": entry["root"], "ok": False, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(apply, manifest))
+
+
+def load_manifest(path: str) -> List[Dict]:
+    """Load a JSON manifest (a list of entries, or ``{"devices": [...]}``)"""
+    with open(path) as f:
+        manifest = json.load(f)
+    return manifest["devices"] if isinstance(manifest, dict) else manifest
@@ -0,0 +1,240 @@
+"""Link quality sampling for the Wireless@SGx interface
+
+``LinkMonitor`` reads the interface's signal level, link quality and retry
+counter from ``/proc/net/wireless`` (``WIRELESSSGX_PROC_WIRELESS``) every
+``WIRELESSSGX_LINK_INTERVAL`` seconds (default 1), and the transmit bitrate
+from ``iw dev <interface> link`` at most every ``BITRATE_INTERVAL`` seconds
+because that costs a process. Each field keeps its last
+``WIRELESSSGX_LINK_SAMPLES`` values (default 300) in an array-backed ring
+buffer, so hours of sampling use the same memory as the first five
+minutes, and ``snapshot`` reports last/min/mean/p95 over the buffer.
+
+Standard library only: ``collect_state`` takes a ``/proc``-only sample
+(no ``iw``) for every ``status`` call.
+"""
+
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+PROC_NET_WIRELESS = "/proc/net/wireless"
+DEFAULT_INTERVAL = 1.0
+DEFAULT_CAPACITY = 300
+# Minimum seconds between two ``iw`` calls
+BITRATE_INTERVAL = 10.0
+# /proc/net/wireless reports link quality out of this
+MAX_QUALITY = 70
+
+FIELDS = ("rssi", "quality", "bitrate", "retries")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def read_proc_wireless(interface: str, path: Optional[str] = None) -> Optional[Dict]:
+    """Counters for ``interface``, or None if it is not listed.
+
+    Returns ``{"quality", "level", "noise", "retries", "missed_beacons"}``;
+    level and noise are in dBm, retries and missed beacons are cumulative.
+    """
+    try:
+        with open(path or os.environ.get("WIRELESSSGX_PROC_WIRELESS", PROC_NET_WIRELESS)) as f:
+            lines = f.readlines()[2:]
+    except OSError:
+        return None
+
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name.strip() != interface:
+            continue
+        fields = rest.split()
+        try:
+            # status, link, level, noise, nwid, crypt, frag, retry, misc, beacon
+            return {
+                "quality": float(fields[1].rstrip(".")),
+                "level": float(fields[2].rstrip(".")),
+                "noise": float(fields[3].rstrip(".")),
+                "retries": int(fields[7]),
+                "missed_beacons": int(fields[9]),
+            }
+        except (IndexError, ValueError):
+            return None
+    return None
+
+
+def read_bitrate(interface: str) -> Optional[float]:
+    """Transmit bitrate in Mbit/s from ``iw dev <interface> link``"""
+    from .runner import run_sync
+
+    try:
+        result = run_sync(["iw", "dev", interface, "link"], timeout=2)
+    except FileNotFoundError:
+        return None
+    match = re.search(r"tx bitrate:\s*([\d.]+)\s*MBit/s", result.stdout)
+    return float(match.group(1)) if match else None
+
+
+class RingBuffer:
+    """The last ``capacity`` floats, in a preallocated ``array``"""
+
+    __slots__ = ("capacity", "_data", "_next", "_count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float) -> None:
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def values(self) -> List[float]:
+        """Oldest first"""
+        if self._count < self.capacity:
+            return self._data[:self._count].tolist()
+        return (self._data[self._next:] + self._data[:self._next]).tolist()
+
+    def stats(self) -> Optional[Dict[str, float]]:
+        """Last, min, mean and 95th percentile, or None if empty"""
+        if not self._count:
+            return None
+        values = sorted(self._data[:self._count])
+        last = self._data[(self._next - 1) % self.capacity]
+        return {
+            "last": round(last, 2),
+            "min": round(values[0], 2),
+            "mean": round(sum(values) / len(values), 2),
+            "p95": round(values[max(math.ceil(0.95 * len(values)) - 1, 0)], 2),
+        }
+
+
+class LinkMonitor:
+    """Samples one interface into per-field ring buffers"""
+
+    def __init__(self, interface: str, interval: Optional[float] = None,
+                 capacity: Optional[int] = None, path: Optional[str] = None,
+                 bitrate: bool = True):
+        self.interface = interface
+        self.interval = interval or _env_float("WIRELESSSGX_LINK_INTERVAL", DEFAULT_INTERVAL)
+        capacity = capacity or int(_env_float("WIRELESSSGX_LINK_SAMPLES", DEFAULT_CAPACITY))
+        self.path = path
+        # Whether to spend an ``iw`` call on the bitrate
+        self.bitrate = bitrate
+        self.buffers = {field: RingBuffer(max(capacity, 1)) for field in FIELDS}
+        self._last_retries: Optional[int] = None
+        self._last_bitrate_read = -math.inf
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_interface(self, interface: str) -> None:
+        """Follow another interface, discarding the samples of the old one"""
+        with self._lock:
+            if interface == self.interface:
+                return
+            self.interface = interface
+            self.buffers = {field: RingBuffer(buffer.capacity) for field, buffer in self.buffers.items()}
+            self._last_retries = None
+            self._last_bitrate_read = -math.inf
+
+    def sample(self) -> bool:
+        """Take one sample; False if the interface is not associated"""
+        interface = self.interface
+        counters = read_proc_wireless(interface, self.path)
+        now = time.monotonic()
+        bitrate = None
+        if self.bitrate and counters is not None and now - self._last_bitrate_read >= BITRATE_INTERVAL:
+            self._last_bitrate_read = now
+            bitrate = read_bitrate(interface)
+
+        with self._lock:
+            if interface != self.interface:
+                # Switched while sampling
+                return False
+            if counters is None:
+                self._last_retries = None
+                return False
+            # The counter is cumulative; keep what happened since the last sample
+            retries = counters["retries"] - self._last_retries if self._last_retries is not None else 0
+            self._last_retries = counters["retries"]
+            self.buffers["rssi"].append(counters["level"])
+            self.buffers["quality"].append(round(counters["quality"] * 100 / MAX_QUALITY))
+            self.buffers["retries"].append(max(retries, 0))
+            if bitrate is not None:
+                self.buffers["bitrate"].append(bitrate)
+        return True
+
+    def values(self, field: str = "rssi") -> List[float]:
+        with self._lock:
+            return self.buffers[field].values()
+
+    def snapshot(self) -> Dict:
+        """Rolling statistics per field, for ``status --json``"""
+        with self._lock:
+            stats = {field: buffer.stats() for field, buffer in self.buffers.items()}
+            samples = len(self.buffers["rssi"])
+        return {"interface": self.interface, "interval": self.interval,
+                "samples": samples, **stats}
+
+    def start(self) -> "LinkMonitor":
+        """Sample from a background thread until ``stop``"""
+        # Each run gets its own event, so a thread stopped without waiting
+        # still exits when the monitor is started again
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,),
+                                        name="wirelesssgx-link", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop sampling; with ``wait=False`` only signal the thread, which
+        exits after the sample in progress (an ``iw`` call can take up to
+        its 2s timeout)"""
+        self._stop.set()
+        if self._thread is not None:
+            if wait:
+                self._thread.join()
+            self._thread = None
+
+    def _run(self, stop: threading.Event) -> None:
+        while True:
+            self.sample()
+            if stop.wait(self.interval):
+                return
+
+
+def link_snapshot(interface: str) -> Optional[Dict]:
+    """One ``/proc``-only sample's worth of ``LinkMonitor.snapshot``, or None
+    if not associated"""
+    monitor = LinkMonitor(interface, capacity=1, bitrate=False)
+    return monitor.snapshot() if monitor.sample() else None
+
+
+def format_link(link: Dict) -> str:
+    """One-line summary, e.g. ``-56 dBm (min -61, p95 -54), 72.2 Mbit/s``"""
+    parts = []
+    rssi = link.get("rssi")
+    if rssi:
+        parts.append(f"{rssi['last']:g} dBm" + (
+            f" (min {rssi['min']:g}, mean {rssi['mean']:g}, p95 {rssi['p95']:g})"
+            if link.get("samples", 0) > 1 else ""))
+    if link.get("quality"):
+        parts.append(f"quality {link['quality']['last']:g}%")
+    if link.get("bitrate"):
+        parts.append(f"{link['bitrate']['last']:g} Mbit/s")
+    if link.get("retries") and link.get("samples", 0) > 1:
+        parts.append(f"{link['retries']['mean']:g} retries/sample")
+    return ", ".join(parts)
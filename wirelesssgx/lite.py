@@ -0,0 +1,30 @@
+"""Low-CPU render mode for kiosks and slow SSH links
+
+Enabled with ``--lite`` or ``WIRELESSSGX_LITE=1``. Lite mode caps the frame
+rate, turns off animations (spinners become static progress text) and
+only redraws the OTP countdown when its coarser, rounded value changes.
+"""
+
+import os
+
+# Frames per second Textual may render at in lite mode
+LITE_FPS = 10
+
+# The OTP countdown is shown rounded up to this many seconds
+COUNTDOWN_STEP = 30
+
+
+def lite_mode() -> bool:
+    """Whether lite mode is enabled (``WIRELESSSGX_LITE``)"""
+    return os.environ.get('WIRELESSSGX_LITE', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def apply_lite_defaults() -> None:
+    """Cap Textual's frame rate and disable its animations.
+
+    Textual reads these settings when it is first imported, so this must
+    run before the TUI modules are loaded. Explicit ``TEXTUAL_FPS`` /
+    ``TEXTUAL_ANIMATIONS`` settings win.
+    """
+    os.environ.setdefault('TEXTUAL_FPS', str(LITE_FPS))
+    os.environ.setdefault('TEXTUAL_ANIMATIONS', 'none')
@@ -0,0 +1,254 @@
+"""Connection health metrics for node_exporter's textfile collector
+
+The CLI, the TUI, ``watch`` and the daemon count events in-process
+(connection state and signal, time to connect, reconnects, authentication
+failures by reason and ESSA request latency) and ``flush`` merges them
+into ``wirelesssgx.prom`` in ``WIRELESSSGX_TEXTFILE_DIR``. Counters and
+histograms are cumulative across processes: each flush adds its deltas
+to a sidecar JSON file under a lock, then rewrites the ``.prom`` file
+atomically. Label values come from fixed sets, so the number of series is
+bounded. Without ``WIRELESSSGX_TEXTFILE_DIR`` nothing is written.
+
+Like ``tracing`` this module sits on the CLI's cold-start path and only
+imports what the interpreter has already loaded.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+TEXTFILE_NAME = "wirelesssgx.prom"
+STORE_NAME = ".wirelesssgx-metrics.json"
+
+CONNECTED = "wirelesssgx_connected"
+IN_RANGE = "wirelesssgx_in_range"
+SIGNAL = "wirelesssgx_signal_percent"
+CONNECT_DURATION = "wirelesssgx_connect_duration_seconds"
+RECONNECTS = "wirelesssgx_reconnects_total"
+AUTH_FAILURES = "wirelesssgx_auth_failures_total"
+ESSA_DURATION = "wirelesssgx_essa_request_duration_seconds"
+UPDATED = "wirelesssgx_metrics_updated_timestamp_seconds"
+
+ESSA_APIS = ("create_user_r12x1a", "create_user_r12x1b",
+             "retrieve_user_r12x2a", "retrieve_user_r12x2b")
+AUTH_FAILURE_REASONS = ("rejected", "no_response", "timeout", "activation_failed", "other")
+
+# name: (type, help, {label: allowed values}, histogram buckets)
+FAMILIES = {
+    CONNECTED: ("gauge", "Whether Wireless@SGx is the active connection", {}, ()),
+    IN_RANGE: ("gauge", "Whether the Wireless@SGx SSID is visible", {}, ()),
+    SIGNAL: ("gauge", "Signal strength of the active Wireless@SGx access point", {}, ()),
+    CONNECT_DURATION: ("histogram", "Time from starting an activation to its outcome",
+                       {"result": ("connected", "failed", "out_of_range")},
+                       (0.5, 1, 2, 5, 10, 20, 30, 60, 90)),
+    RECONNECTS: ("counter", "Reconnections made by the daemon after the link dropped", {}, ()),
+    AUTH_FAILURES: ("counter", "Failed authentications by reason",
+                    {"reason": AUTH_FAILURE_REASONS}, ()),
+    ESSA_DURATION: ("histogram", "Latency of ESSA registration API requests",
+                    {"api": ESSA_APIS, "outcome": ("ok", "error")},
+                    (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)),
+    UPDATED: ("gauge", "When these metrics were last written", {}, ()),
+}
+
+
+def _series(name: str, labels: Dict[str, str]) -> str:
+    """Series key in exposition format, with label values clamped to their allowed set"""
+    allowed = FAMILIES[name][2]
+    if not allowed:
+        return name
+    values = []
+    for label, choices in allowed.items():
+        value = labels.get(label)
+        values.append(f'{label}="{value if value in choices else choices[-1]}"')
+    return name + "{" + ",".join(values) + "}"
+
+
+class Registry:
+    """Metric deltas accumulated since the last flush"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.gauges: Dict[str, float] = {}
+        self.counters: Dict[str, float] = {}
+        # series: [count per bucket..., count above the last bucket, sum]
+        self.histograms: Dict[str, list] = {}
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self.gauges[_series(name, labels)] = value
+
+    def clear(self, name: str) -> None:
+        """Drop a gauge whose value is unknown (it is removed from the file)"""
+        with self._lock:
+            self.gauges[name] = None
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _series(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        buckets = FAMILIES[name][3]
+        key = _series(name, labels)
+        index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+        with self._lock:
+            histogram = self.histograms.setdefault(key, [0] * (len(buckets) + 2))
+            histogram[index] += 1
+            histogram[-1] += value
+
+    def drain(self) -> Tuple[Dict, Dict, Dict]:
+        """Return and reset the accumulated values"""
+        with self._lock:
+            drained = (self.gauges, self.counters, self.histograms)
+            self.gauges, self.counters, self.histograms = {}, {}, {}
+        return drained
+
+    def restore(self, gauges: Dict, counters: Dict, histograms: Dict) -> None:
+        """Merge drained values back after a failed flush.
+
+        Gauges set since the drain are newer and win; counters and
+        histograms add up.
+        """
+        with self._lock:
+            for key, value in gauges.items():
+                self.gauges.setdefault(key, value)
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, value in histograms.items():
+                current = self.histograms.get(key)
+                self.histograms[key] = [a + b for a, b in zip(current, value)] if current else value
+
+
+registry = Registry()
+
+
+def textfile_dir() -> Optional[str]:
+    return os.environ.get("WIRELESSSGX_TEXTFILE_DIR") or None
+
+
+# Recording helpers used across the package
+
+def observe_connect(seconds: float, result: str) -> None:
+    registry.observe(CONNECT_DURATION, seconds, result=result)
+
+
+def count_reconnect() -> None:
+    registry.inc(RECONNECTS)
+
+
+def count_auth_failure(reason: str) -> None:
+    registry.inc(AUTH_FAILURES, reason=reason)
+
+
+def observe_essa(api: str, seconds: float, ok: bool) -> None:
+    registry.observe(ESSA_DURATION, seconds, api=api, outcome="ok" if ok else "error")
+
+
+def set_link(state: Dict) -> None:
+    """Connection gauges from a ``collect_state`` snapshot"""
+    registry.set(CONNECTED, 1 if state.get("connected") else 0)
+    registry.set(IN_RANGE, 1 if state.get("in_range") else 0)
+    if state.get("signal") is not None:
+        registry.set(SIGNAL, state["signal"])
+    else:
+        registry.clear(SIGNAL)
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render(store: Dict) -> str:
+    """Exposition-format text for a merged store"""
+    lines = []
+    for name, (kind, help_text, _, buckets) in FAMILIES.items():
+        if kind == "histogram":
+            series = {key: value for key, value in store["histograms"].items()
+                      if key.split("{")[0] == name}
+        else:
+            series = {key: value for key, value in store[kind + "s"].items()
+                      if key.split("{")[0] == name}
+        if not series:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key, value in sorted(series.items()):
+            if kind != "histogram":
+                lines.append(f"{key} {_number(value)}")
+                continue
+            labels = key[len(name):].strip("{}")
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(tuple(buckets) + ("+Inf",), value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            suffix = "{" + labels + "}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {_number(value[-1])}")
+            lines.append(f"{name}_count{suffix} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _replace(path: str, content: str) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def flush(directory: Optional[str] = None) -> Optional[str]:
+    """Merge the in-process deltas into the textfile; returns its path.
+
+    Does nothing (and keeps the deltas) when no directory is configured.
+    The deltas are only dropped once the sidecar store holding them has
+    been replaced; if that fails they are merged back for the next flush.
+    """
+    directory = directory or textfile_dir()
+    if directory is None:
+        return None
+    import fcntl
+    import json
+
+    gauges, counters, histograms = registry.drain()
+    store_path = os.path.join(directory, STORE_NAME)
+    committed = False
+
+    try:
+        with open(store_path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(store_path) as f:
+                    store = json.load(f)
+            except (OSError, ValueError):
+                store = {"gauges": {}, "counters": {}, "histograms": {}}
+
+            for key, value in gauges.items():
+                if value is None:
+                    store["gauges"].pop(key, None)
+                else:
+                    store["gauges"][key] = value
+            store["gauges"][UPDATED] = round(time.time(), 3)
+            for key, value in counters.items():
+                store["counters"][key] = store["counters"].get(key, 0) + value
+            for key, value in histograms.items():
+                merged = store["histograms"].get(key)
+                store["histograms"][key] = [a + b for a, b in zip(merged, value)] if merged else value
+
+            _replace(store_path, json.dumps(store))
+            # The store holds the deltas now; a failed render is redone
+            # from it by the next flush
+            committed = True
+            path = os.path.join(directory, TEXTFILE_NAME)
+            _replace(path, render(store))
+    finally:
+        if not committed:
+            registry.restore(gauges, counters, histograms)
+    return path
@@ -1,10 +1,30 @@
 """Network configuration module for Wireless@SGx"""
 
+import logging
 import os
-import subprocess
-import uuid
+import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from . import history, metrics
+from .deadline import Deadline, FlowCancelled
+from .runner import CommandError, CommandNotFound, run_sync
+
+logger = logging.getLogger('wirelesssgx.network')
+
+# How long a scan for the Wireless@SGx SSID stays valid
+SCAN_CACHE_TTL = 15.0
+
+# Visible BSSIDs per SSID: {ssid: (monotonic timestamp, [access points])}
+_scan_cache: Dict[str, Tuple[float, List[Dict]]] = {}
+
+
+# Roaming-friendly background scan: scan every 30s below -70 dBm, hourly above
+FAST_JOIN_BGSCAN = "simple:30:-70:3600"
+
+# Upper bound for ``nmcli connection up`` (NetworkManager's own default
+# activation timeout is 90s for 802.1x profiles)
+ACTIVATION_TIMEOUT = 90.0
 
 
 class NetworkConfigError(Exception):
@@ -12,74 +32,139 @@ class NetworkConfigError(Exception):
     pass
 
 
+def parse_terse_line(line: str, maxsplit: int = -1) -> List[str]:
+    """Split a line of ``nmcli -t`` output into fields.
+    
+    nmcli escapes ``:`` and ``\\`` inside values (e.g. BSSIDs and IPv6
+    addresses), so a plain ``str.split(':')`` breaks them apart.
+    """
+    fields = []
+    current = []
+    escaped = False
+    
+    for ch in line:
+        if escaped:
+            current.append(ch)
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == ":" and (maxsplit < 0 or len(fields) < maxsplit):
+            fields.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    
+    fields.append("".join(current))
+    return fields
+
+
+def _activation_failure_reason(result) -> str:
+    """Metrics reason for a failed ``nmcli connection up``"""
+    if result.timed_out:
+        return "timeout"
+    if "Secrets were required" in result.stderr:
+        # NetworkManager's wording when 802.1x authentication is refused
+        return "rejected"
+    return "activation_failed"
+
+
 class NetworkManager:
     """Handle network configuration for Wireless@SGx"""
     
-    def __init__(self):
+    def __init__(self, fast_join: Optional[bool] = None, root: Optional[str] = None,
+                 interface: str = "wlan0", radius_server: Optional[str] = None,
+                 radius_secret: Optional[str] = None):
         self.connection_name = "Wireless@SGx"
         self.ssid = "Wireless@SGx"
+        # Filesystem root for generated config files and the wireless
+        # interface used by the wpa_supplicant backends
+        self.root = Path(root or os.environ.get('WIRELESSSGX_ROOT', '/'))
+        self.interface = interface
+        # Opt-in profile tuned for fast re-authentication and roaming
+        if fast_join is None:
+            fast_join = os.environ.get('WIRELESSSGX_FAST_JOIN', '').lower() in ('1', 'true', 'yes', 'on')
+        self.fast_join = fast_join
+        # Optional RADIUS server (host[:port]) to verify credentials against
+        # before any profile is replaced
+        self.radius_server = radius_server or os.environ.get('WIRELESSSGX_RADIUS_SERVER')
+        self.radius_secret = radius_secret or os.environ.get('WIRELESSSGX_RADIUS_SECRET', '')
         
-    def detect_network_manager(self) -> str:
+    def detect_network_manager(self, deadline: Optional[Deadline] = None) -> str:
         """Detect which network manager is in use"""
-        # Check for NetworkManager
+        # Query both services with a single systemctl call
         try:
-            result = subprocess.run(
-                ["systemctl", "is-active", "NetworkManager"],
-                capture_output=True,
-                text=True
+            result = run_sync(
+                ["systemctl", "is-active", "NetworkManager", "systemd-networkd"],
+                timeout=5,
+                deadline=deadline
             )
-            if result.returncode == 0:
+            states = result.stdout.split()
+            if states[:1] == ["active"]:
                 return "networkmanager"
-        except FileNotFoundError:
-            pass
-        
-        # Check for systemd-networkd
-        try:
-            result = subprocess.run(
-                ["systemctl", "is-active", "systemd-networkd"],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
+            if states[1:2] == ["active"]:
                 return "systemd-networkd"
         except FileNotFoundError:
             pass
         
         # Check for wpa_supplicant directly
-        if Path("/etc/wpa_supplicant").exists():
+        if (self.root / "etc" / "wpa_supplicant").exists():
             return "wpa_supplicant"
         
         raise NetworkConfigError("No supported network manager found")
     
-    def configure_network(self, username: str, password: str) -> bool:
-        """Configure network with credentials"""
-        network_manager = self.detect_network_manager()
+    def configure_network(self, username: str, password: str,
+                          backend: Optional[str] = None,
+                          deadline: Optional[Deadline] = None) -> bool:
+        """Configure network with credentials, optionally forcing a backend.
+        
+        Raises FlowCancelled if ``deadline`` is cancelled or expires.
+        """
+        network_manager = backend or self.detect_network_manager(deadline)
+        
+        if self.radius_server:
+            # Raises before anything is written if the credentials are bad
+            self.verify_credentials(username, password, deadline)
         
         if network_manager == "networkmanager":
-            return self._configure_networkmanager(username, password)
+            return self._configure_networkmanager(username, password, deadline)
         elif network_manager == "systemd-networkd":
-            return self._configure_systemd_networkd(username, password)
+            return self._configure_systemd_networkd(username, password, deadline)
         elif network_manager == "wpa_supplicant":
             return self._configure_wpa_supplicant(username, password)
+        elif network_manager == "keyfile":
+            return self._configure_keyfile(username, password, deadline=deadline)
         
         return False
     
-    def _configure_networkmanager(self, username: str, password: str) -> bool:
-        """Configure NetworkManager connection"""
+    def verify_credentials(self, username: str, password: str,
+                           deadline: Optional[Deadline] = None) -> float:
+        """Verify credentials against the configured RADIUS server"""
+        from .eaptest import verify_credentials
+        return verify_credentials(
+            username, password, self.radius_server, self.radius_secret,
+            network_block=self._wpa_network_block(username, password),
+            deadline=deadline
+        )
+    
+    def _configure_networkmanager(self, username: str, password: str,
+                                  deadline: Optional[Deadline] = None) -> bool:
+        """Configure NetworkManager connection.
+        
+        The new profile is staged under a temporary name and only replaces
+        the existing one once it has been created successfully.
+        """
+        staging_name = f"{self.connection_name}.new"
         try:
-            # Remove existing connection if exists
-            subprocess.run(
-                ["nmcli", "connection", "delete", self.connection_name],
-                capture_output=True
-            )
-        except:
+            # Remove a staging profile left over from an interrupted run
+            run_sync(["nmcli", "connection", "delete", staging_name], deadline=deadline)
+        except FileNotFoundError:
             pass
         
         # Create new connection
         cmd = [
             "nmcli", "connection", "add",
             "type", "wifi",
-            "con-name", self.connection_name,
+            "con-name", staging_name,
             "ifname", "*",
             "ssid", self.ssid,
             "wifi-sec.key-mgmt", "wpa-eap",
@@ -88,106 +173,350 @@ class NetworkManager:
             "802-1x.identity", username,
             "802-1x.password", password,
             "802-1x.anonymous-identity", "",
-            "connection.autoconnect", "yes"
+            # Enabled once the profile is renamed into place
+            "connection.autoconnect", "no"
         ]
         
+        if self.fast_join:
+            # NetworkManager already enables PMKSA caching, OKC and bgscan
+            # for WPA-EAP profiles; what it does expose is power saving
+            # (which delays roaming scans). ``ipv4.may-fail no`` makes
+            # IPv4 required, so a failed DHCP fails the activation and
+            # "activated" always means an IPv4 address rather than IPv6
+            # alone. It does not shorten activation or skip the IPv6 wait.
+            cmd += [
+                "802-11-wireless.powersave", "2",
+                "ipv4.may-fail", "no",
+            ]
+        
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return True
-        except subprocess.CalledProcessError as e:
+            run_sync(cmd, check=True, deadline=deadline)
+        except CommandNotFound as e:
+            logger.error(f"Unexpected error configuring NetworkManager: {str(e)}")
+            return False
+        except CommandError as e:
             # Log the error but don't raise - return False instead
-            print(f"NetworkManager configuration error: {e.stderr}")
+            logger.error(f"NetworkManager configuration error: {e.result.stderr.strip()}")
+            run_sync(["nmcli", "connection", "delete", staging_name])
             return False
-        except Exception as e:
-            print(f"Unexpected error configuring NetworkManager: {str(e)}")
+        except FlowCancelled:
+            # Leave the existing profile untouched
+            run_sync(["nmcli", "connection", "delete", staging_name])
+            raise
+
+        if deadline is not None and (deadline.cancelled or deadline.expired):
+            run_sync(["nmcli", "connection", "delete", staging_name])
+            deadline.check()
+
+        # Swap the staged profile in for the existing one; once started the
+        # swap is finished even if the flow is cancelled. The staged profile
+        # is renamed first and the old one deleted by UUID afterwards, so a
+        # failed rename leaves the working profile in place.
+        old_uuids = self._profile_uuids(self.connection_name)
+        result = run_sync(
+            ["nmcli", "connection", "modify", staging_name,
+             "connection.id", self.connection_name,
+             "connection.autoconnect", "yes"]
+        )
+        if not result.ok:
+            logger.error(f"NetworkManager configuration error: {result.stderr.strip()}")
+            run_sync(["nmcli", "connection", "delete", staging_name])
             return False
+        for old_uuid in old_uuids:
+            run_sync(["nmcli", "connection", "delete", "uuid", old_uuid])
+        return True
+    
+    def _profile_uuids(self, name: str) -> List[str]:
+        """UUIDs of the NetworkManager profiles called ``name``"""
+        result = run_sync(
+            ["nmcli", "-t", "-f", "connection.uuid", "connection", "show", "id", name],
+            timeout=10
+        )
+        if not result.ok:
+            return []
+        return [parse_terse_line(line, maxsplit=1)[-1]
+                for line in result.stdout.splitlines() if line]
     
-    def _configure_systemd_networkd(self, username: str, password: str) -> bool:
+    def _write_config(self, path: Path, content: str, backup: bool = True) -> Optional[Path]:
+        """Atomically write a private config file, returning a backup of the old one"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        backup_path = None
+        if backup and path.exists():
+            backup_path = path.with_name(path.name + ".bak")
+            backup_path.write_bytes(path.read_bytes())
+            os.chmod(backup_path, 0o600)
+        
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(content)
+        # The file contains the password
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+        return backup_path
+    
+    def _restore_config(self, path: Path, backup: Optional[Path]) -> None:
+        """Roll a config file back to its backup (or remove it)"""
+        if backup is not None:
+            os.replace(backup, path)
+        elif path.exists():
+            path.unlink()
+    
+    def _configure_keyfile(self, username: str, password: str, load: Optional[bool] = None,
+                           deadline: Optional[Deadline] = None) -> bool:
+        """Write a NetworkManager keyfile under ``self.root`` without nmcli.
+        
+        When writing to the live system (root ``/``) the keyfile is also
+        loaded into a running NetworkManager, unless ``load`` is False.
+        """
+        from .keyfile import write_keyfile
+        path = write_keyfile(self, username, password)
+        
+        if load is None:
+            load = self.root == Path("/")
+        if load:
+            try:
+                run_sync(["nmcli", "connection", "load", str(path)], deadline=deadline)
+            except FileNotFoundError:
+                pass
+        return True
+    
+    def _configure_systemd_networkd(self, username: str, password: str,
+                                    deadline: Optional[Deadline] = None) -> bool:
         """Configure systemd-networkd with wpa_supplicant"""
         # Generate wpa_supplicant configuration
-        wpa_config = f'''network={{
-    ssid="{self.ssid}"
-    key_mgmt=WPA-EAP
-    eap=PEAP
-    phase2="auth=MSCHAPV2"
-    identity="{username}"
-    password="{password}"
-    anonymous_identity=""
-}}'''
+        wpa_config = self._wpa_global_options() + self._wpa_network_block(username, password)
         
         # Write wpa_supplicant config
-        wpa_config_path = Path("/etc/wpa_supplicant/wpa_supplicant-wlan0.conf")
+        wpa_config_path = self.root / "etc" / "wpa_supplicant" / f"wpa_supplicant-{self.interface}.conf"
+        backup = None
         try:
-            wpa_config_path.parent.mkdir(parents=True, exist_ok=True)
-            wpa_config_path.write_text(wpa_config)
+            backup = self._write_config(wpa_config_path, wpa_config)
             
             # Enable and start wpa_supplicant service
-            subprocess.run(
-                ["systemctl", "enable", "wpa_supplicant@wlan0.service"],
-                check=True
+            run_sync(
+                ["systemctl", "enable", f"wpa_supplicant@{self.interface}.service"],
+                check=True,
+                deadline=deadline
             )
-            subprocess.run(
-                ["systemctl", "restart", "wpa_supplicant@wlan0.service"],
-                check=True
+            run_sync(
+                ["systemctl", "restart", f"wpa_supplicant@{self.interface}.service"],
+                check=True,
+                deadline=deadline
             )
             
             return True
         except Exception as e:
+            # Put the previous configuration back
+            try:
+                self._restore_config(wpa_config_path, backup)
+                run_sync(["systemctl", "restart", f"wpa_supplicant@{self.interface}.service"])
+            except Exception:
+                pass
+            if isinstance(e, FlowCancelled):
+                raise
             raise NetworkConfigError(f"Failed to configure systemd-networkd: {str(e)}")
     
     def _configure_wpa_supplicant(self, username: str, password: str) -> bool:
         """Configure wpa_supplicant directly"""
         # Similar to systemd-networkd but without systemd
-        wpa_config = f'''ctrl_interface=/var/run/wpa_supplicant
-ctrl_interface_group=0
-update_config=1
-
-network={{
-    ssid="{self.ssid}"
-    key_mgmt=WPA-EAP
-    eap=PEAP
-    phase2="auth=MSCHAPV2"
-    identity="{username}"
-    password="{password}"
-    anonymous_identity=""
-}}'''
-        
-        wpa_config_path = Path("/etc/wpa_supplicant/wpa_supplicant.conf")
+        wpa_config = (
+            "ctrl_interface=/var/run/wpa_supplicant\n"
+            "ctrl_interface_group=0\n"
+            "update_config=1\n"
+            + self._wpa_global_options()
+            + "\n"
+            + self._wpa_network_block(username, password)
+        )
+        
+        wpa_config_path = self.root / "etc" / "wpa_supplicant" / "wpa_supplicant.conf"
         try:
-            wpa_config_path.write_text(wpa_config)
+            self._write_config(wpa_config_path, wpa_config)
             return True
         except Exception as e:
             raise NetworkConfigError(f"Failed to configure wpa_supplicant: {str(e)}")
     
-    def test_connection(self) -> bool:
-        """Test if connected to Wireless@SGx"""
+    def _wpa_global_options(self) -> str:
+        """Global wpa_supplicant options for the fast-join mode"""
+        if not self.fast_join:
+            return ""
+        # fast_reauth: EAP/TLS session resumption; okc: opportunistic key caching
+        return "fast_reauth=1\nokc=1\n"
+    
+    def _wpa_network_block(self, username: str, password: str) -> str:
+        """wpa_supplicant network block shared by both wpa_supplicant backends"""
+        lines = [
+            f'ssid="{self.ssid}"',
+            "key_mgmt=WPA-EAP",
+            "eap=PEAP",
+            'phase2="auth=MSCHAPV2"',
+            f'identity="{username}"',
+            f'password="{password}"',
+            'anonymous_identity=""',
+        ]
+        if self.fast_join:
+            lines += [
+                # Allow TLS session tickets so PEAP can resume the outer tunnel
+                'phase1="tls_disable_session_ticket=0"',
+                "proactive_key_caching=1",
+                f'bgscan="{FAST_JOIN_BGSCAN}"',
+            ]
+        return "network={\n" + "".join(f"    {line}\n" for line in lines) + "}"
+    
+    def get_profile_info(self, deadline: Optional[Deadline] = None) -> Optional[Dict[str, str]]:
+        """Return settings and active state of the NetworkManager profile.
+        
+        Keys are nmcli field names (``connection.autoconnect``,
+        ``GENERAL.STATE``, ``GENERAL.DEVICES``, ``IP4.ADDRESS``); the
+        ``GENERAL``/``IP4`` fields are only present while the profile is
+        active. Returns None if the profile or nmcli does not exist.
+        """
+        try:
+            result = run_sync(
+                ["nmcli", "-t", "-f",
+                 "connection.autoconnect,GENERAL.STATE,GENERAL.DEVICES,IP4.ADDRESS",
+                 "connection", "show", self.connection_name],
+                timeout=10,
+                deadline=deadline
+            )
+        except FileNotFoundError:
+            return None
+        
+        if result.returncode != 0:
+            return None
+        
+        info = {}
+        for line in result.stdout.splitlines():
+            if not line:
+                continue
+            key, value = parse_terse_line(line, maxsplit=1)
+            # Multi-valued fields are reported as IP4.ADDRESS[1], [2], ...
+            key = key.split("[")[0]
+            info.setdefault(key, value)
+        return info
+    
+    def list_access_points(self, rescan: bool = False,
+                           deadline: Optional[Deadline] = None) -> List[Dict]:
+        """List Wi-Fi access points known to NetworkManager"""
         try:
-            # Check with nmcli first
-            result = subprocess.run(
-                ["nmcli", "-t", "-f", "ACTIVE,SSID", "dev", "wifi"],
-                capture_output=True,
-                text=True
+            result = run_sync(
+                ["nmcli", "-t", "-f", "ACTIVE,SSID,BSSID,SIGNAL,DEVICE",
+                 "device", "wifi", "list", "--rescan", "yes" if rescan else "no"],
+                timeout=30 if rescan else 10,
+                deadline=deadline
             )
+        except FileNotFoundError:
+            return []
+        
+        access_points = []
+        for line in result.stdout.splitlines():
+            fields = parse_terse_line(line)
+            if len(fields) != 5:
+                continue
+            active, ssid, bssid, signal, device = fields
+            access_points.append({
+                "active": active == "yes",
+                "ssid": ssid,
+                "bssid": bssid,
+                "signal": int(signal) if signal.isdigit() else None,
+                "device": device
+            })
+        return access_points
+    
+    def scan_for_ssid(self, max_age: float = SCAN_CACHE_TTL,
+                      scan_wait: float = 3.0,
+                      deadline: Optional[Deadline] = None) -> List[Dict]:
+        """Return visible BSSIDs of the Wireless@SGx SSID, strongest first.
+        
+        Results are cached for ``max_age`` seconds. NetworkManager's own
+        scan results are used when they already contain the SSID; otherwise
+        a scan targeted at the SSID is triggered and polled for up to
+        ``scan_wait`` seconds.
+        """
+        cached = _scan_cache.get(self.ssid)
+        if cached and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        
+        def visible():
+            aps = [ap for ap in self.list_access_points(deadline=deadline) if ap["ssid"] == self.ssid]
+            return sorted(aps, key=lambda ap: ap["signal"] or 0, reverse=True)
+        
+        aps = visible()
+        if not aps:
+            try:
+                run_sync(["nmcli", "device", "wifi", "rescan", "ssid", self.ssid],
+                         timeout=10, deadline=deadline)
+            except FileNotFoundError:
+                return []
             
-            for line in result.stdout.strip().split('\n'):
-                if line.startswith("yes:") and self.ssid in line:
-                    return True
-                    
-        except:
-            pass
+            scan_deadline = time.monotonic() + scan_wait
+            while not aps and time.monotonic() < scan_deadline:
+                if deadline is not None:
+                    deadline.sleep(0.5)
+                else:
+                    time.sleep(0.5)
+                aps = visible()
+        
+        _scan_cache[self.ssid] = (time.monotonic(), aps)
+        return aps
+    
+    def activate(self, deadline: Optional[Deadline] = None) -> Dict:
+        """Bring the NetworkManager profile up if the SSID is in range.
+        
+        Skips the activation (and NetworkManager's full activation timeout)
+        when the SSID is not visible, and pins the connection to the
+        strongest BSSID otherwise. Returns ``{"connected", "in_range",
+        "bssid"}``.
+        """
+        start = time.monotonic()
+        aps = self.scan_for_ssid(deadline=deadline)
+        if not aps:
+            metrics.observe_connect(time.monotonic() - start, "out_of_range")
+            history.record_attempt(False, time.monotonic() - start, reason="out_of_range",
+                                   profile=self.connection_name)
+            return {"connected": False, "in_range": False, "bssid": None}
+        
+        bssid = aps[0]["bssid"]
+        cmd = ["nmcli", "connection", "up", self.connection_name]
+        if bssid:
+            cmd += ["ap", bssid]
+        
+        try:
+            result = run_sync(cmd, timeout=ACTIVATION_TIMEOUT, deadline=deadline)
+            connected = result.ok
+        except FileNotFoundError:
+            result = None
+            connected = False
+        
+        duration = time.monotonic() - start
+        metrics.observe_connect(duration, "connected" if connected else "failed")
+        reason = None
+        if not connected:
+            reason = _activation_failure_reason(result) if result is not None else "not_installed"
+            if result is not None:
+                metrics.count_auth_failure(reason)
+        history.record_attempt(connected, duration, bssid, reason, profile=self.connection_name)
+        if connected:
+            history.record_link(True, bssid, profile=self.connection_name)
+        else:
+            # The AP may have gone away; force a fresh scan next time
+            _scan_cache.pop(self.ssid, None)
+        
+        return {"connected": connected, "in_range": True, "bssid": bssid}
+    
+    def test_connection(self, deadline: Optional[Deadline] = None) -> bool:
+        """Test if connected to Wireless@SGx"""
+        # Check with nmcli first
+        for ap in self.list_access_points(deadline=deadline):
+            if ap["active"] and ap["ssid"] == self.ssid:
+                return True
         
         # Check with iwconfig
         try:
-            result = subprocess.run(
-                ["iwconfig"],
-                capture_output=True,
-                text=True
-            )
+            result = run_sync(["iwconfig"], timeout=5, deadline=deadline)
             
             if self.ssid in result.stdout:
                 return True
                 
-        except:
+        except FileNotFoundError:
             pass
         
         return False
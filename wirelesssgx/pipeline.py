@@ -0,0 +1,148 @@
+"""Dependency pipeline for the post-OTP work
+
+Each stage runs on a worker thread as soon as the stages it depends on
+have finished, so independent steps overlap: after OTP verification the
+credentials are decrypted the moment the payload arrives, the keyring
+save and the network configuration run side by side, and activation
+starts as soon as configuration is done.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .deadline import FlowCancelled
+from .tracing import span
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+# Not run because a stage it depends on failed
+SKIPPED = "skipped"
+
+
+class Pipeline:
+    """Named stages with dependencies, run concurrently.
+
+    A stage's function is called with the results of the stages listed in
+    ``after``, in that order. A failing stage does not stop unrelated
+    stages; its dependents are skipped and re-raise its error from
+    ``result()``. ``on_change`` is called with the pipeline whenever a stage
+    starts or finishes, from whichever thread ran it.
+    """
+
+    def __init__(self, on_change: Optional[Callable[["Pipeline"], None]] = None,
+                 clock: Callable[[], float] = time.monotonic, max_workers: int = 4):
+        self.on_change = on_change
+        self._clock = clock
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        # name -> (function, dependencies, label)
+        self._stages: Dict[str, Tuple[Callable, Tuple[str, ...], str]] = {}
+        self.status: Dict[str, str] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self._started: Dict[str, float] = {}
+        self._finished: Dict[str, float] = {}
+
+    def add(self, name: str, func: Callable, after: Sequence[str] = (),
+            label: Optional[str] = None) -> "Pipeline":
+        """Add a stage; dependencies must already have been added"""
+        for dependency in after:
+            if dependency not in self._stages:
+                raise ValueError(f"Unknown stage: {dependency}")
+        self._stages[name] = (func, tuple(after), label or name.title())
+        self.status[name] = PENDING
+        return self
+
+    @property
+    def stages(self) -> List[str]:
+        return list(self._stages)
+
+    def label(self, name: str) -> str:
+        return self._stages[name][2]
+
+    def _set(self, name: str, status: str) -> None:
+        with self._lock:
+            self.status[name] = status
+            if status == RUNNING:
+                self._started[name] = self._clock()
+            elif status in (DONE, FAILED):
+                self._finished[name] = self._clock()
+        if self.on_change:
+            self.on_change(self)
+
+    def _run_stage(self, name: str) -> None:
+        func, after, _ = self._stages[name]
+        self._set(name, RUNNING)
+        try:
+            with span(self.label(name), "pipeline"):
+                self.results[name] = func(*(self.results[dependency] for dependency in after))
+        except Exception as e:
+            self.errors[name] = e
+            self._set(name, FAILED)
+        else:
+            self._set(name, DONE)
+
+    def run(self) -> Dict[str, Any]:
+        """Run every stage and return the results of those that succeeded.
+
+        FlowCancelled from any stage is re-raised once the running stages
+        have finished; other errors are left in ``errors``.
+        """
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self._max_workers,
+                                thread_name_prefix="wirelesssgx-pipeline") as pool:
+            while True:
+                for name, (_, after, _) in self._stages.items():
+                    if self.status[name] != PENDING:
+                        continue
+                    failed = next((dependency for dependency in after
+                                   if self.status[dependency] in (FAILED, SKIPPED)), None)
+                    if failed is not None:
+                        self.errors[name] = self.errors[failed]
+                        self._set(name, SKIPPED)
+                    elif all(self.status[dependency] == DONE for dependency in after):
+                        # Mark before submitting so the next pass cannot
+                        # start it twice
+                        self.status[name] = RUNNING
+                        running[pool.submit(self._run_stage, name)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    del running[future]
+
+        for name in self._stages:
+            if isinstance(self.errors.get(name), FlowCancelled):
+                raise self.errors[name]
+        return dict(self.results)
+
+    def result(self, name: str) -> Any:
+        """Result of ``name``, re-raising its (or its dependency's) error"""
+        if name in self.errors:
+            raise self.errors[name]
+        return self.results[name]
+
+    def durations(self) -> Dict[str, float]:
+        """Seconds each finished stage took"""
+        return {
+            name: round(self._finished[name] - self._started[name], 3)
+            for name in self._stages if name in self._finished and name in self._started
+        }
+
+
+def render_timings(*pipelines: Pipeline) -> str:
+    """One line per stage with its status marker and duration"""
+    markers = {PENDING: "·", RUNNING: "⏳", DONE: "✅", FAILED: "❌", SKIPPED: "·"}
+    lines = []
+    for pipeline in pipelines:
+        durations = pipeline.durations()
+        for name in pipeline.stages:
+            line = f"{markers[pipeline.status[name]]} {pipeline.label(name)}"
+            if name in durations:
+                line += f" ({durations[name]:.1f}s)"
+            lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,96 @@
+"""Profile one CLI command or TUI session (``--profile``)
+
+By default a sampling profiler records the stack of every thread every
+few milliseconds (``WIRELESSSGX_PROFILE_INTERVAL``, default 5) and writes
+collapsed stacks, one ``frame;frame;frame count`` line per distinct
+stack, for flamegraph.pl, inferno or speedscope. A path ending in
+``.prof`` uses cProfile instead: deterministic, but the main thread only
+(the TUI's event loop, not its workers), written as pstats data for
+snakeviz, flameprof or ``python -m pstats``.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+DEFAULT_INTERVAL_MS = 5.0
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples every thread's stack from a background thread"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wirelesssgx-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def _interval() -> float:
+    try:
+        return float(os.environ.get("WIRELESSSGX_PROFILE_INTERVAL", DEFAULT_INTERVAL_MS)) / 1000
+    except ValueError:
+        return DEFAULT_INTERVAL_MS / 1000
+
+
+@contextmanager
+def profiled(path: str) -> Iterator[None]:
+    """Profile the enclosed block and write the result to ``path``"""
+    if path.endswith(".prof"):
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+            print(f"Profile written to {path}", file=sys.stderr)
+        return
+
+    profiler = SamplingProfiler(_interval())
+    start = time.perf_counter()
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        profiler.write_collapsed(path)
+        print(f"Profile written to {path} ({sum(profiler.samples.values())} samples "
+              f"over {time.perf_counter() - start:.1f}s)", file=sys.stderr)
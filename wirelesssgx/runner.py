@@ -0,0 +1,283 @@
+"""Command runner for every external program the package calls
+
+All ``nmcli``, ``systemctl``, ``iwconfig`` and ``eapol_test`` invocations
+go through here so that each call has a deadline, a hung child is killed
+rather than leaking, the number of concurrent children is capped, and
+latency and exit codes are recorded per command.
+
+``run`` is the asyncio entry point; ``run_sync`` is its blocking twin for
+the synchronous backends (CLI and executor threads). ``set_system``
+routes every call to an in-process stand-in instead (see ``sandbox``).
+"""
+
+import os
+import subprocess
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Dict, Optional, Sequence
+
+from . import tracing
+from .deadline import Deadline
+
+DEFAULT_TIMEOUT = 30.0
+MAX_CONCURRENCY = 8
+
+
+class CommandError(Exception):
+    """A command failed and the caller asked for ``check``"""
+
+    def __init__(self, result: "CommandResult"):
+        self.result = result
+        detail = "timed out" if result.timed_out else f"exited with {result.returncode}"
+        stderr = result.stderr.strip()
+        super().__init__(f"{' '.join(result.cmd)} {detail}" + (f": {stderr}" if stderr else ""))
+
+
+class CommandNotFound(CommandError, FileNotFoundError):
+    """The program is not installed"""
+
+    def __init__(self, cmd: Sequence[str]):
+        self.result = None
+        FileNotFoundError.__init__(self, f"Command not found: {cmd[0]}")
+
+
+class CommandResult:
+    """Outcome of a finished (or killed) command"""
+
+    def __init__(self, cmd: Sequence[str], returncode: Optional[int], stdout: str,
+                 stderr: str, duration: float, timed_out: bool = False):
+        self.cmd = list(cmd)
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.duration = duration
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+    def check(self) -> "CommandResult":
+        """Raise CommandError unless the command succeeded"""
+        if not self.ok:
+            raise CommandError(self)
+        return self
+
+    def __repr__(self) -> str:
+        return (f"CommandResult(cmd={self.cmd!r}, returncode={self.returncode}, "
+                f"duration={self.duration:.3f}, timed_out={self.timed_out})")
+
+
+class CommandMetrics:
+    """Per-command call counts, latency and exit codes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+
+    def record(self, name: str, result: CommandResult) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                "calls": 0, "failures": 0, "timeouts": 0,
+                "total_time": 0.0, "max_time": 0.0, "exit_codes": Counter(),
+            })
+            stats["calls"] += 1
+            stats["failures"] += not result.ok
+            stats["timeouts"] += result.timed_out
+            stats["total_time"] += result.duration
+            stats["max_time"] = max(stats["max_time"], result.duration)
+            stats["exit_codes"][result.returncode] += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copy of the current metrics, with mean latency"""
+        with self._lock:
+            return {
+                name: dict(stats,
+                           exit_codes=dict(stats["exit_codes"]),
+                           mean_time=stats["total_time"] / stats["calls"])
+                for name, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+metrics = CommandMetrics()
+
+# Caps on concurrent children: one shared by all threads and a separate one
+# per event loop. They are independent, so the process as a whole can have
+# MAX_CONCURRENCY children per loop on top of those started from threads.
+_thread_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+_loop_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+    weakref.WeakKeyDictionary()
+
+# Simulated system that answers commands in-process; None runs real programs
+_system = None
+
+
+def set_system(system) -> None:
+    """Send every command to ``system`` instead of spawning it.
+
+    ``system`` needs ``run(cmd, input) -> CommandResult`` and
+    ``spawn(cmd)`` returning a Popen-like object; None restores real
+    programs.
+    """
+    global _system
+    _system = system
+
+
+def _command_name(cmd: Sequence[str]) -> str:
+    """Metrics key: program plus its first sub-command (e.g. ``nmcli connection``)"""
+    words = [os.path.basename(cmd[0])]
+    skip = False
+    for arg in cmd[1:]:
+        if skip:
+            skip = False
+        elif arg in ("-f", "--fields", "-m", "--mode"):
+            skip = True
+        elif not arg.startswith("-"):
+            words.append(arg)
+            break
+    return " ".join(words)
+
+
+def _loop_semaphore() -> "asyncio.Semaphore":
+    import asyncio
+    loop = asyncio.get_running_loop()
+    semaphore = _loop_slots.get(loop)
+    if semaphore is None:
+        semaphore = _loop_slots[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return semaphore
+
+
+def _finish(result: CommandResult, name: Optional[str], deadline: Optional[Deadline],
+            check: bool) -> CommandResult:
+    """Record metrics, then apply the deadline and ``check``"""
+    name = name or _command_name(result.cmd)
+    metrics.record(name, result)
+    if tracing.enabled():
+        # Arguments are left out: they can contain the password
+        tracing.record(name, "subprocess", time.perf_counter() - result.duration, result.duration,
+                       {"returncode": result.returncode, "timed_out": result.timed_out})
+    if deadline is not None and not result.ok:
+        deadline.check()
+    return result.check() if check else result
+
+
+async def run(cmd: Sequence[str], timeout: Optional[float] = DEFAULT_TIMEOUT,
+              input: Optional[str] = None, check: bool = False,
+              name: Optional[str] = None, deadline: Optional[Deadline] = None) -> CommandResult:
+    """Run a command without blocking the event loop.
+
+    The child is killed if ``timeout`` expires or the awaiting task is
+    cancelled (cancellation is re-raised after the child is reaped).
+    ``timeout`` is capped by ``deadline``, which raises FlowCancelled or
+    DeadlineExceeded instead of returning a killed result.
+    """
+    # Imported here so the synchronous CLI does not pay for asyncio
+    import asyncio
+    if deadline is not None:
+        timeout = deadline.timeout(timeout)
+    if _system is not None:
+        return _finish(_system.run(cmd, input), name, deadline, check)
+    async with _loop_semaphore():
+        start = time.monotonic()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            raise CommandNotFound(cmd)
+
+        timed_out = False
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(input.encode() if input is not None else None),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            timed_out = True
+            stdout, stderr = b"", b""
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+        result = CommandResult(cmd, process.returncode, stdout.decode(errors="replace"),
+                               stderr.decode(errors="replace"), time.monotonic() - start, timed_out)
+
+    return _finish(result, name, deadline, check)
+
+
+def run_sync(cmd: Sequence[str], timeout: Optional[float] = DEFAULT_TIMEOUT,
+             input: Optional[str] = None, check: bool = False,
+             name: Optional[str] = None, deadline: Optional[Deadline] = None) -> CommandResult:
+    """Blocking version of ``run`` for synchronous code and worker threads.
+
+    Cancelling ``deadline`` from another thread kills the child.
+    """
+    if deadline is not None:
+        timeout = deadline.timeout(timeout)
+    if _system is not None:
+        return _finish(_system.run(cmd, input), name, deadline, check)
+    with _thread_slots:
+        start = time.monotonic()
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+        except FileNotFoundError:
+            raise CommandNotFound(cmd)
+
+        if deadline is not None:
+            deadline.add_callback(process.kill)
+        timed_out = False
+        try:
+            stdout, stderr = process.communicate(input, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            process.kill()
+            stdout, stderr = process.communicate()
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            if deadline is not None:
+                deadline.remove_callback(process.kill)
+
+        result = CommandResult(cmd, process.returncode, stdout, stderr,
+                               time.monotonic() - start, timed_out)
+
+    return _finish(result, name, deadline, check)
+
+
+def spawn(cmd: Sequence[str]) -> subprocess.Popen:
+    """Start a long-lived child whose stdout is read line by line (monitors).
+
+    These have no deadline and are not counted in ``metrics``; the caller
+    owns the process and must terminate it.
+    """
+    if _system is not None:
+        return _system.spawn(cmd)
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+    except FileNotFoundError:
+        raise CommandNotFound(cmd)
+    return process
@@ -0,0 +1,669 @@
+"""Deterministic fake system for running the CLI and TUI without root or Wi-Fi
+
+``Sandbox`` points ``runner`` at a ``SimulatedSystem``: in-process
+stand-ins for ``nmcli``, ``systemctl``, ``iwconfig``, ``ip`` and the
+wpa_supplicant control interface (``wpa_cli``) that all read and change
+one in-memory model of services, connection profiles, the wireless
+device and the access points in range. Config files, credentials and the
+state cache go to a temporary prefix, so every command path (configure,
+activate, status, forget, the daemon's monitors) runs unprivileged and
+in microseconds:
+
+    with Sandbox() as sandbox:
+        sandbox.system.accounts = {"user@singtel": "secret"}
+        NetworkManager().configure_network("user@singtel", "secret")
+        sandbox.system.drop_link()
+
+Nothing is random: addresses are handed out in order and delays only
+happen when ``activation_delay`` is set. Faults are injected per command
+with ``SimulatedSystem.inject_failure``.
+"""
+
+import configparser
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import runner
+from .runner import CommandNotFound, CommandResult
+
+SSID = "Wireless@SGx"
+
+# Short nmcli property names and the setting they stand for
+_NMCLI_ALIASES = {
+    "con-name": "connection.id",
+    "type": "connection.type",
+    "ifname": "connection.interface-name",
+    "autoconnect": "connection.autoconnect",
+    "ssid": "802-11-wireless.ssid",
+    "wifi.ssid": "802-11-wireless.ssid",
+    "wifi.powersave": "802-11-wireless.powersave",
+    "wifi-sec.key-mgmt": "802-11-wireless-security.key-mgmt",
+}
+
+# Device states reported by ``nmcli device monitor`` during an activation
+_ACTIVATION_STATES = (
+    "connecting (prepare)",
+    "connecting (configuring)",
+    "connecting (need authentication)",
+    "connecting (getting IP configuration)",
+)
+
+_NM_NOT_RUNNING = (8, "", "Error: NetworkManager is not running.\n")
+
+# Programs the model answers for; anything else is "not installed"
+PROGRAMS = ("nmcli", "systemctl", "iwconfig", "iw", "ip", "wpa_cli")
+
+
+def _terse(value: str) -> str:
+    """Escape a value for ``nmcli -t`` output"""
+    return value.replace("\\", "\\\\").replace(":", "\\:")
+
+
+class SimulatedProcess:
+    """Popen stand-in for monitor commands, fed by the model through a pipe"""
+
+    def __init__(self, cmd: Sequence[str], on_exit):
+        self.args = list(cmd)
+        self.returncode: Optional[int] = None
+        self._on_exit = on_exit
+        self._exited = threading.Event()
+        read_fd, self._write_fd = os.pipe()
+        # Never block the model on a monitor nobody reads
+        os.set_blocking(self._write_fd, False)
+        self.stdout = os.fdopen(read_fd, "r")
+
+    def feed(self, line: str) -> None:
+        if self.returncode is None:
+            try:
+                os.write(self._write_fd, (line + "\n").encode())
+            except (BlockingIOError, BrokenPipeError):
+                pass
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def _exit(self, returncode: int) -> None:
+        if self.returncode is None:
+            self.returncode = returncode
+            self._on_exit(self)
+            os.close(self._write_fd)
+            self._exited.set()
+
+    def kill(self) -> None:
+        self._exit(-9)
+
+    def terminate(self) -> None:
+        self._exit(-15)
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        if not self._exited.wait(timeout):
+            import subprocess
+            raise subprocess.TimeoutExpired(self.args, timeout)
+        return self.returncode
+
+
+class SimulatedSystem:
+    """In-memory services, profiles, device and radio environment.
+
+    ``services`` maps unit names to ``active``/``inactive``;
+    ``profiles`` maps NetworkManager connection names to their settings
+    (full nmcli property names; a profile shadowed by a rename onto its
+    name is kept under its UUID); ``link`` is the current association,
+    or None. ``accounts`` (username → password) decides which
+    credentials the RADIUS side accepts; None accepts any.
+    """
+
+    def __init__(self, backend: str = "networkmanager", interface: str = "wlan0",
+                 root: Optional[Path] = None):
+        self.interface = interface
+        self.root = root
+        self.services: Dict[str, str] = {
+            "NetworkManager": "active" if backend == "networkmanager" else "inactive",
+            "systemd-networkd": "active" if backend == "systemd-networkd" else "inactive",
+        }
+        self.enabled: Dict[str, bool] = {}
+        self.profiles: Dict[str, Dict[str, str]] = {}
+        self._uuids = 0
+        self.access_points: List[Dict] = []
+        self.link: Optional[Dict] = None
+        # Cumulative transmit retries reported in /proc/net/wireless
+        self.retries = 0
+        self.accounts: Optional[Dict[str, str]] = None
+        # Seconds an activation takes, spread over its stages
+        self.activation_delay = 0.0
+
+        self.calls: Counter = Counter()
+        self.history: deque = deque(maxlen=1000)
+        self._faults: List[Dict] = []
+        self._leases = 0
+        self._monitors: List[Tuple[str, SimulatedProcess]] = []
+        self._lock = threading.RLock()
+
+    # -- Radio environment and faults ---------------------------------------
+
+    def add_access_point(self, ssid: str = SSID, bssid: Optional[str] = None,
+                         signal: int = 70) -> Dict:
+        """Bring an access point into range (autoconnecting like NetworkManager)"""
+        with self._lock:
+            bssid = bssid or f"02:00:00:00:00:{len(self.access_points) + 1:02X}"
+            ap = {"ssid": ssid, "bssid": bssid, "signal": signal}
+            self.access_points.append(ap)
+            self._autoconnect()
+            return ap
+
+    def remove_access_points(self, ssid: str = SSID) -> None:
+        """Take every access point of ``ssid`` out of range"""
+        with self._lock:
+            self.access_points = [ap for ap in self.access_points if ap["ssid"] != ssid]
+            if self.link and self.link["ssid"] == ssid:
+                self.drop_link()
+
+    def drop_link(self) -> None:
+        """Lose the current association (as if the AP went away)"""
+        with self._lock:
+            if self.link is None:
+                return
+            self.link = None
+            self._write_proc_wireless()
+        self._emit("device", "disconnected")
+        self._emit("link", "state DOWN")
+
+    def set_link_quality(self, signal: Optional[int] = None, retries: int = 0) -> None:
+        """Change the associated AP's signal and add transmit retries"""
+        with self._lock:
+            if self.link is not None and signal is not None:
+                self.link["signal"] = signal
+            self.retries += retries
+            self._write_proc_wireless()
+
+    def _write_proc_wireless(self) -> None:
+        """Keep ``<root>/proc/net/wireless`` in step with the link"""
+        if self.root is None:
+            return
+        path = self.root / "proc" / "net" / "wireless"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [
+            "Inter-| sta-|   Quality        |   Discarded packets               | Missed | WE\n",
+            " face | tus | link level noise |  nwid  crypt   frag  retry   misc | beacon | 22\n",
+        ]
+        if self.link is not None:
+            quality = self.link["signal"] * 70 // 100
+            lines.append(f"{self.interface}: 0000   {quality}.  {self.link['signal'] // 2 - 100}.  -256"
+                         f"        0      0      0 {self.retries:6d}      0        0\n")
+        path.write_text("".join(lines))
+
+    def inject_failure(self, command: str, returncode: int = 1, stderr: str = "",
+                       times: int = 1, timed_out: bool = False) -> None:
+        """Fail the next ``times`` commands starting with ``command``.
+
+        ``command`` is matched word by word (e.g. ``"nmcli connection up"``);
+        a matching command is not run.
+        """
+        with self._lock:
+            self._faults.append({"prefix": command.split(), "remaining": times,
+                                 "returncode": returncode, "stderr": stderr,
+                                 "timed_out": timed_out})
+
+    # -- runner interface -----------------------------------------------------
+
+    def run(self, cmd: Sequence[str], input: Optional[str] = None) -> CommandResult:
+        start = time.monotonic()
+        cmd = list(cmd)
+        program = os.path.basename(cmd[0])
+        if program not in PROGRAMS:
+            raise CommandNotFound(cmd)
+        handler = getattr(self, f"_{program}")
+
+        self.calls[program] += 1
+        self.history.append(cmd)
+        fault = self._take_fault(cmd)
+        if fault is not None:
+            returncode = None if fault["timed_out"] else fault["returncode"]
+            return CommandResult(cmd, returncode, "", fault["stderr"],
+                                 time.monotonic() - start, fault["timed_out"])
+
+        returncode, stdout, stderr = handler(cmd[1:])
+        return CommandResult(cmd, returncode, stdout, stderr, time.monotonic() - start)
+
+    def spawn(self, cmd: Sequence[str]) -> SimulatedProcess:
+        """Monitors: ``nmcli monitor``, ``nmcli device monitor`` and ``ip monitor``"""
+        args = list(cmd[1:])
+        program = os.path.basename(cmd[0])
+        if program == "nmcli" and args[:1] == ["monitor"]:
+            kind = "nmcli"
+        elif program == "nmcli" and args[:2] == ["device", "monitor"]:
+            kind = "device"
+        elif program == "ip" and args[:1] == ["monitor"]:
+            kind = "link"
+        else:
+            raise CommandNotFound(cmd)
+
+        self.calls[program] += 1
+        process = SimulatedProcess(cmd, self._unsubscribe)
+        with self._lock:
+            self._monitors.append((kind, process))
+        return process
+
+    def _take_fault(self, cmd: List[str]) -> Optional[Dict]:
+        with self._lock:
+            for fault in self._faults:
+                if cmd[:len(fault["prefix"])] == fault["prefix"]:
+                    fault["remaining"] -= 1
+                    if fault["remaining"] <= 0:
+                        self._faults.remove(fault)
+                    return fault
+        return None
+
+    def _unsubscribe(self, process: SimulatedProcess) -> None:
+        with self._lock:
+            self._monitors = [(kind, p) for kind, p in self._monitors if p is not process]
+
+    def _emit(self, kind: str, state: str) -> None:
+        """Write a monitor line to every subscriber that would see it"""
+        with self._lock:
+            monitors = list(self._monitors)
+        for monitor_kind, process in monitors:
+            if monitor_kind == "link" and kind == "link":
+                process.feed(f"3: {self.interface}: <BROADCAST,MULTICAST,UP> {state}")
+            elif monitor_kind in ("device", "nmcli") and kind == "device":
+                process.feed(f"{self.interface}: {state}")
+
+    # -- Association ----------------------------------------------------------
+
+    def _authenticates(self, username: Optional[str], password: Optional[str]) -> bool:
+        if self.accounts is None:
+            return True
+        return bool(username) and self.accounts.get(username) == password
+
+    def _associate(self, via: str, name: str, ssid: str, username: Optional[str],
+                   password: Optional[str], bssid: Optional[str] = None) -> Tuple[bool, str]:
+        """Run an activation through its stages; returns (ok, error)"""
+        with self._lock:
+            candidates = [ap for ap in self.access_points
+                          if ap["ssid"] == ssid and (bssid is None or ap["bssid"] == bssid)]
+        if not candidates:
+            return False, "No network with SSID '{}' found.".format(ssid)
+        ap = max(candidates, key=lambda ap: ap["signal"])
+
+        self.drop_link()
+        for stage in _ACTIVATION_STATES:
+            self._emit("device", stage)
+            if self.activation_delay:
+                time.sleep(self.activation_delay / len(_ACTIVATION_STATES))
+            if stage == "connecting (need authentication)" and \
+                    not self._authenticates(username, password):
+                self._emit("device", "disconnected")
+                return False, "Secrets were required, but not provided."
+
+        with self._lock:
+            self._leases += 1
+            self.link = {
+                "via": via, "profile": name, "ssid": ssid, "bssid": ap["bssid"],
+                "signal": ap["signal"],
+                "ip4": f"10.0.{(self._leases - 1) // 250}.{(self._leases - 1) % 250 + 2}/24",
+            }
+            self._write_proc_wireless()
+        self._emit("device", "connected")
+        self._emit("link", "state UP")
+        return True, ""
+
+    def _autoconnect(self) -> None:
+        """Activate an autoconnect profile whose SSID is now in range"""
+        if self.link is not None or self.services["NetworkManager"] != "active":
+            return
+        visible = {ap["ssid"] for ap in self.access_points}
+        for name, settings in self.profiles.items():
+            if settings.get("connection.autoconnect") == "yes" and \
+                    settings.get("802-11-wireless.ssid") in visible:
+                self._associate("networkmanager", name, settings["802-11-wireless.ssid"],
+                                settings.get("802-1x.identity"), settings.get("802-1x.password"))
+                return
+
+    # -- nmcli ----------------------------------------------------------------
+
+    def _nmcli(self, args: List[str]):
+        if self.services["NetworkManager"] != "active":
+            return _NM_NOT_RUNNING
+
+        fields = None
+        while args and args[0].startswith("-"):
+            option = args.pop(0)
+            if option in ("-f", "--fields"):
+                fields = args.pop(0).split(",")
+
+        if args[:2] == ["device", "wifi"]:
+            if args[2:3] == ["list"]:
+                return 0, self._nmcli_wifi_list(fields), ""
+            return 0, "", ""
+        if args[:1] == ["connection"]:
+            action, rest = (args[1], args[2:]) if len(args) > 1 else ("show", [])
+            with self._lock:
+                if action == "add":
+                    return self._nmcli_add(rest)
+                if action == "modify":
+                    return self._nmcli_modify(rest)
+                if action == "delete":
+                    return self._nmcli_delete(rest)
+                if action in ("load", "reload"):
+                    return self._nmcli_load(rest)
+                if action == "show":
+                    return self._nmcli_show(rest, fields)
+                if action == "down":
+                    if not self.link or self.link["profile"] != rest[0]:
+                        return 10, "", f"Error: '{rest[0]}' is not an active connection.\n"
+            if action == "up":
+                return self._nmcli_up(rest)
+            if action == "down":
+                self.drop_link()
+                return 0, "", ""
+        return 2, "", f"Error: argument '{' '.join(args)}' not understood.\n"
+
+    def _nmcli_wifi_list(self, fields: Optional[List[str]]) -> str:
+        fields = fields or ["ACTIVE", "SSID", "BSSID", "SIGNAL", "DEVICE"]
+        lines = []
+        with self._lock:
+            for ap in self.access_points:
+                active = bool(self.link and self.link["via"] == "networkmanager"
+                              and self.link["bssid"] == ap["bssid"])
+                values = {
+                    "ACTIVE": "yes" if active else "no",
+                    "SSID": ap["ssid"],
+                    "BSSID": ap["bssid"],
+                    "SIGNAL": str(ap["signal"]),
+                    "DEVICE": self.interface,
+                }
+                lines.append(":".join(_terse(values.get(field, "")) for field in fields))
+        return "".join(f"{line}\n" for line in lines)
+
+    def _settings(self, pairs: List[str]) -> Dict[str, str]:
+        return {_NMCLI_ALIASES.get(key, key): value for key, value in zip(pairs[::2], pairs[1::2])}
+
+    def _new_uuid(self) -> str:
+        self._uuids += 1
+        return f"00000000-0000-4000-8000-{self._uuids:012d}"
+
+    def _lookup(self, args: List[str]) -> Tuple[Optional[str], List[str]]:
+        """Resolve ``[id|uuid] NAME`` to a key of ``profiles`` and the remaining args"""
+        if args[:1] in (["id"], ["uuid"]) and len(args) > 1:
+            kind, name, rest = args[0], args[1], args[2:]
+        else:
+            kind, name, rest = "id", args[0] if args else "", args[1:]
+        if kind == "uuid":
+            name = next((key for key, profile in self.profiles.items()
+                         if profile.get("connection.uuid") == name), name)
+        return (name if name in self.profiles else None), rest
+
+    def _nmcli_add(self, args: List[str]):
+        settings = {"connection.autoconnect": "yes"}
+        settings.update(self._settings(args))
+        name = settings.get("connection.id") or settings.get("802-11-wireless.ssid")
+        if not name:
+            return 2, "", "Error: connection name is missing.\n"
+        settings["connection.id"] = name
+        settings.setdefault("connection.uuid", self._new_uuid())
+        self.profiles[name] = settings
+        return 0, f"Connection '{name}' successfully added.\n", ""
+
+    def _nmcli_modify(self, args: List[str]):
+        name, rest = self._lookup(args)
+        if name is None:
+            return 10, "", f"Error: unknown connection '{args[-1] if args else ''}'.\n"
+        profile = self.profiles.pop(name)
+        profile.update(self._settings(rest))
+        new_name = profile["connection.id"]
+        shadowed = self.profiles.pop(new_name, None)
+        if shadowed is not None:
+            # NetworkManager allows duplicate names; keep the other profile
+            # reachable by its UUID
+            self.profiles[shadowed["connection.uuid"]] = shadowed
+            if self.link and self.link["profile"] == new_name:
+                self.link["profile"] = shadowed["connection.uuid"]
+        self.profiles[new_name] = profile
+        if self.link and self.link["profile"] == name:
+            self.link["profile"] = new_name
+        return 0, "", ""
+
+    def _nmcli_delete(self, args: List[str]):
+        name, _ = self._lookup(args)
+        if name is None:
+            return 10, "", f"Error: unknown connection '{args[-1] if args else ''}'.\n"
+        del self.profiles[name]
+        if self.link and self.link["profile"] == name:
+            self.drop_link()
+        return 0, f"Connection '{name}' successfully deleted.\n", ""
+
+    def _nmcli_load(self, args: List[str]):
+        """Read keyfiles (``load PATH...``, or all of them for ``reload``)"""
+        paths = [Path(arg) for arg in args]
+        if not paths and self.root is not None:
+            paths = sorted((self.root / "etc" / "NetworkManager" / "system-connections").glob("*.nmconnection"))
+        for path in paths:
+            keyfile = configparser.ConfigParser(interpolation=None)
+            if not keyfile.read(path):
+                return 10, "", f"Error: failed to load connection: {path}\n"
+            name = keyfile.get("connection", "id")
+            self.profiles[name] = {
+                "connection.id": name,
+                "connection.uuid": keyfile.get("connection", "uuid", fallback=None) or self._new_uuid(),
+                "connection.autoconnect": "no" if keyfile.get("connection", "autoconnect",
+                                                               fallback="true") == "false" else "yes",
+                "802-11-wireless.ssid": keyfile.get("wifi", "ssid", fallback=""),
+                "802-1x.identity": keyfile.get("802-1x", "identity", fallback=""),
+                "802-1x.password": keyfile.get("802-1x", "password", fallback=""),
+            }
+        return 0, "", ""
+
+    def _nmcli_show(self, args: List[str], fields: Optional[List[str]]):
+        name, _ = self._lookup(args)
+        if name is None:
+            return 10, "", f"Error: {args[-1] if args else ''} - no such connection profile.\n"
+        profile = self.profiles[name]
+        active = self.link is not None and self.link["profile"] == name
+        lines = []
+        for field in fields or sorted(profile):
+            if field.startswith(("GENERAL.", "IP4.")):
+                if active:
+                    value = {"GENERAL.STATE": "activated", "GENERAL.DEVICES": self.interface,
+                             "IP4.ADDRESS": self.link["ip4"]}.get(field)
+                    if value is not None:
+                        lines.append(f"{field}[1]:{_terse(value)}" if field == "IP4.ADDRESS"
+                                     else f"{field}:{_terse(value)}")
+            else:
+                lines.append(f"{field}:{_terse(profile.get(field, ''))}")
+        return 0, "".join(f"{line}\n" for line in lines), ""
+
+    def _nmcli_up(self, args: List[str]):
+        with self._lock:
+            profile = self.profiles.get(args[0]) if args else None
+        if profile is None:
+            return 10, "", f"Error: unknown connection '{args[0] if args else ''}'.\n"
+        bssid = args[args.index("ap") + 1] if "ap" in args else None
+        ok, error = self._associate("networkmanager", args[0], profile.get("802-11-wireless.ssid", ""),
+                                    profile.get("802-1x.identity"), profile.get("802-1x.password"),
+                                    bssid)
+        if not ok:
+            return 4, "", f"Error: Connection activation failed: {error}\n"
+        return 0, "Connection successfully activated.\n", ""
+
+    # -- systemctl ------------------------------------------------------------
+
+    def _systemctl(self, args: List[str]):
+        action, units = args[0], [unit[:-len(".service")] if unit.endswith(".service") else unit
+                                  for unit in args[1:]]
+        if action == "is-active":
+            states = [self.services.get(unit, "inactive") for unit in units]
+            return (0 if "active" in states else 3), "".join(f"{s}\n" for s in states), ""
+        if action in ("enable", "disable"):
+            for unit in units:
+                self.enabled[unit] = action == "enable"
+            return 0, "", ""
+        if action in ("start", "restart", "stop"):
+            for unit in units:
+                self.services[unit] = "inactive" if action == "stop" else "active"
+                if unit == "NetworkManager":
+                    with self._lock:
+                        self._autoconnect()
+                elif unit.startswith("wpa_supplicant"):
+                    self.drop_link()
+                    if action != "stop":
+                        self._wpa_reconfigure()
+            return 0, "", ""
+        return 1, "", f"Unknown command verb {action}.\n"
+
+    # -- wpa_supplicant -------------------------------------------------------
+
+    def _wpa_running(self) -> bool:
+        return any(self.services.get(unit) == "active"
+                   for unit in ("wpa_supplicant", f"wpa_supplicant@{self.interface}"))
+
+    def _wpa_reconfigure(self) -> bool:
+        """Re-read the wpa_supplicant config under ``root`` and associate"""
+        if self.root is None:
+            return False
+        config_dir = self.root / "etc" / "wpa_supplicant"
+        for path in (config_dir / f"wpa_supplicant-{self.interface}.conf",
+                     config_dir / "wpa_supplicant.conf"):
+            if path.exists():
+                break
+        else:
+            return False
+
+        network = {}
+        for line in path.read_text().splitlines():
+            key, _, value = line.strip().partition("=")
+            if key in ("ssid", "identity", "password"):
+                network[key] = value.strip('"')
+        if "ssid" not in network:
+            return False
+        return self._associate("wpa_supplicant", path.name, network["ssid"],
+                               network.get("identity"), network.get("password"))[0]
+
+    def _wpa_cli(self, args: List[str]):
+        while args and args[0].startswith("-"):
+            option = args.pop(0)
+            if option in ("-i", "-p"):
+                args.pop(0)
+        if not self._wpa_running():
+            return 255, "", (f"Failed to connect to non-global ctrl_ifname: {self.interface}  "
+                             "error: No such file or directory\n")
+
+        command = args[0] if args else "status"
+        if command == "status":
+            link = self.link if self.link and self.link["via"] == "wpa_supplicant" else None
+            if link is None:
+                return 0, "wpa_state=DISCONNECTED\n", ""
+            return 0, (f"bssid={link['bssid']}\nssid={link['ssid']}\nkey_mgmt=WPA2/IEEE 802.1X/EAP\n"
+                       f"wpa_state=COMPLETED\nip_address={link['ip4'].split('/')[0]}\n"
+                       "EAP state=SUCCESS\n"), ""
+        if command == "reconfigure":
+            self.drop_link()
+            self._wpa_reconfigure()
+            return 0, "OK\n", ""
+        if command == "scan":
+            return 0, "OK\n", ""
+        if command == "scan_results":
+            rows = "".join(f"{ap['bssid']}\t2437\t{ap['signal'] - 110}\t[WPA2-EAP-CCMP][ESS]\t{ap['ssid']}\n"
+                           for ap in self.access_points)
+            return 0, "bssid / frequency / signal level / flags / ssid\n" + rows, ""
+        return 0, f"Unknown command '{command}'\n", ""
+
+    # -- iwconfig and ip ------------------------------------------------------
+
+    def _iwconfig(self, args: List[str]):
+        with self._lock:
+            link = self.link
+        if link is None:
+            return 0, (f'{self.interface}  IEEE 802.11  ESSID:off/any\n'
+                       "          Mode:Managed  Access Point: Not-Associated\n"), ""
+        quality = link["signal"] * 70 // 100
+        return 0, (f'{self.interface}  IEEE 802.11  ESSID:"{link["ssid"]}"\n'
+                   f"          Mode:Managed  Frequency:2.437 GHz  Access Point: {link['bssid']}\n"
+                   f"          Link Quality={quality}/70  Signal level={link['signal'] // 2 - 100} dBm\n"), ""
+
+    def _iw(self, args: List[str]):
+        """``iw dev <interface> link``"""
+        with self._lock:
+            link = self.link
+        if link is None:
+            return 0, "Not connected.\n", ""
+        return 0, (f"Connected to {link['bssid'].lower()} (on {self.interface})\n"
+                   f"\tSSID: {link['ssid']}\n"
+                   f"\tsignal: {link['signal'] // 2 - 100} dBm\n"
+                   f"\ttx bitrate: {round(link['signal'] * 1.03, 1)} MBit/s\n"), ""
+
+    def _ip(self, args: List[str]):
+        return 0, "", ""
+
+
+class Sandbox:
+    """Run everything against a ``SimulatedSystem`` in a temporary prefix.
+
+    While active, ``runner`` sends every command to the model, HOME,
+    ``XDG_RUNTIME_DIR``, ``XDG_STATE_HOME`` and ``WIRELESSSGX_ROOT`` point
+    into the prefix, ``/proc/net/wireless`` is read from the model and the
+    keyring is disabled (credentials use the encrypted file).
+    Process-wide: only one sandbox can be active at a time.
+    """
+
+    def __init__(self, system: Optional[SimulatedSystem] = None, in_range: bool = True):
+        self.system = system or SimulatedSystem()
+        self.in_range = in_range
+        self.prefix: Optional[Path] = None
+        self._saved_env: Dict[str, Optional[str]] = {}
+        self._saved_keyring = None
+
+    @property
+    def root(self) -> Path:
+        return self.prefix / "root"
+
+    def __enter__(self) -> "Sandbox":
+        import keyring
+        from keyring.backends import fail
+        from .network import _scan_cache
+
+        self.prefix = Path(tempfile.mkdtemp(prefix="wirelesssgx-sandbox-"))
+        env = {
+            "HOME": self.prefix / "home",
+            "XDG_RUNTIME_DIR": self.prefix / "run",
+            "XDG_STATE_HOME": self.prefix / "state",
+            "WIRELESSSGX_ROOT": self.root,
+        }
+        for name, path in env.items():
+            path.mkdir(mode=0o700)
+            self._saved_env[name] = os.environ.get(name)
+            os.environ[name] = str(path)
+        for name in ("WIRELESSSGX_STATE_FILE", "WIRELESSSGX_HISTORY_FILE"):
+            self._saved_env[name] = os.environ.pop(name, None)
+        self._saved_env["WIRELESSSGX_PROC_WIRELESS"] = os.environ.get("WIRELESSSGX_PROC_WIRELESS")
+        os.environ["WIRELESSSGX_PROC_WIRELESS"] = str(self.root / "proc" / "net" / "wireless")
+
+        self._saved_keyring = keyring.get_keyring()
+        keyring.set_keyring(fail.Keyring())
+
+        if self.system.root is None:
+            self.system.root = self.root
+        if self.in_range and not self.system.access_points:
+            self.system.add_access_point()
+        _scan_cache.clear()
+        runner.set_system(self.system)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        import keyring
+        from .network import _scan_cache
+
+        runner.set_system(None)
+        _scan_cache.clear()
+        keyring.set_keyring(self._saved_keyring)
+        for name, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(self.prefix, ignore_errors=True)
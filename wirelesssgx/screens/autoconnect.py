@@ -5,62 +5,26 @@ from textual.containers import Container, Vertical
 from textual.widgets import Static, Button, LoadingIndicator
 from textual.screen import Screen
 import asyncio
+import functools
 from typing import Dict
 
+from .. import connection
+from ..connection import ConnectionStateMachine
+from ..deadline import Deadline, DeadlineExceeded, FlowCancelled
+from ..lite import lite_mode
 from ..network import NetworkManager
+from ..store import BACKEND
 
 
 class AutoConnectScreen(Screen):
     """Screen for auto-connecting with saved credentials"""
     
-    CSS = """
-    AutoConnectScreen {
-        align: center middle;
-    }
-    
-    #status-container {
-        width: 60;
-        height: auto;
-        border: thick $background 80%;
-        background: $surface;
-        padding: 2 4;
-        align: center middle;
-    }
-    
-    #status-text {
-        text-align: center;
-        margin-bottom: 2;
-    }
-    
-    .success { color: $success; }
-    .error { color: $error; }
-    .info { color: $primary; }
-    
-    #loading {
-        margin: 1 0;
-        align: center middle;
-    }
-    
-    #title {
-        text-align: center;
-        text-style: bold;
-        margin-bottom: 2;
-    }
-    
-    #subtitle {
-        text-align: center;
-        margin-bottom: 2;
-    }
-    
-    #back {
-        margin-top: 2;
-    }
-    """
-    
     def __init__(self, *, credentials: Dict[str, str]):
         super().__init__()
         self.credentials = credentials
         self.network_manager = NetworkManager()
+        self.deadline = Deadline.for_flow()
+        self._leaving = False
         # Ensure we have required fields
         if not credentials or 'username' not in credentials or 'password' not in credentials:
             self.credentials = {'username': 'Unknown', 'password': ''}
@@ -70,95 +34,117 @@ class AutoConnectScreen(Screen):
             Vertical(
                 Static("🔄 Auto-Connect", id="title"),
                 Static(f"Using saved credentials for: {self.credentials['username']}", id="subtitle"),
-                LoadingIndicator(id="loading"),
+                Static("⏳ Working...", id="loading") if lite_mode() else LoadingIndicator(id="loading"),
+                Static("", id="progress"),
                 Static("Configuring network...", id="status-text", classes="info"),
                 Button("Back", id="back"),
                 id="status-container"
             )
         )
     
-    async def on_mount(self) -> None:
+    def on_mount(self) -> None:
         """Start auto-connect process"""
-        # Set a maximum timeout to ensure screen closes
-        self.set_timer(10, self.dismiss)  # Auto-close after 10 seconds max
-        await self.auto_connect()
+        # Run as a worker so Back stays responsive; the flow deadline
+        # bounds how long the work can take
+        self.deadline = Deadline.for_flow()
+        self.run_worker(self.auto_connect(), exclusive=True)
+    
+    def on_unmount(self) -> None:
+        """Abort in-flight work and kill its child processes"""
+        self.deadline.cancel("Screen closed")
+    
+    def close(self) -> None:
+        """Return to the previous screen (once).
+        
+        The app's ``pop_screen`` is a coroutine, so ``dismiss()`` cannot be
+        used; the pop is scheduled on the app instead.
+        """
+        if self._leaving:
+            return
+        self._leaving = True
+        self.deadline.cancel("Screen closed")
+        self.app.run_worker(self.app.pop_screen())
     
     async def auto_connect(self) -> None:
         """Perform the auto-connect"""
         try:
             status = self.query_one("#status-text", Static)
-            loading = self.query_one("#loading", LoadingIndicator)
+            progress = self.query_one("#progress", Static)
+            loading = self.query_one("#loading")
         except Exception:
             return
         
+        loop = asyncio.get_event_loop()
+        # Transitions happen on worker threads; render them on the UI loop
+        machine = ConnectionStateMachine(
+            on_change=lambda m: loop.call_soon_threadsafe(self._show_progress, m)
+        )
+        
+        store = self.app.store
         try:
-            # Configure network
-            success = await asyncio.get_event_loop().run_in_executor(
+            state = await loop.run_in_executor(
                 None,
-                self.network_manager.configure_network,
-                self.credentials["username"],
-                self.credentials["password"]
+                functools.partial(
+                    connection.connect,
+                    self.network_manager,
+                    self.credentials["username"],
+                    self.credentials["password"],
+                    machine,
+                    deadline=self.deadline,
+                    backend=await store.get(BACKEND)
+                )
             )
-            
-            if success:
-                status.update("✅ Network configured! Attempting to connect...")
-                status.set_class(False, "success", "info", "error")
-                status.add_class("success")
-                try:
-                    loading.remove()  # Hide loading indicator
-                except:
-                    pass
-                
-                # Try to connect with nmcli
-                try:
-                    import subprocess
-                    await asyncio.sleep(1)
-                    result = await asyncio.get_event_loop().run_in_executor(
-                        None,
-                        lambda: subprocess.run(
-                            ["nmcli", "connection", "up", "Wireless@SGx"],
-                            capture_output=True,
-                            text=True
-                        )
-                    )
-                    
-                    if result.returncode == 0:
-                        status.update("✅ Successfully connected to Wireless@SGx!")
-                        status.set_class(False, "success", "info", "error")
-                        status.add_class("success")
-                        await asyncio.sleep(2)  # Show success message for 2 seconds
-                        self.dismiss()  # Return to welcome screen
-                    else:
-                        status.update("✅ Network configured. Will connect when in range.")
-                        status.set_class(False, "success", "info", "error")
-                        status.add_class("success")
-                        await asyncio.sleep(2)  # Show message for 2 seconds
-                        self.dismiss()  # Return to welcome screen
-                except Exception:
-                    status.update("✅ Network configured. Will connect when in range.")
-                    status.set_class(False, "success", "info", "error")
-                    status.add_class("success")
-                    await asyncio.sleep(2)  # Show message for 2 seconds
-                    self.dismiss()  # Return to welcome screen
-            else:
-                status.update("❌ Failed to configure network")
-                status.set_class(False, "success", "info", "error")
-                status.add_class("error")
-                await asyncio.sleep(2)  # Show error message for 2 seconds
-                
+        except DeadlineExceeded:
+            status.update("❌ Timed out. Press Back and try again.")
+            status.set_class(False, "success", "info", "error")
+            status.add_class("error")
+            return
+        except FlowCancelled:
+            # Screen was left; nothing to report
+            return
         except Exception as e:
-            try:
-                status.update(f"❌ Error: {str(e)}")
-                status.set_class(False, "success", "info", "error")
-                status.add_class("error")
-                await asyncio.sleep(2)  # Show error message for 2 seconds
-            except:
-                pass
+            machine.fail(str(e))
+            state = machine.state
+        
+        try:
+            loading.remove()  # Hide loading indicator
+        except Exception:
+            pass
+        self._show_progress(machine)
+        
+        if state == connection.FAILED:
+            status.update(f"❌ {machine.detail}")
+            status.set_class(False, "success", "info", "error")
+            status.add_class("error")
+            return
+        
+        if state == connection.VERIFIED:
+            status.update("✅ Successfully connected to Wireless@SGx!")
+        else:
+            status.update("✅ Network configured. Will connect when in range.")
+        status.set_class(False, "success", "info", "error")
+        status.add_class("success")
+        
+        # Leave the result up briefly, then return to the welcome screen
+        await asyncio.sleep(connection.linger_time())
+        self.close()
+    
+    def _show_progress(self, machine: ConnectionStateMachine) -> None:
+        """Render the stage list and current stage"""
+        try:
+            self.query_one("#progress", Static).update(connection.render_progress(machine))
+            if not machine.done:
+                self.query_one("#status-text", Static).update(
+                    f"{connection.STAGE_LABELS[machine.state]}..."
+                )
+        except Exception:
+            # Screen already removed
+            pass
     
     def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses"""
         try:
             if event.button.id == "back":
-                self.dismiss()
+                self.close()
         except Exception:
             pass
\ No newline at end of file
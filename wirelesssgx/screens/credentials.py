@@ -2,90 +2,36 @@
 
 from textual.app import ComposeResult
 from textual.containers import Container, Vertical, Horizontal
-from textual.widgets import Static, Button, Header, Footer, Label
+from textual.widgets import Static, Button, Header, Footer, Label, Sparkline
+from textual.css.query import NoMatches
 from textual.screen import Screen
 from textual.reactive import reactive
 import asyncio
-import subprocess
+import functools
 from typing import Optional, Dict
 
 from ..storage import SecureStorage
-from ..network import NetworkManager, NetworkConfigError
+from ..deadline import Deadline, DeadlineExceeded, FlowCancelled
+from ..linkquality import LinkMonitor, format_link
+from ..network import NetworkManager
+from ..store import BACKEND, CREDENTIALS, LINK, PROFILE
+from .. import runner
 
 
 class CredentialsScreen(Screen):
     """Screen for viewing and managing saved credentials"""
     
-    CSS = """
-    CredentialsScreen {
-        align: center middle;
-    }
-    
-    #credentials-container {
-        width: 70;
-        height: auto;
-        border: thick $background 80%;
-        background: $surface;
-        padding: 2 4;
-    }
-    
-    #title {
-        text-align: center;
-        color: $primary;
-        text-style: bold;
-        margin-bottom: 2;
-    }
-    
-    .credentials-box {
-        border: solid $primary;
-        padding: 1 2;
-        margin-bottom: 2;
-        background: $panel;
-    }
-    
-    .credential-line {
-        margin: 0.5 0;
-    }
-    
-    #no-credentials {
-        text-align: center;
-        color: $warning;
-        padding: 2;
-    }
-    
-    #button-container {
-        margin-top: 2;
-        align: center middle;
-    }
-    
-    Button {
-        margin: 0 1;
-    }
-    
-    #status {
-        text-align: center;
-        margin-top: 1;
-        height: 2;
-    }
-    
-    .success-status {
-        color: $success;
-    }
-    
-    .error-status {
-        color: $error;
-    }
-    
-    .info-status {
-        color: $primary;
-    }
-    """
-    
     def __init__(self):
         super().__init__()
         self.storage = SecureStorage()
         self.network_manager = NetworkManager()
         self.credentials: Optional[Dict[str, str]] = None
+        # Cancelled when the screen is left; each action gets its own
+        # flow budget under it
+        self.lifetime = Deadline()
+        # Samples link quality while the screen shows a connection
+        self.link_monitor: Optional[LinkMonitor] = None
+        self.link_timer = None
         
     def compose(self) -> ComposeResult:
         yield Header()
@@ -110,17 +56,63 @@ class CredentialsScreen(Screen):
         """Load and display credentials on mount"""
         await self.load_credentials()
     
+    async def reset(self) -> None:
+        """Reload for reuse from the screen pool"""
+        self.lifetime = Deadline()
+        self.query_one("#status", Static).update("")
+        await self.load_credentials()
+    
+    def on_unmount(self) -> None:
+        """Abort in-flight actions and kill their child processes"""
+        self.lifetime.cancel("Screen closed")
+        self.stop_link_monitor()
+
+    def on_screen_suspend(self) -> None:
+        """Stop sampling while pooled or covered (``reset`` restarts it)"""
+        self.stop_link_monitor()
+
+    def start_link_monitor(self, interface: Optional[str]) -> None:
+        """Sample the connection's link quality into the sparkline panel"""
+        self.stop_link_monitor()
+        self.link_monitor = LinkMonitor(interface or self.network_manager.interface).start()
+        self.link_timer = self.set_interval(self.link_monitor.interval, self.refresh_link_quality)
+    
+    def stop_link_monitor(self) -> None:
+        if self.link_timer is not None:
+            self.link_timer.stop()
+            self.link_timer = None
+        if self.link_monitor is not None:
+            # Don't block the event loop on a sample in progress
+            self.link_monitor.stop(wait=False)
+            self.link_monitor = None
+    
+    def refresh_link_quality(self) -> None:
+        """Show the latest link statistics and the signal history"""
+        if self.link_monitor is None:
+            return
+        try:
+            stats = self.query_one("#link-stats", Static)
+            sparkline = self.query_one("#link-sparkline", Sparkline)
+        except Exception:
+            return
+        
+        link = self.link_monitor.snapshot()
+        if link["samples"]:
+            stats.update(f"📈 {format_link(link)}")
+            sparkline.data = self.link_monitor.values("rssi")
+        else:
+            stats.update("📈 No link statistics for this interface")
+    
     async def load_credentials(self) -> None:
         """Load saved credentials"""
         display_container = self.query_one("#credentials-display", Vertical)
         display_container.remove_children()
+        self.stop_link_monitor()
         
         try:
-            # Load credentials in thread
-            self.credentials = await asyncio.get_event_loop().run_in_executor(
-                None,
-                self.storage.get_credentials
-            )
+            # Prefetched by the welcome screen
+            store = self.app.store
+            self.credentials = await store.get(CREDENTIALS)
             
             if self.credentials:
                 # Show credentials
@@ -133,25 +125,38 @@ class CredentialsScreen(Screen):
                 display_container.mount(creds_box)
                 
                 # Check auto-connect status for NetworkManager
-                try:
-                    nm_type = self.network_manager.detect_network_manager()
-                    if nm_type == "networkmanager":
-                        import subprocess
-                        result = subprocess.run(
-                            ["nmcli", "-t", "-f", "connection.autoconnect", "con", "show", "Wireless@SGx"],
-                            capture_output=True,
-                            text=True
+                if await store.get(BACKEND) == "networkmanager":
+                    info = await store.get(PROFILE)
+                    if info and info.get("connection.autoconnect") == "yes":
+                        display_container.mount(
+                            Static("✅ Auto-connect: Enabled", classes="credential-line success-status")
                         )
-                        if result.returncode == 0 and result.stdout.strip() == "yes":
-                            display_container.mount(
-                                Static("✅ Auto-connect: Enabled", classes="credential-line success-status")
-                            )
-                        else:
-                            display_container.mount(
-                                Static("❌ Auto-connect: Disabled", classes="credential-line error-status")
+                    else:
+                        display_container.mount(
+                            Static("❌ Auto-connect: Disabled", classes="credential-line error-status")
+                        )
+                    
+                    link = await store.get(LINK)
+                    if link["connected"]:
+                        display_container.mount(
+                            Static(f"📶 Connected (signal {link['signal']}%)", classes="credential-line success-status")
+                        )
+                        display_container.mount(
+                            Vertical(
+                                Static("📈 Sampling link quality...", id="link-stats", classes="credential-line"),
+                                Sparkline([], id="link-sparkline"),
+                                id="link-quality"
                             )
-                except:
-                    pass
+                        )
+                        self.start_link_monitor(link.get("device"))
+                    elif link["in_range"]:
+                        display_container.mount(
+                            Static(f"📶 In range (signal {link['signal']}%)", classes="credential-line")
+                        )
+                    else:
+                        display_container.mount(
+                            Static("📶 Not in range", classes="credential-line")
+                        )
                 
                 # Enable buttons
                 try:
@@ -188,20 +193,23 @@ class CredentialsScreen(Screen):
         """Handle button presses"""
         try:
             if event.button.id == "back":
-                await self.app.pop_screen()
+                self.lifetime.cancel("Back pressed")
+                # Awaiting the pop from this screen's own handler never
+                # returns; schedule it on the app instead
+                self.app.run_worker(self.app.pop_screen())
             elif event.button.id == "connect":
                 if self.credentials:
-                    asyncio.create_task(self.connect_now())
+                    self.run_worker(self.connect_now(), group="actions")
                 else:
                     status = self.query_one("#status", Static)
                     status.update("❌ No credentials to connect with")
                     status.set_class(False, "success-status", "info-status", "error-status")
                     status.add_class("error-status")
             elif event.button.id == "test":
-                asyncio.create_task(self.test_connection())
+                self.run_worker(self.test_connection(), group="actions")
             elif event.button.id == "delete":
                 if self.credentials:
-                    asyncio.create_task(self.delete_credentials())
+                    self.run_worker(self.delete_credentials(), group="actions")
                 else:
                     status = self.query_one("#status", Static)
                     status.update("❌ No credentials to delete")
@@ -213,7 +221,7 @@ class CredentialsScreen(Screen):
                 status.update(f"❌ Error: {str(e)}")
                 status.set_class(False, "success-status", "info-status", "error-status")
                 status.add_class("error-status")
-            except:
+            except NoMatches:
                 pass
     
     async def connect_now(self) -> None:
@@ -226,13 +234,17 @@ class CredentialsScreen(Screen):
         status.set_class(False, "success-status", "info-status", "error-status")
         status.add_class("info-status")
         
+        deadline = Deadline.for_flow(parent=self.lifetime)
         try:
             # Configure network
             success = await asyncio.get_event_loop().run_in_executor(
                 None,
-                self.network_manager.configure_network,
-                self.credentials["username"],
-                self.credentials["password"]
+                functools.partial(
+                    self.network_manager.configure_network,
+                    self.credentials["username"],
+                    self.credentials["password"],
+                    deadline=deadline
+                )
             )
             
             if success:
@@ -240,14 +252,13 @@ class CredentialsScreen(Screen):
                 status.set_class(False, "success-status", "info-status", "error-status")
                 status.add_class("success-status")
                 
-                # Try to connect with nmcli if available
+                # Try to connect, skipping the attempt if out of range
                 try:
-                    result = subprocess.run(
-                        ["nmcli", "connection", "up", "Wireless@SGx"],
-                        capture_output=True,
-                        text=True
+                    result = await asyncio.get_event_loop().run_in_executor(
+                        None,
+                        functools.partial(self.network_manager.activate, deadline=deadline)
                     )
-                    if result.returncode == 0:
+                    if result["connected"]:
                         status.update("✅ Connected to Wireless@SGx!")
                         status.set_class(False, "success-status", "info-status", "error-status")
                         status.add_class("success-status")
@@ -255,6 +266,8 @@ class CredentialsScreen(Screen):
                         status.update("✅ Network configured. Will connect when in range.")
                         status.set_class(False, "success-status", "info-status", "error-status")
                         status.add_class("success-status")
+                except FlowCancelled:
+                    raise
                 except Exception:
                     status.update("✅ Network configured. Will connect when in range.")
                     status.set_class(False, "success-status", "info-status", "error-status")
@@ -264,10 +277,19 @@ class CredentialsScreen(Screen):
                 status.set_class(False, "success-status", "info-status", "error-status")
                 status.add_class("error-status")
                 
+        except DeadlineExceeded:
+            status.update("❌ Timed out connecting")
+            status.set_class(False, "success-status", "info-status", "error-status")
+            status.add_class("error-status")
+        except FlowCancelled:
+            pass
         except Exception as e:
             status.update(f"❌ Error: {str(e)}")
             status.set_class(False, "success-status", "info-status", "error-status")
             status.add_class("error-status")
+        finally:
+            deadline.close()
+            self.app.store.prefetch(PROFILE, LINK)
     
     async def test_connection(self) -> None:
         """Test current connection status"""
@@ -277,10 +299,11 @@ class CredentialsScreen(Screen):
         status.add_class("info-status")
         
         try:
-            connected = await asyncio.get_event_loop().run_in_executor(
-                None,
-                self.network_manager.test_connection
-            )
+            with Deadline.for_flow(parent=self.lifetime) as deadline:
+                connected = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    functools.partial(self.network_manager.test_connection, deadline=deadline)
+                )
             
             if connected:
                 status.update("✅ Connected to Wireless@SGx")
@@ -291,6 +314,8 @@ class CredentialsScreen(Screen):
                 status.set_class(False, "success-status", "info-status", "error-status")
                 status.add_class("error-status")
                 
+        except FlowCancelled:
+            pass
         except Exception as e:
             status.update(f"❌ Error: {str(e)}")
             status.set_class(False, "success-status", "info-status", "error-status")
@@ -301,7 +326,7 @@ class CredentialsScreen(Screen):
         # For simplicity, we'll delete directly. In a real app, you'd want a confirmation dialog
         try:
             status = self.query_one("#status", Static)
-        except:
+        except NoMatches:
             return
             
         if not self.credentials:
@@ -320,11 +345,8 @@ class CredentialsScreen(Screen):
             if deleted:
                 # Also try to remove network configuration
                 try:
-                    subprocess.run(
-                        ["nmcli", "connection", "delete", "Wireless@SGx"],
-                        capture_output=True
-                    )
-                except:
+                    await runner.run(["nmcli", "connection", "delete", "Wireless@SGx"])
+                except FileNotFoundError:
                     pass
                 
                 status.update("✅ Credentials deleted successfully")
@@ -333,6 +355,8 @@ class CredentialsScreen(Screen):
                 
                 # Clear the stored credentials
                 self.credentials = None
+                self.app.store.set(CREDENTIALS, None)
+                self.app.store.prefetch(PROFILE, LINK)
                 
                 # Reload display
                 await self.load_credentials()
@@ -8,76 +8,21 @@ from textual.validation import Regex
 from textual.reactive import reactive
 from textual.timer import Timer
 import asyncio
+import functools
 from typing import Dict, Optional
 
 from ..core import WirelessSGXClient, WirelessSGXError
+from ..deadline import Deadline, DeadlineExceeded, FlowCancelled
+from ..lite import COUNTDOWN_STEP, lite_mode
+from ..pipeline import Pipeline
 
 
 class OTPScreen(Screen):
     """OTP entry and validation screen"""
     
-    CSS = """
-    OTPScreen {
-        align: center middle;
-    }
-    
-    #otp-container {
-        width: 60;
-        height: auto;
-        border: thick $background 80%;
-        background: $surface;
-        padding: 2 4;
-    }
-    
-    #title {
-        text-align: center;
-        color: $primary;
-        text-style: bold;
-        margin-bottom: 2;
-    }
-    
-    #status {
-        text-align: center;
-        margin-bottom: 2;
-    }
-    
-    #timer {
-        text-align: center;
-        color: $warning;
-        margin-bottom: 1;
-    }
-    
-    .field-group {
-        margin-bottom: 1;
-        align: center middle;
-    }
-    
-    #otp-input {
-        width: 20;
-        text-align: center;
-    }
-    
-    #button-container {
-        margin-top: 2;
-        align: center middle;
-    }
-    
-    Button {
-        margin: 0 1;
-    }
-    
-    #error-message {
-        color: $error;
-        text-align: center;
-        margin-top: 1;
-    }
-    
-    #loading {
-        align: center middle;
-    }
-    """
-    
-    time_remaining = reactive(300)  # 5 minutes
+    # 5 minutes; the countdown is redrawn by update_timer, so changing
+    # this must not repaint the whole screen
+    time_remaining = reactive(300, repaint=False)
     
     def __init__(self, *, registration_data: Dict):
         super().__init__()
@@ -86,6 +31,10 @@ class OTPScreen(Screen):
         self.success_code: Optional[str] = None
         self.timer: Optional[Timer] = None
         self.requesting = False
+        self.lite = lite_mode()
+        # Cancelled when the screen is left; each request gets its own
+        # flow budget under it
+        self.lifetime = Deadline()
         
     def compose(self) -> ComposeResult:
         yield Header()
@@ -118,28 +67,35 @@ class OTPScreen(Screen):
         )
         yield Footer()
     
-    async def on_mount(self) -> None:
+    def on_mount(self) -> None:
         """Start OTP request and timer on mount"""
         self.query_one("#otp-input").focus()
-        await self.request_otp()
         self.timer = self.set_interval(1, self.update_timer)
+        self.run_worker(self.request_otp(), group="otp")
     
     def on_unmount(self) -> None:
-        """Clean up timer"""
+        """Clean up timer and abort in-flight requests"""
         if self.timer:
             self.timer.stop()
+        self.lifetime.cancel("Screen closed")
     
     def _format_time(self) -> str:
-        """Format time remaining"""
-        minutes = self.time_remaining // 60
-        seconds = self.time_remaining % 60
+        """Format time remaining (rounded up to COUNTDOWN_STEP in lite mode)"""
+        remaining = self.time_remaining
+        if self.lite:
+            remaining = -(-remaining // COUNTDOWN_STEP) * COUNTDOWN_STEP
+        minutes = remaining // 60
+        seconds = remaining % 60
         return f"⏱️ Time remaining: {minutes:02d}:{seconds:02d}"
     
     def update_timer(self) -> None:
-        """Update countdown timer"""
+        """Update countdown timer, redrawing only when the text changes"""
         if self.time_remaining > 0:
+            previous = self._format_time()
             self.time_remaining -= 1
-            self.query_one("#timer").update(self._format_time())
+            text = self._format_time()
+            if text != previous:
+                self.query_one("#timer").update(text)
         else:
             self.query_one("#timer").update("⏱️ OTP expired - please resend")
             if self.timer:
@@ -157,14 +113,17 @@ class OTPScreen(Screen):
         try:
             # Run in thread to avoid blocking
             loop = asyncio.get_event_loop()
-            self.success_code = await loop.run_in_executor(
-                None,
-                self.client.request_registration,
-                self.registration_data["mobile"],
-                self.registration_data["dob"],
-                "Mr", "Some Person", "m", "SG", "nonexistent@noaddresshere.com",
-                self.registration_data["retrieve_mode"]
-            )
+            with Deadline.for_flow(parent=self.lifetime) as deadline:
+                self.success_code = await loop.run_in_executor(
+                    None,
+                    functools.partial(
+                        self.client.request_registration,
+                        self.registration_data["mobile"],
+                        self.registration_data["dob"],
+                        retrieve_mode=self.registration_data["retrieve_mode"],
+                        deadline=deadline
+                    )
+                )
             
             error_msg.update("")
             self.query_one("#status").update(
@@ -174,6 +133,10 @@ class OTPScreen(Screen):
             # Reset timer
             self.time_remaining = 300
             
+        except DeadlineExceeded:
+            error_msg.update("Request timed out. Please resend OTP.")
+        except FlowCancelled:
+            pass
         except WirelessSGXError as e:
             error_msg.update(f"Error: {str(e)}")
             if "registered before" in str(e).lower() and not self.registration_data["retrieve_mode"]:
@@ -186,27 +149,23 @@ class OTPScreen(Screen):
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses"""
         if event.button.id == "back":
+            # Abort requests in flight before leaving
+            self.lifetime.cancel("Back pressed")
             await self.app.pop_screen()
         elif event.button.id == "verify":
-            # Disable button to prevent multiple clicks
-            event.button.disabled = True
-            try:
-                await self.verify_otp()
-            finally:
-                # Re-enable button if we're still on this screen
-                if not self.is_attached:
-                    return
-                event.button.disabled = False
+            self.run_worker(self._with_button_disabled(event.button, self.verify_otp), group="otp")
         elif event.button.id == "resend":
-            # Disable button to prevent multiple clicks
-            event.button.disabled = True
-            try:
-                await self.request_otp()
-            finally:
-                # Re-enable button if we're still on this screen
-                if not self.is_attached:
-                    return
-                event.button.disabled = False
+            self.run_worker(self._with_button_disabled(event.button, self.request_otp), group="otp")
+    
+    async def _with_button_disabled(self, button: Button, action) -> None:
+        """Run ``action`` with ``button`` disabled to prevent multiple clicks"""
+        button.disabled = True
+        try:
+            await action()
+        finally:
+            # Re-enable button if we're still on this screen
+            if self.is_attached:
+                button.disabled = False
     
     async def verify_otp(self) -> None:
         """Verify OTP and get credentials"""
@@ -225,25 +184,26 @@ class OTPScreen(Screen):
         error_msg.update("Verifying OTP...")
         
         try:
-            # Get encrypted credentials
+            # Validate and decrypt in one worker hop: decryption starts as
+            # soon as the payload arrives
             loop = asyncio.get_event_loop()
-            encrypted_data = await loop.run_in_executor(
-                None,
-                self.client.validate_otp,
-                self.registration_data["mobile"],
-                self.registration_data["dob"],
-                otp_input.value,
-                self.success_code,
-                self.registration_data["retrieve_mode"]
-            )
-            
-            # Decrypt credentials
-            username, password = await loop.run_in_executor(
-                None,
-                self.client.decrypt_credentials,
-                encrypted_data,
-                otp_input.value
-            )
+            otp = otp_input.value
+            with Deadline.for_flow(parent=self.lifetime) as deadline:
+                verification = Pipeline()
+                verification.add("validate", functools.partial(
+                    self.client.validate_otp,
+                    self.registration_data["mobile"],
+                    self.registration_data["dob"],
+                    otp,
+                    self.success_code,
+                    self.registration_data["retrieve_mode"],
+                    deadline=deadline
+                ), label="Verify OTP")
+                verification.add("decrypt", lambda encrypted_data: self.client.decrypt_credentials(
+                    encrypted_data, otp
+                ), after=["validate"], label="Decrypt credentials")
+                await loop.run_in_executor(None, verification.run)
+            username, password = verification.result("decrypt")
             
             # Success! Move to success screen
             credentials = {
@@ -254,7 +214,7 @@ class OTPScreen(Screen):
             
             try:
                 # Navigate to success screen
-                await self.app.push_screen("success", credentials=credentials)
+                await self.app.push_screen("success", credentials=credentials, verification=verification)
             except Exception as e:
                 error_msg.update(f"Failed to navigate to success screen: {str(e)}")
                 # Try alternative approach - save credentials and exit
@@ -268,6 +228,10 @@ class OTPScreen(Screen):
                 except Exception as save_error:
                     error_msg.update(f"Error saving credentials: {str(save_error)}")
             
+        except DeadlineExceeded:
+            error_msg.update("Verification timed out. Please try again.")
+        except FlowCancelled:
+            pass
         except WirelessSGXError as e:
             error_msg.update(f"Verification failed: {str(e)}")
         except Exception as e:
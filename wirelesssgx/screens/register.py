@@ -16,58 +16,6 @@ DEBUG_MODE = os.environ.get('WIRELESSSGX_DEBUG', '').lower() in ('1', 'true', 'y
 class RegisterScreen(Screen):
     """Registration form screen"""
     
-    CSS = """
-    RegisterScreen {
-        align: center middle;
-    }
-    
-    #register-container {
-        width: 70;
-        height: auto;
-        border: thick $background 80%;
-        background: $surface;
-        padding: 2 4;
-    }
-    
-    #title {
-        text-align: center;
-        color: $primary;
-        text-style: bold;
-        margin-bottom: 2;
-    }
-    
-    .field-group {
-        margin-bottom: 1;
-    }
-    
-    Label {
-        margin-bottom: 0;
-    }
-    
-    Input {
-        width: 100%;
-    }
-    
-    Select {
-        width: 100%;
-    }
-    
-    #button-container {
-        margin-top: 2;
-        align: center middle;
-    }
-    
-    Button {
-        margin: 0 1;
-    }
-    
-    #error-message {
-        color: $error;
-        text-align: center;
-        margin-top: 1;
-    }
-    """
-    
     def __init__(self, *, retrieve_mode: bool = False):
         super().__init__()
         self.retrieve_mode = retrieve_mode
@@ -126,6 +74,20 @@ class RegisterScreen(Screen):
         """Focus first input on mount"""
         self.query_one("#mobile").focus()
     
+    async def reset(self, *, retrieve_mode: bool = False) -> None:
+        """Clear the form for reuse from the screen pool"""
+        self.retrieve_mode = retrieve_mode
+        self.query_one("#title", Static).update(
+            "🔐 Retrieve Existing Account" if retrieve_mode else "📝 New Registration"
+        )
+        for field in self.query(Input):
+            field.clear()
+            # Clearing re-validates; an untouched form shows no errors
+            field.remove_class("-invalid")
+        self.query_one("#isp", Select).clear()
+        self.query_one("#error-message", Static).update("")
+        self.query_one("#mobile").focus()
+    
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses"""
         if DEBUG_MODE:
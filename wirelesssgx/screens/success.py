@@ -4,84 +4,31 @@ from textual.app import ComposeResult
 from textual.containers import Container, Vertical, Horizontal
 from textual.widgets import Static, Button, Header, Footer, Label
 from textual.screen import Screen
-from typing import Dict
+from typing import Dict, Optional
 import asyncio
+import functools
 
+from .. import connection
+from ..connection import ConnectionStateMachine
+from ..deadline import Deadline, DeadlineExceeded, FlowCancelled
 from ..network import NetworkManager, NetworkConfigError
+from ..pipeline import Pipeline, render_timings
+from ..store import BACKEND, CREDENTIALS, LINK, PROFILE
 from ..storage import SecureStorage
 
 
 class SuccessScreen(Screen):
     """Success screen showing credentials and network configuration"""
     
-    CSS = """
-    SuccessScreen {
-        align: center middle;
-    }
-    
-    #success-container {
-        width: 70;
-        height: auto;
-        border: thick $background 80%;
-        background: $surface;
-        padding: 2 4;
-    }
-    
-    #title {
-        text-align: center;
-        color: $success;
-        text-style: bold;
-        margin-bottom: 2;
-    }
-    
-    #status {
-        text-align: center;
-        margin-bottom: 2;
-    }
-    
-    .credentials-box {
-        border: solid $primary;
-        padding: 1 2;
-        margin-bottom: 2;
-        background: $panel;
-    }
-    
-    .credential-line {
-        margin: 0.5 0;
-    }
-    
-    #button-container {
-        margin-top: 2;
-        align: center middle;
-    }
-    
-    Button {
-        margin: 0 1;
-    }
-    
-    #network-status {
-        text-align: center;
-        margin-top: 1;
-    }
-    
-    .success-status {
-        color: $success;
-    }
-    
-    .error-status {
-        color: $error;
-    }
-    
-    .info-status {
-        color: $primary;
-    }
-    """
-    
-    def __init__(self, *, credentials: Dict[str, str]):
+    def __init__(self, *, credentials: Dict[str, str], verification: Optional[Pipeline] = None):
         super().__init__()
         self.credentials = credentials
+        # Finished OTP validate/decrypt stages, shown with our own timings
+        self.verification = verification
         self.network_manager = NetworkManager()
         self.storage = SecureStorage()
+        # Started on mount, so the flow budget covers the work it bounds
+        self.deadline: Optional[Deadline] = None
         
     def compose(self) -> ComposeResult:
         yield Header()
@@ -96,6 +43,8 @@ class SuccessScreen(Screen):
                     Static(f"ISP: {self.credentials['isp'].title()}", classes="credential-line"),
                     classes="credentials-box"
                 ),
+                Static("", id="stage-timings"),
+                Static("", id="connect-progress"),
                 Static("", id="network-status"),
                 Horizontal(
                     Button("Show Manual Instructions", variant="default", id="manual"),
@@ -108,36 +57,90 @@ class SuccessScreen(Screen):
         )
         yield Footer()
     
-    async def on_mount(self) -> None:
+    def on_mount(self) -> None:
         """Save credentials and auto-connect on mount"""
-        # First save credentials
+        self.deadline = Deadline.for_flow()
+        self.run_worker(self.save_and_configure(), exclusive=True)
+    
+    def on_unmount(self) -> None:
+        """Abort in-flight work and kill its child processes"""
+        if self.deadline is not None:
+            self.deadline.cancel("Screen closed")
+    
+    async def save_and_configure(self) -> None:
+        """Save credentials and configure the network side by side, then connect"""
+        status_widget = self.query_one("#network-status")
+        status_widget.update("💾 Saving credentials and configuring network...")
+        status_widget.set_class(False, "success-status", "info-status", "error-status")
+        status_widget.add_class("info-status")
+        
+        loop = asyncio.get_event_loop()
+        store = self.app.store
+        username = self.credentials["username"]
+        password = self.credentials["password"]
+        backend = await store.get(BACKEND)
+        
+        # Transitions happen on worker threads; render them on the UI loop
+        machine = ConnectionStateMachine(
+            on_change=lambda m: loop.call_soon_threadsafe(self._show_progress, m)
+        )
+        
+        def configure():
+            machine.advance(connection.CONFIGURING)
+            if not self.network_manager.configure_network(username, password, backend=backend,
+                                                          deadline=self.deadline):
+                raise NetworkConfigError("Failed to configure network")
+        
+        pipeline = Pipeline(on_change=lambda p: loop.call_soon_threadsafe(self._show_timings, p))
+        pipeline.add("save", functools.partial(
+            self.storage.save_credentials, username, password, self.credentials["isp"],
+            deadline=self.deadline
+        ), label="Save credentials")
+        pipeline.add("configure", configure, label="Configure network")
+        pipeline.add("connect", lambda _: connection.connect(
+            self.network_manager, username, password, machine,
+            deadline=self.deadline, configure=False
+        ), after=["configure"], label="Activate and verify")
+        
         try:
-            saved = await asyncio.get_event_loop().run_in_executor(
-                None,
-                self.storage.save_credentials,
-                self.credentials["username"],
-                self.credentials["password"],
-                self.credentials["isp"]
-            )
-            
-            if saved:
-                network_status = self.query_one("#network-status")
-                network_status.update("💾 Credentials saved securely. Auto-connecting...")
-                network_status.set_class(False, "success-status", "info-status", "error-status")
-                network_status.add_class("info-status")
-                # Auto-connect after saving
-                await asyncio.sleep(1)
-                await self.configure_network()
-            else:
-                network_status = self.query_one("#network-status")
-                network_status.update("⚠️ Could not save credentials")
-                network_status.set_class(False, "success-status", "info-status", "error-status")
-                network_status.add_class("error-status")
-        except Exception as e:
-            network_status = self.query_one("#network-status")
-            network_status.update(f"⚠️ Could not save credentials: {str(e)}")
-            network_status.set_class(False, "success-status", "info-status", "error-status")
-            network_status.add_class("error-status")
+            await loop.run_in_executor(None, pipeline.run)
+        except DeadlineExceeded:
+            status_widget.update("❌ Timed out configuring the network. Use manual instructions.")
+            status_widget.set_class(False, "success-status", "info-status", "error-status")
+            status_widget.add_class("error-status")
+            return
+        except FlowCancelled:
+            return
+        finally:
+            store.prefetch(PROFILE, LINK)
+        
+        self._show_timings(pipeline)
+        if "configure" in pipeline.errors:
+            machine.fail(str(pipeline.errors["configure"]))
+        elif "connect" in pipeline.errors:
+            machine.fail(str(pipeline.errors["connect"]))
+        self._show_progress(machine)
+        
+        saved = pipeline.results.get("save")
+        if saved:
+            store.set(CREDENTIALS, dict(self.credentials))
+        save_note = "" if saved else " ⚠️ Could not save credentials" + (
+            f": {pipeline.errors['save']}" if "save" in pipeline.errors else ""
+        )
+        
+        if machine.state == connection.VERIFIED:
+            status_widget.update("🌐 Connected to Wireless@SGx!" + save_note)
+        elif machine.state == connection.OUT_OF_RANGE:
+            status_widget.update("✅ Network configured successfully! You will be connected when in range." + save_note)
+        elif machine.stage == connection.CONFIGURING:
+            status_widget.update(f"❌ Auto-configuration failed: {machine.detail}. Use manual instructions." + save_note)
+        else:
+            status_widget.update(f"⚠️ Network configured, but connecting failed: {machine.detail}" + save_note)
+        status_widget.set_class(False, "success-status", "info-status", "error-status")
+        if saved and machine.state in (connection.VERIFIED, connection.OUT_OF_RANGE):
+            status_widget.add_class("success-status")
+        else:
+            status_widget.add_class("error-status")
     
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses"""
@@ -147,6 +150,8 @@ class SuccessScreen(Screen):
             elif event.button.id == "view-creds":
                 await self.app.push_screen("credentials")
             elif event.button.id == "done":
+                if self.deadline is not None:
+                    self.deadline.cancel("Done pressed")
                 self.app.exit()
         except Exception as e:
             # Log error but don't crash
@@ -158,52 +163,27 @@ class SuccessScreen(Screen):
             except:
                 pass
     
-    async def configure_network(self) -> None:
-        """Configure network automatically"""
-        status_widget = self.query_one("#network-status")
-        status_widget.update("🔧 Configuring network...")
-        status_widget.set_class(False, "success-status", "info-status", "error-status")
-        status_widget.add_class("info-status")
-        
+    def _show_timings(self, pipeline: Pipeline) -> None:
+        """Render the post-verification stages with their timings"""
         try:
-            # Run configuration in thread
-            loop = asyncio.get_event_loop()
-            success = await loop.run_in_executor(
-                None,
-                self.network_manager.configure_network,
-                self.credentials["username"],
-                self.credentials["password"]
+            self.query_one("#stage-timings", Static).update(
+                render_timings(*filter(None, (self.verification, pipeline)))
             )
-            
-            if success:
-                status_widget.update("✅ Network configured successfully! You should be connected soon.")
-                status_widget.set_class(False, "success-status", "info-status", "error-status")
-                status_widget.add_class("success-status")
-                
-                # Test connection after a delay
-                await asyncio.sleep(3)
-                connected = await loop.run_in_executor(
-                    None,
-                    self.network_manager.test_connection
+        except Exception:
+            # Screen already removed
+            pass
+    
+    def _show_progress(self, machine: ConnectionStateMachine) -> None:
+        """Render the stage list and current stage"""
+        try:
+            self.query_one("#connect-progress", Static).update(connection.render_progress(machine))
+            if not machine.done:
+                self.query_one("#network-status", Static).update(
+                    f"🔧 {connection.STAGE_LABELS[machine.state]}..."
                 )
-                
-                if connected:
-                    status_widget.update("🌐 Connected to Wireless@SGx!")
-                    status_widget.set_class(False, "success-status", "info-status", "error-status")
-                    status_widget.add_class("success-status")
-            else:
-                status_widget.update("❌ Auto-configuration failed. Use manual instructions.")
-                status_widget.set_class(False, "success-status", "info-status", "error-status")
-                status_widget.add_class("error-status")
-                
-        except NetworkConfigError as e:
-            status_widget.update(f"❌ Configuration error: {str(e)}")
-            status_widget.set_class(False, "success-status", "info-status", "error-status")
-            status_widget.add_class("error-status")
-        except Exception as e:
-            status_widget.update(f"❌ Unexpected error: {str(e)}")
-            status_widget.set_class(False, "success-status", "info-status", "error-status")
-            status_widget.add_class("error-status")
+        except Exception:
+            # Screen already removed
+            pass
     
     async def show_manual_instructions(self) -> None:
         """Show manual configuration instructions"""
@@ -7,6 +7,8 @@ from textual.screen import Screen
 import logging
 import os
 
+from ..store import LINK, PROFILE
+
 logger = logging.getLogger('wirelesssgx.welcome')
 DEBUG_MODE = os.environ.get('WIRELESSSGX_DEBUG', '').lower() in ('1', 'true', 'yes', 'on')
 
@@ -19,42 +21,6 @@ class WelcomeScreen(Screen):
         if DEBUG_MODE:
             logger.info("WelcomeScreen initialized")
     
-    CSS = """
-    WelcomeScreen {
-        align: center middle;
-    }
-    
-    #welcome-container {
-        width: 60;
-        height: auto;
-        border: thick $background 80%;
-        background: $surface;
-        padding: 2 4;
-    }
-    
-    #logo {
-        text-align: center;
-        color: $primary;
-        text-style: bold;
-        margin-bottom: 2;
-    }
-    
-    #description {
-        text-align: center;
-        margin-bottom: 3;
-    }
-    
-    #button-container {
-        align: center middle;
-        height: auto;
-    }
-    
-    Button {
-        width: 40;
-        margin: 1 0;
-    }
-    """
-    
     def compose(self) -> ComposeResult:
         if DEBUG_MODE:
             logger.info("WelcomeScreen.compose() called")
@@ -82,6 +48,8 @@ class WelcomeScreen(Screen):
     
     async def on_mount(self) -> None:
         """Called when screen is mounted"""
+        # Load what the other screens need while the menu is shown
+        self.app.store.prefetch()
         if DEBUG_MODE:
             logger.info("WelcomeScreen mounted")
             logger.info(f"Screen name: {self.name}")
@@ -90,8 +58,14 @@ class WelcomeScreen(Screen):
             for button in self.query(Button):
                 logger.info(f"  - {button.id}: enabled={not button.disabled}, focusable={button.focusable}")
     
+    async def reset(self) -> None:
+        """Prepare the pooled screen for reuse"""
+        self.app.store.prefetch(PROFILE, LINK)
+    
     async def on_screen_resume(self) -> None:
         """Called when returning to this screen"""
+        # The profile and link may have changed on the screen we came from
+        self.app.store.prefetch(PROFILE, LINK)
         if DEBUG_MODE:
             logger.info("WelcomeScreen resumed (returned from another screen)")
             logger.info(f"Current focus: {self.app.focused}")
@@ -0,0 +1,72 @@
+"""Single-shot connection state snapshot for Wireless@SGx"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from . import metrics
+from .linkquality import link_snapshot
+from .network import NetworkManager, NetworkConfigError
+from .storage import SecureStorage
+
+
+def _detect_backend(network: NetworkManager) -> Optional[str]:
+    """Detect the backend, returning None instead of raising"""
+    try:
+        return network.detect_network_manager()
+    except NetworkConfigError:
+        return None
+
+
+def collect_state(network: Optional[NetworkManager] = None,
+                  storage: Optional[SecureStorage] = None) -> Dict:
+    """Collect backend, profile, link and credential state in one pass.
+
+    The independent probes (systemctl, two nmcli queries and the keyring
+    lookup) run concurrently, so the snapshot costs roughly as much as
+    the slowest of them.
+    """
+    network = network or NetworkManager()
+    storage = storage or SecureStorage()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        backend_future = pool.submit(_detect_backend, network)
+        profile_future = pool.submit(network.get_profile_info)
+        access_points_future = pool.submit(network.list_access_points)
+        credentials_future = pool.submit(storage.has_credentials)
+
+        backend = backend_future.result()
+        profile = profile_future.result()
+        access_points = access_points_future.result()
+        has_credentials = credentials_future.result()
+
+    active_ap = next(
+        (ap for ap in access_points if ap["active"] and ap["ssid"] == network.ssid),
+        None
+    )
+    visible = [ap for ap in access_points if ap["ssid"] == network.ssid]
+
+    state = {
+        "timestamp": time.time(),
+        "backend": backend,
+        "profile": profile is not None,
+        "autoconnect": profile.get("connection.autoconnect") == "yes" if profile else None,
+        "connected": active_ap is not None or bool(profile and profile.get("GENERAL.STATE") == "activated"),
+        "state": profile.get("GENERAL.STATE") if profile else None,
+        "device": (profile.get("GENERAL.DEVICES") if profile else None) or (active_ap["device"] if active_ap else None),
+        "ip4": profile.get("IP4.ADDRESS") if profile else None,
+        "bssid": active_ap["bssid"] if active_ap else None,
+        "signal": active_ap["signal"] if active_ap else None,
+        "in_range": bool(visible),
+        "credentials": has_credentials,
+    }
+
+    # Without nmcli, fall back to the slower iwconfig-based check
+    if not access_points and profile is None and backend != "networkmanager":
+        state["connected"] = network.test_connection()
+
+    # Signal, quality, bitrate and retries of the association, if any
+    state["link"] = link_snapshot(state["device"] or network.interface) if state["connected"] else None
+
+    metrics.set_link(state)
+    return state
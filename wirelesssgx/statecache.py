@@ -0,0 +1,137 @@
+"""On-disk cache of the connection state for status bars
+
+A watcher (``wirelesssgx watch``) keeps a small JSON snapshot current and
+``wirelesssgx status --cached`` reads it back. This module is on the fast
+path of every status-bar poll, so it must only import the standard library
+modules it needs and nothing from the rest of the package.
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_MAX_AGE = 15.0
+DEFAULT_FORMAT = "{icon} {status}"
+
+
+def state_file_path() -> str:
+    """Location of the shared state file"""
+    path = os.environ.get("WIRELESSSGX_STATE_FILE")
+    if path:
+        return path
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "wirelesssgx", "state.json")
+    return os.path.join("/tmp", f"wirelesssgx-{os.getuid()}", "state.json")
+
+
+def write_state(state: Dict, path: Optional[str] = None) -> None:
+    """Atomically replace the state file with ``state``"""
+    path = path or state_file_path()
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def read_state(max_age: Optional[float] = DEFAULT_MAX_AGE,
+               path: Optional[str] = None) -> Optional[Dict]:
+    """Read the state file, or None if it is missing, corrupt or stale"""
+    try:
+        with open(path or state_file_path()) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if max_age is not None and time.time() - state.get("timestamp", 0) > max_age:
+        return None
+    return state
+
+
+class _Fields(dict):
+    """Format fields that render missing or null values as empty strings"""
+
+    def __missing__(self, key):
+        return ""
+
+
+def format_state(state: Dict, fmt: str = DEFAULT_FORMAT) -> str:
+    """Render a state snapshot as ``json``, ``waybar`` or a format template.
+
+    Templates use ``str.format`` fields named after the snapshot keys
+    (``signal``, ``ip4``, ``device``, ...) plus ``icon``, ``status``,
+    ``ssid`` and ``age``.
+    """
+    if fmt == "json":
+        return json.dumps(state)
+
+    connected = bool(state.get("connected"))
+    fields = _Fields({k: v for k, v in state.items() if v is not None})
+    fields.update(
+        icon="✅" if connected else "❌",
+        status="connected" if connected else "disconnected",
+        ssid="Wireless@SGx",
+        age=int(time.time() - state.get("timestamp", 0)),
+    )
+
+    if fmt == "waybar":
+        text = f"{fields['signal']}%" if connected and state.get("signal") is not None else fields["status"]
+        tooltip = f"Wireless@SGx: {fields['status']}"
+        if state.get("ip4"):
+            tooltip += f"\n{state['ip4']}"
+        return json.dumps({"text": text, "tooltip": tooltip, "class": fields["status"]})
+
+    return fmt.format_map(fields)
+
+
+def fast_status(argv: List[str]) -> bool:
+    """Serve ``status --cached`` straight from the state file.
+
+    Returns False (so the caller falls through to the full CLI and its
+    live probe) if the arguments are not understood or the state file is
+    missing or stale.
+    """
+    args = argv[1:]
+    if args[:1] != ["status"] or "--cached" not in args:
+        return False
+
+    fmt = DEFAULT_FORMAT
+    max_age = DEFAULT_MAX_AGE
+    rest = args[1:]
+    i = 0
+    try:
+        while i < len(rest):
+            arg = rest[i]
+            if arg == "--cached":
+                pass
+            elif arg in ("--format", "--max-age") and i + 1 < len(rest):
+                value = rest[i + 1]
+                i += 1
+                if arg == "--format":
+                    fmt = value
+                else:
+                    max_age = float(value)
+            elif arg.startswith("--format="):
+                fmt = arg[len("--format="):]
+            elif arg.startswith("--max-age="):
+                max_age = float(arg[len("--max-age="):])
+            else:
+                return False
+            i += 1
+    except ValueError:
+        # Let Click report the bad value
+        return False
+
+    state = read_state(max_age)
+    if state is None:
+        return False
+
+    try:
+        print(format_state(state, fmt))
+    except (ValueError, IndexError):
+        return False
+    return True
@@ -1,12 +1,18 @@
-"""Secure storage module for Wireless@SGx credentials"""
+"""Secure storage module for Wireless@SGx credentials
+
+``keyring`` and ``cryptography`` are imported on first use so that CLI
+commands which never touch credentials do not pay for them at startup.
+"""
 
 import json
-import keyring
 from pathlib import Path
 from typing import Optional, Dict
-from cryptography.fernet import Fernet
 import base64
 import os
+import time
+
+from .deadline import Deadline
+from .tracing import span
 
 
 class StorageError(Exception):
@@ -23,31 +29,46 @@ class SecureStorage:
         self.password_key = "password"
         self.config_key = "config"
         self.fallback_file = Path.home() / ".config" / "wirelesssgx" / "credentials.enc"
+        self.pending_file = self.fallback_file.parent / "pending.enc"
+        
+    def save_credentials(self, username: str, password: str, isp: str = "singtel",
+                         deadline: Optional[Deadline] = None) -> bool:
+        """Save credentials securely.
         
-    def save_credentials(self, username: str, password: str, isp: str = "singtel") -> bool:
-        """Save credentials securely"""
+        ``deadline`` is checked before the keyring and before the file
+        fallback; a cancelled flow raises FlowCancelled instead of saving.
+        """
+        if deadline is not None:
+            deadline.check()
         try:
             # Try keyring first
-            keyring.set_password(self.service_name, self.username_key, username)
-            keyring.set_password(self.service_name, self.password_key, password)
-            
-            # Save additional config
-            config = {"isp": isp, "last_connection": "success"}
-            keyring.set_password(self.service_name, self.config_key, json.dumps(config))
+            import keyring
+            with span("keyring save", "storage"):
+                keyring.set_password(self.service_name, self.username_key, username)
+                keyring.set_password(self.service_name, self.password_key, password)
+                
+                # Save additional config
+                config = {"isp": isp, "last_connection": "success"}
+                keyring.set_password(self.service_name, self.config_key, json.dumps(config))
             
             return True
             
         except Exception as e:
             # Fallback to encrypted file
-            return self._save_to_file(username, password, isp)
+            if deadline is not None:
+                deadline.check()
+            with span("credential file save", "storage"):
+                return self._save_to_file(username, password, isp)
     
     def get_credentials(self) -> Optional[Dict[str, str]]:
         """Retrieve stored credentials"""
         try:
             # Try keyring first
-            username = keyring.get_password(self.service_name, self.username_key)
-            password = keyring.get_password(self.service_name, self.password_key)
-            config_str = keyring.get_password(self.service_name, self.config_key)
+            import keyring
+            with span("keyring get", "storage"):
+                username = keyring.get_password(self.service_name, self.username_key)
+                password = keyring.get_password(self.service_name, self.password_key)
+                config_str = keyring.get_password(self.service_name, self.config_key)
             
             if username and password:
                 config = json.loads(config_str) if config_str else {"isp": "singtel"}
@@ -61,15 +82,18 @@ class SecureStorage:
             pass
         
         # Try fallback file
-        return self._load_from_file()
+        with span("credential file load", "storage"):
+            return self._load_from_file()
     
     def delete_credentials(self) -> bool:
         """Delete stored credentials"""
         try:
             # Delete from keyring
-            keyring.delete_password(self.service_name, self.username_key)
-            keyring.delete_password(self.service_name, self.password_key)
-            keyring.delete_password(self.service_name, self.config_key)
+            import keyring
+            with span("keyring delete", "storage"):
+                keyring.delete_password(self.service_name, self.username_key)
+                keyring.delete_password(self.service_name, self.password_key)
+                keyring.delete_password(self.service_name, self.config_key)
         except:
             pass
         
@@ -81,6 +105,8 @@ class SecureStorage:
     
     def _get_or_create_key(self) -> bytes:
         """Get or create encryption key for fallback storage"""
+        from cryptography.fernet import Fernet
+        
         key_file = self.fallback_file.parent / ".key"
         
         if key_file.exists():
@@ -99,6 +125,7 @@ class SecureStorage:
             self.fallback_file.parent.mkdir(parents=True, exist_ok=True)
             
             # Encrypt credentials
+            from cryptography.fernet import Fernet
             key = self._get_or_create_key()
             f = Fernet(key)
             
@@ -126,6 +153,7 @@ class SecureStorage:
             return None
             
         try:
+            from cryptography.fernet import Fernet
             key = self._get_or_create_key()
             f = Fernet(key)
             
@@ -139,4 +167,48 @@ class SecureStorage:
     
     def has_credentials(self) -> bool:
         """Check if credentials are stored"""
-        return self.get_credentials() is not None
\ No newline at end of file
+        return self.get_credentials() is not None
+    
+    def save_pending_session(self, success_code: str, mobile: str, dob: str,
+                             isp: str, retrieve_mode: bool = False) -> Dict:
+        """Persist a pending OTP session so it can be verified later"""
+        session = {
+            "success_code": success_code,
+            "mobile": mobile,
+            "dob": dob,
+            "isp": isp,
+            "mode": "retrieve" if retrieve_mode else "new",
+            "timestamp": time.time()
+        }
+        
+        try:
+            self.pending_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            from cryptography.fernet import Fernet
+            f = Fernet(self._get_or_create_key())
+            self.pending_file.write_bytes(f.encrypt(json.dumps(session).encode()))
+            # Make file readable only by owner
+            os.chmod(self.pending_file, 0o600)
+            
+            return session
+            
+        except Exception as e:
+            raise StorageError(f"Failed to save pending session: {str(e)}")
+    
+    def get_pending_session(self) -> Optional[Dict]:
+        """Load the pending OTP session, if any"""
+        if not self.pending_file.exists():
+            return None
+        
+        try:
+            from cryptography.fernet import Fernet
+            f = Fernet(self._get_or_create_key())
+            return json.loads(f.decrypt(self.pending_file.read_bytes()).decode())
+        except Exception:
+            return None
+    
+    def delete_pending_session(self) -> bool:
+        """Delete the pending OTP session"""
+        if self.pending_file.exists():
+            self.pending_file.unlink()
+        return True
@@ -0,0 +1,85 @@
+"""App-level store of prefetched credential, backend and link state
+
+The TUI prefetches everything the menus need (saved credentials, the
+detected network backend, the profile's settings and the visible access
+points) on background threads as soon as the welcome screen mounts.
+Screens then read from the store instead of querying the keyring, systemctl
+and nmcli themselves on the event loop.
+"""
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .network import NetworkManager, NetworkConfigError
+from .storage import SecureStorage
+
+CREDENTIALS = "credentials"
+BACKEND = "backend"
+PROFILE = "profile"
+LINK = "link"
+
+
+class AppStore:
+    """Futures for each piece of state, filled in by background threads"""
+
+    def __init__(self, storage: Optional[SecureStorage] = None,
+                 network: Optional[NetworkManager] = None, workers: int = 4):
+        self.storage = storage or SecureStorage()
+        self.network = network or NetworkManager()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wirelesssgx-store")
+        self._futures: Dict[str, Future] = {}
+        self._loaders: Dict[str, Callable[[], Any]] = {
+            CREDENTIALS: self.storage.get_credentials,
+            BACKEND: self._detect_backend,
+            PROFILE: self.network.get_profile_info,
+            LINK: self._link_state,
+        }
+
+    def _detect_backend(self) -> Optional[str]:
+        try:
+            return self.network.detect_network_manager()
+        except NetworkConfigError:
+            return None
+
+    def _link_state(self) -> Dict:
+        """Whether Wireless@SGx is visible/active, and its best signal"""
+        visible = [ap for ap in self.network.list_access_points() if ap["ssid"] == self.network.ssid]
+        active = next((ap for ap in visible if ap["active"]), None)
+        return {
+            "connected": active is not None,
+            "in_range": bool(visible),
+            "signal": max((ap["signal"] or 0 for ap in visible), default=None),
+            "bssid": active["bssid"] if active else None,
+            "device": active["device"] if active else None,
+        }
+
+    def prefetch(self, *keys: str) -> None:
+        """(Re)load ``keys`` (default: everything) in the background"""
+        for key in keys or tuple(self._loaders):
+            self._futures[key] = self._executor.submit(self._loaders[key])
+
+    def _future(self, key: str) -> Future:
+        if key not in self._futures:
+            self.prefetch(key)
+        return self._futures[key]
+
+    async def get(self, key: str) -> Any:
+        """Value for ``key``, waiting for the prefetch if it is still running"""
+        return await asyncio.wrap_future(self._future(key))
+
+    def peek(self, key: str, default: Any = None) -> Any:
+        """Value for ``key`` if already loaded, otherwise ``default``"""
+        future = self._futures.get(key)
+        if future is None or not future.done() or future.exception() is not None:
+            return default
+        return future.result()
+
+    def set(self, key: str, value: Any) -> None:
+        """Replace a value after the app changed it (e.g. saved credentials)"""
+        future: Future = Future()
+        future.set_result(value)
+        self._futures[key] = future
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,120 @@
+"""Operation spans written as a Chrome trace (``--trace``)
+
+``span`` marks one operation: an ESSA call, decryption, a keyring
+access, a pipeline stage or a screen transition; ``runner`` records one
+per external command. Until ``enable`` is called a span is a shared no-op
+object, so the call sites cost a global lookup in normal runs. ``write``
+saves the spans as Chrome trace-event JSON for chrome://tracing,
+Perfetto or speedscope.
+
+This module is imported on the CLI's cold-start path: standard library
+modules already loaded by the interpreter only.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Recorded events while tracing is enabled, None otherwise
+_events: Optional[List[Dict]] = None
+_threads: Dict[int, str] = {}
+_origin = 0.0
+_lock = threading.Lock()
+
+
+class _NullSpan:
+    """What ``span`` returns while tracing is off"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def set(self, **args) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name: str, cat: str, args: Dict):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        record(self.name, self.cat, self.start, time.perf_counter() - self.start, self.args)
+        return False
+
+    def set(self, **args) -> None:
+        """Attach arguments known only once the operation has run"""
+        self.args.update(args)
+
+
+def span(name: str, cat: str = "app", **args):
+    """Context manager timing one operation (a no-op unless tracing)"""
+    if _events is None:
+        return _NULL_SPAN
+    return _Span(name, cat, args)
+
+
+def record(name: str, cat: str, start: float, duration: float,
+           args: Optional[Dict] = None) -> None:
+    """Add a finished operation that began at ``perf_counter()`` ``start``"""
+    if _events is None:
+        return
+    thread = threading.current_thread()
+    event = {
+        "name": name, "cat": cat, "ph": "X",
+        "ts": round((start - _origin) * 1e6, 1), "dur": round(duration * 1e6, 1),
+        "pid": os.getpid(), "tid": thread.ident, "args": args or {},
+    }
+    with _lock:
+        _events.append(event)
+        _threads.setdefault(thread.ident, thread.name)
+
+
+def enabled() -> bool:
+    return _events is not None
+
+
+def enable() -> None:
+    """Start recording spans"""
+    global _events, _origin
+    _origin = time.perf_counter()
+    _threads.clear()
+    _events = []
+
+
+def disable() -> List[Dict]:
+    """Stop recording and return the trace events"""
+    global _events
+    with _lock:
+        events, _events = _events or [], None
+        pid = os.getpid()
+        metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                    for tid, name in _threads.items()]
+    return metadata + events
+
+
+def write(path: str) -> int:
+    """Stop recording and save the trace; returns the number of spans"""
+    import json
+
+    events = disable()
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return sum(event["ph"] == "X" for event in events)